@@ -2,7 +2,7 @@ from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.database import get_db
+from app.database import get_read_db, primary_read_session, wrote_recently
 from app.models import User, UserRole
 from app.auth.jwt import decode_access_token
 import uuid
@@ -24,7 +24,7 @@ async def get_user_by_id(user_id: bytes, db: AsyncSession) -> User:
 # ------------------ Current user ------------------ #
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> User:
     token = credentials.credentials
     try:
@@ -42,7 +42,15 @@ async def get_current_user(
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = await get_user_by_id(user_id, db)
+    # Read-your-writes: right after this user's own write, the route's reads
+    # (this same session) go to the primary
+    if wrote_recently(user_id):
+        db.info["use_primary"] = True
+
+    # The user always comes from the primary, in a session of its own that
+    # hands its connection back as soon as the user is loaded
+    async with primary_read_session() as auth_db:
+        user = await get_user_by_id(user_id, auth_db)
 
     # ✅ Attach permission dynamically (NO model change)
     user.can_access_both = can_access_both
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,3 +8,120 @@ DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "sqlite+aiosqlite:///./convocation.db"
 )
+
+# -------------------------
+# SQLite production profile (only used when DATABASE_URL is a SQLite file)
+# -------------------------
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))  # 256 MB
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", 10))
+# How long a request may queue for the single writer connection (seconds)
+SQLITE_WRITER_TIMEOUT = float(os.getenv("SQLITE_WRITER_TIMEOUT", 30))
+
+# -------------------------
+# Connection pool (server databases such as Postgres)
+# -------------------------
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Connections opened at startup so the first requests don't pay for them
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", 5))
+ASYNCPG_STATEMENT_CACHE_SIZE = int(os.getenv("ASYNCPG_STATEMENT_CACHE_SIZE", 500))
+
+# -------------------------
+# Read replica
+# -------------------------
+# Optional database the read-only (GET) endpoints are served from
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+# After a user's own write their reads go to the primary for this long (seconds)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 10))
+
+# -------------------------
+# Instrumentation
+# -------------------------
+# "development" turns on strict checks such as the N+1 detector
+APP_ENV = os.getenv("APP_ENV", "production").lower()
+# Max times one statement shape may run in a request before it counts as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 10))
+# Bearer token a Prometheus server scrapes /metrics with; without one only
+# admins can read it
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# -------------------------
+# Attendance window
+# -------------------------
+# Only the load test harness should ever turn this off
+ENFORCE_ATTENDANCE_WINDOW = os.getenv("ENFORCE_ATTENDANCE_WINDOW", "true").lower() == "true"
+# Most attendance marks written to the log in one transaction
+ATTENDANCE_LOG_BATCH_MAX = int(os.getenv("ATTENDANCE_LOG_BATCH_MAX", 500))
+# Offline sync: most marks in one upload, and how old a queued mark may be
+ATTENDANCE_SYNC_MAX_MARKS = int(os.getenv("ATTENDANCE_SYNC_MAX_MARKS", 500))
+ATTENDANCE_SYNC_MAX_AGE_SECONDS = int(os.getenv("ATTENDANCE_SYNC_MAX_AGE_SECONDS", 12 * 3600))
+# ...and how long after the window it was made in closes it is still taken
+ATTENDANCE_SYNC_GRACE_SECONDS = int(os.getenv("ATTENDANCE_SYNC_GRACE_SECONDS", 15 * 60))
+# Warm the caches, the pool and the reports this long before each attendance
+# window opens (0 turns it off)
+PREWARM_LEAD_SECONDS = int(os.getenv("PREWARM_LEAD_SECONDS", 300))
+
+# -------------------------
+# Request profiler
+# -------------------------
+# Admins can profile one request with an "X-Profile: sample|cprofile" header
+REQUEST_PROFILER_ENABLED = os.getenv("REQUEST_PROFILER_ENABLED", "true").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "convocation-profiles"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 1))
+
+# -------------------------
+# Event loop watchdog
+# -------------------------
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", 0.05))  # seconds
+# A callback holding the loop longer than this gets logged with a stack sample
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", 100))
+
+# -------------------------
+# Response compression / cache
+# -------------------------
+# Bodies smaller than this (bytes) go out uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+# br quality 1 beats gzip -6 on both size and CPU for our JSON (benchmarks/compression.py)
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 1))
+# Bodies larger than this are compressed in a worker thread, off the event loop
+COMPRESSION_OFFLOAD_SIZE = int(os.getenv("COMPRESSION_OFFLOAD_SIZE", 64 * 1024))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 256))
+
+# -------------------------
+# Idempotency keys
+# -------------------------
+# Responses to requests sent with an Idempotency-Key are kept this long, for
+# at most this many keys and this many body bytes in all, and replayed to retries
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 3600))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", 10000))
+IDEMPOTENCY_MAX_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BYTES", 32 * 1024 * 1024))
+
+# -------------------------
+# Pagination
+# -------------------------
+# Listing / search routes return at most this many rows per page by default
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", 100))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 500))
+
+# -------------------------
+# Search
+# -------------------------
+# Typo-tolerant matches are added when a query has fewer substring matches than
+# this (1: only when nothing else matches)
+SEARCH_FUZZY_BELOW = int(os.getenv("SEARCH_FUZZY_BELOW", 1))
+# Share of the query's trigrams a typo-tolerant match must contain
+SEARCH_FUZZY_MIN_SIMILARITY = float(os.getenv("SEARCH_FUZZY_MIN_SIMILARITY", 0.5))
+
+# -------------------------
+# Attendance freeze
+# -------------------------
+# Freeze attendance on its own once the marking window has closed
+AUTO_FREEZE_ATTENDANCE = os.getenv("AUTO_FREEZE_ATTENDANCE", "false").lower() == "true"
+# How long clients may reuse a frozen listing or report without asking again
+FROZEN_CACHE_MAX_AGE = int(os.getenv("FROZEN_CACHE_MAX_AGE", 3600))
@@ -1,21 +1,218 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from app.config import DATABASE_URL
-
-# Create async engine
-async_engine = create_async_engine(
+import asyncio
+import time
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import declarative_base, Session
+from app.config import (
     DATABASE_URL,
-    echo=False,
-    future=True
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE,
+    SQLITE_READ_POOL_SIZE,
+    SQLITE_WRITER_TIMEOUT,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_POOL_WARMUP,
+    ASYNCPG_STATEMENT_CACHE_SIZE,
+    REPLICA_DATABASE_URL,
+    READ_YOUR_WRITES_SECONDS,
 )
+from app.helpers.pool_stats import InstrumentedPool, label_pool
+
+
+def is_sqlite_file(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def _sqlite_pragmas(read_only: bool):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return on_connect
+
+
+def pool_options(url: str, **overrides) -> dict:
+    """
+    Pool and driver settings for a server database, taken from app/config.py.
+    Keyword overrides win, which is how the pool benchmark sweeps settings.
+    """
+    options = {
+        "poolclass": InstrumentedPool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": ASYNCPG_STATEMENT_CACHE_SIZE,
+        }
+
+    options.update(overrides)
+    return options
+
+
+def create_engines(url: str, sqlite_profile: bool = True, **pool_overrides) -> tuple[AsyncEngine, AsyncEngine]:
+    """
+    Build the (write, read) engine pair.
+
+    A SQLite file only ever allows one writer, so with the profile on all
+    writes go through a pool of exactly one connection (requests queue for it
+    instead of colliding on the database lock) while reads get their own WAL
+    pool. Every other database uses a single engine for both.
+    """
+    backend = make_url(url).get_backend_name()
+
+    if backend == "sqlite" and not is_sqlite_file(url):
+        # in-memory databases keep SQLAlchemy's static pool
+        engine = create_async_engine(url, echo=False, future=True)
+        return engine, engine
+
+    if not (sqlite_profile and backend == "sqlite"):
+        engine = create_async_engine(url, echo=False, future=True, **pool_options(url, **pool_overrides))
+        return engine, engine
+
+    write_engine = create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=SQLITE_WRITER_TIMEOUT,
+    )
+    event.listen(write_engine.sync_engine, "connect", _sqlite_pragmas(read_only=False))
+
+    return write_engine, create_read_engine(url)
+
+
+def create_read_engine(url: str) -> AsyncEngine:
+    """
+    Engine for read-only traffic. SQLite files get a query_only WAL pool,
+    anything else the regular configured pool.
+    """
+    if not is_sqlite_file(url):
+        return create_engines(url)[0]
+
+    engine = create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=SQLITE_READ_POOL_SIZE,
+        max_overflow=SQLITE_READ_POOL_SIZE,
+    )
+    event.listen(engine.sync_engine, "connect", _sqlite_pragmas(read_only=True))
+    return engine
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int = DB_POOL_WARMUP) -> int:
+    """
+    Open `connections` connections at once (capped at the pool size) and hand
+    them back, so the pool is already full when the first requests arrive.
+    """
+    pool = engine.sync_engine.pool
+    if hasattr(pool, "size"):
+        connections = min(connections, pool.size())
+    if connections <= 0:
+        return 0
+
+    conns = await asyncio.gather(*(engine.connect() for _ in range(connections)))
+    try:
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in conns))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in conns))
+
+    return connections
+
+
+# Create async engines
+# primary_read_engine reads the primary database without competing for the
+# SQLite writer connection (it *is* async_engine for server databases)
+async_engine, primary_read_engine = create_engines(DATABASE_URL)
+read_engine = primary_read_engine
 
-# Create async session factory
+if REPLICA_DATABASE_URL:
+    read_engine = create_read_engine(REPLICA_DATABASE_URL)
+
+label_pool(async_engine, "write")
+if primary_read_engine is not async_engine:
+    label_pool(primary_read_engine, "read")
+if read_engine is not primary_read_engine:
+    label_pool(read_engine, "replica")
+
+
+def all_engines() -> list[AsyncEngine]:
+    engines = []
+    for engine in (async_engine, primary_read_engine, read_engine):
+        if engine not in engines:
+            engines.append(engine)
+    return engines
+
+# Create async session factories
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
 
+
+# ------------------ Read-your-writes ------------------ #
+# user_id -> monotonic time until which that user's reads go to the primary
+_recent_writers: dict = {}
+
+
+def note_write(user_id) -> None:
+    """
+    Call after a user's own commit so their next reads can see it even if the
+    replica has not caught up yet.
+    """
+    now = time.monotonic()
+    if len(_recent_writers) > 1000:
+        for key, until in list(_recent_writers.items()):
+            if until < now:
+                del _recent_writers[key]
+    _recent_writers[user_id] = now + READ_YOUR_WRITES_SECONDS
+
+
+def wrote_recently(user_id) -> bool:
+    until = _recent_writers.get(user_id)
+    return until is not None and until > time.monotonic()
+
+
+class ReadSession(Session):
+    """
+    Session for read-only endpoints. Uses the read engine (replica) unless
+    `session.info["use_primary"]` was set for this request.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("use_primary"):
+            return primary_read_engine.sync_engine
+        return read_engine.sync_engine
+
+
+AsyncReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=ReadSession,
+    expire_on_commit=False,
+)
+
 # Base class for all models
 Base = declarative_base()
 
@@ -23,3 +220,24 @@ Base = declarative_base()
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+# FastAPI dependency for requests that only read
+async def get_read_db():
+    async with AsyncReadSessionLocal() as session:
+        yield session
+
+
+def primary_read_session() -> AsyncSession:
+    """
+    A read session on the primary, for reads that must see the latest commit
+    (who a token belongs to, logins): a lagging replica would still let a
+    deleted or demoted user in, and not yet a new one.
+    """
+    return AsyncReadSessionLocal(info={"use_primary": True})
+
+
+# FastAPI dependency for reads that must see the latest commit
+async def get_primary_read_db():
+    async with primary_read_session() as session:
+        yield session
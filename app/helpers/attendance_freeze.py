@@ -0,0 +1,190 @@
+"""
+Attendance freeze (single worker).
+
+Once marking is over, an admin (or the scheduler, AUTO_FREEZE_ATTENDANCE,
+after the last attendance window closed) freezes the attendance: marks are
+refused with 409, and the summary, class listings, present students report
+and CSV export are served from one snapshot taken at the freeze, a detached
+copy of the roster with the reference data it was read with and the report
+files already rendered.
+data_etag(frozen=True) keys those routes on the snapshot and lets clients
+keep them for FROZEN_CACHE_MAX_AGE. Unfreezing drops the snapshot.
+
+    async with attendance_freeze.marking():
+        ... change students.present and commit ...
+
+    ref, roster = await attendance_view(db)
+
+The open attendance_freezes row keeps the freeze across restarts: load()
+takes the snapshot again at startup.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.helpers.attendance_reports import CSV_HEADERS, PDF_HEADERS, REPORT_TABLES, render_reports
+from app.helpers.attendance_time_checker import attendance_windows
+from app.helpers.reference_data import ReferenceSnapshot, reference_data
+from app.helpers.response_cache import CachedResponse
+from app.helpers.roster import RosterStore, roster
+from app.models import AttendanceFreeze
+
+logger = logging.getLogger("app.freeze")
+
+# What a frozen snapshot stands in for, in data_etag
+FROZEN_TABLES = REPORT_TABLES
+
+# How often the scheduler looks at the attendance windows
+AUTO_FREEZE_POLL_SECONDS = 60
+
+
+class FrozenSnapshot:
+    __slots__ = ("token", "frozen_at", "frozen_by", "ref", "roster", "reports", "export")
+
+    def __init__(self, row: AttendanceFreeze, ref: ReferenceSnapshot, roster: RosterStore):
+        self.token = f"frozen-{row.id}"
+        self.frozen_at = row.frozen_at
+        self.frozen_by = row.frozen_by
+        self.ref = ref
+        self.roster = roster
+        # program type ("" for all) -> present students PDF
+        self.reports: Dict[str, CachedResponse] = {}
+        self.export: Optional[CachedResponse] = None
+
+    async def render(self):
+        """Renders the report files in a thread: nothing in the snapshot changes."""
+        pdfs, export = await asyncio.to_thread(render_reports, self.ref, self.roster)
+        self.reports = {
+            key: CachedResponse(body, "application/pdf", frozenset(), PDF_HEADERS) for key, body in pdfs.items()
+        }
+        self.export = CachedResponse(export, "text/csv; charset=utf-8", frozenset(), CSV_HEADERS)
+
+
+class AttendanceFreezer:
+    def __init__(self):
+        self.snapshot: Optional[FrozenSnapshot] = None
+        # Set from the start of a freeze: marks are refused before the snapshot exists
+        self.locked = False
+        self._lock = asyncio.Lock()
+        self._marks_in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @asynccontextmanager
+    async def marking(self):
+        """Wraps a change to attendance: 409 while frozen, and a freeze waits for it."""
+        if self.locked:
+            raise HTTPException(status_code=409, detail="Attendance is frozen")
+        self._marks_in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._marks_in_flight -= 1
+            if not self._marks_in_flight:
+                self._idle.set()
+
+    async def _take_snapshot(self, db: AsyncSession, row: AttendanceFreeze) -> FrozenSnapshot:
+        ref = await reference_data.get(db)
+        await roster.ready(db)
+        snapshot = FrozenSnapshot(row, ref, roster.copy())
+        await snapshot.render()
+        return snapshot
+
+    async def load(self, db: AsyncSession):
+        """At startup: freeze again if the last freeze was never lifted."""
+        result = await db.execute(
+            select(AttendanceFreeze)
+            .where(AttendanceFreeze.unfrozen_at.is_(None))
+            .order_by(AttendanceFreeze.id.desc())
+            .limit(1)
+        )
+        row = result.scalar_one_or_none()
+        self.locked = row is not None
+        self.snapshot = await self._take_snapshot(db, row) if row is not None else None
+
+    async def freeze(self, db: AsyncSession, user_id=None) -> FrozenSnapshot:
+        """Locks marks and takes the snapshot; user_id None means the scheduler."""
+        async with self._lock:
+            if self.snapshot is not None:
+                return self.snapshot
+            self.locked = True
+            try:
+                # Marks already past the check commit first and are in the snapshot
+                await self._idle.wait()
+                row = AttendanceFreeze(frozen_at=datetime.now(timezone.utc), frozen_by=user_id)
+                db.add(row)
+                await db.commit()
+            except BaseException:
+                self.locked = False
+                raise
+            # Until the files are rendered reads stay live, on the same attendance
+            self.snapshot = await self._take_snapshot(db, row)
+            return self.snapshot
+
+    async def unfreeze(self, db: AsyncSession, user_id) -> bool:
+        """Lifts the freeze; False when attendance was not frozen."""
+        async with self._lock:
+            result = await db.execute(select(AttendanceFreeze).where(AttendanceFreeze.unfrozen_at.is_(None)))
+            rows = result.scalars().all()
+            for row in rows:
+                row.unfrozen_at = datetime.now(timezone.utc)
+                row.unfrozen_by = user_id
+            await db.commit()
+            was_frozen = self.locked or bool(rows)
+            self.snapshot = None
+            self.locked = False
+            return was_frozen
+
+    async def freeze_after(self, db: AsyncSession, closed_at: datetime) -> Optional[FrozenSnapshot]:
+        """
+        The scheduler's freeze once the window closed at `closed_at`; skipped
+        when attendance was frozen since (an admin who unfroze it meant to).
+        """
+        if self.locked:
+            return None
+        result = await db.execute(
+            select(AttendanceFreeze.id)
+            .where(AttendanceFreeze.frozen_at >= closed_at.astimezone(timezone.utc))
+            .limit(1)
+        )
+        if result.first() is not None:
+            return None
+        return await self.freeze(db)
+
+
+attendance_freeze = AttendanceFreezer()
+
+
+async def attendance_view(db: AsyncSession) -> Tuple[ReferenceSnapshot, RosterStore]:
+    """The reference data and roster reads are served from: frozen or live."""
+    snapshot = attendance_freeze.snapshot
+    if snapshot is not None:
+        return snapshot.ref, snapshot.roster
+    ref = await reference_data.get(db)
+    await roster.ready(db)
+    return ref, roster
+
+
+async def auto_freeze():
+    """Background task: freezes attendance once the last attendance window has closed."""
+    while True:
+        wait = AUTO_FREEZE_POLL_SECONDS
+        try:
+            async with AsyncSessionLocal() as db:
+                closes = (await attendance_windows.get(db)).last_close()
+                if time.time() >= closes:
+                    await attendance_freeze.freeze_after(db, datetime.fromtimestamp(closes, timezone.utc))
+                else:
+                    wait = min(wait, closes - time.time())
+        except Exception:
+            logger.exception("Scheduled attendance freeze failed")
+        await asyncio.sleep(wait)
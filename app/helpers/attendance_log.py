@@ -0,0 +1,258 @@
+"""
+Attendance event log (single worker).
+
+Every mark is appended to attendance_events (student, session, staff,
+value, time); students.present, and the roster built from it, is the
+current state projected from the log, so reads never touch the log.
+
+Marks are written with group commit: a mark that arrives while a batch is
+being written waits for the next one, and each batch is one transaction
+(the students it marks, their events, the projection update) on the single
+writer connection, however many staff are marking at once.
+
+    was_present = await attendance_log.record(student_id, True, staff_id, session_id)
+
+Marks uploaded by an offline device (app/routes/staff_attendance_sync.py)
+carry the device's key and time: a key already logged is answered with
+DuplicateMark, and a mark older than the student's last one with StaleMark
+(last writer wins, by the time of the mark, not of the upload).
+
+The log also answers what the projection can't: each student's state at a
+point in time or in one session (attendance_as_of), the marks since a
+given event (events_since), and it can be compacted to each student's last
+mark once a session is over (compact).
+"""
+import asyncio
+import contextvars
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ATTENDANCE_LOG_BATCH_MAX
+from app.database import AsyncSessionLocal
+from app.models import AttendanceEvent, Student
+
+
+class DuplicateMark(Exception):
+    """The staff member's mark with this key is already logged."""
+
+
+class StaleMark(Exception):
+    """A later mark of the student is already logged."""
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands DateTime columns back naive; they are stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class PendingMark:
+    __slots__ = ("student_id", "present", "staff_id", "session_id", "key", "marked_at", "client_time", "done")
+
+    def __init__(self, student_id, present: bool, staff_id, session_id: Optional[int],
+                 key: Optional[str] = None, marked_at: Optional[datetime] = None):
+        self.student_id = student_id
+        self.present = present
+        self.staff_id = staff_id
+        self.session_id = session_id
+        self.key = key
+        self.client_time = marked_at is not None
+        self.marked_at = _as_utc(marked_at) if self.client_time else datetime.now(timezone.utc)
+        self.done = asyncio.get_running_loop().create_future()
+
+
+class AttendanceLog:
+    def __init__(self, max_batch: int):
+        self.max_batch = max_batch
+        self._queue: List[PendingMark] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    async def record(
+        self,
+        student_id,
+        present: bool,
+        staff_id=None,
+        session_id: Optional[int] = None,
+        key: Optional[str] = None,
+        marked_at: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Appends a mark and returns once it is committed, with the student's
+        previous value. LookupError when the student no longer exists;
+        DuplicateMark and StaleMark for a device's `key` and `marked_at`.
+        """
+        mark = PendingMark(student_id, present, staff_id, session_id, key, marked_at)
+        self._queue.append(mark)
+        if self._writer is None:
+            # In a context of its own, so the batch's queries aren't counted
+            # against the request that happened to start it
+            self._writer = asyncio.create_task(self._write_queued(), context=contextvars.Context())
+        # A caller that goes away doesn't cancel the batch it is part of
+        return await asyncio.shield(mark.done)
+
+    async def _write_queued(self):
+        try:
+            while self._queue:
+                batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+                try:
+                    outcomes = await self._write(batch)
+                except Exception as exc:
+                    outcomes = [exc] * len(batch)
+                for mark, outcome in zip(batch, outcomes):
+                    if isinstance(outcome, Exception):
+                        mark.done.set_exception(outcome)
+                    else:
+                        mark.done.set_result(outcome)
+        finally:
+            self._writer = None
+
+    async def _write(self, batch: List[PendingMark]) -> list:
+        async with AsyncSessionLocal() as db:
+            # Loaded through the ORM so the commit hooks see which rows changed
+            result = await db.execute(select(Student).where(Student.id.in_({mark.student_id for mark in batch})))
+            students = {student.id: student for student in result.scalars()}
+
+            # Checked here, on the single writer, so two uploads of the same
+            # key can't both get in
+            keyed = [mark for mark in batch if mark.key is not None]
+            logged = set()
+            if keyed:
+                result = await db.execute(
+                    select(AttendanceEvent.staff_id, AttendanceEvent.client_key)
+                    .where(AttendanceEvent.client_key.in_({mark.key for mark in keyed}))
+                )
+                logged = set(result.all())
+            latest = {}
+            client_timed = {mark.student_id for mark in batch if mark.client_time}
+            if client_timed:
+                result = await db.execute(
+                    select(AttendanceEvent.student_id, func.max(AttendanceEvent.marked_at))
+                    .where(AttendanceEvent.student_id.in_(client_timed))
+                    .group_by(AttendanceEvent.student_id)
+                )
+                latest = {student_id: _as_utc(marked_at) for student_id, marked_at in result}
+
+            outcomes = []
+            for mark in batch:
+                student = students.get(mark.student_id)
+                if student is None:
+                    outcomes.append(LookupError("Student not found"))
+                    continue
+                if mark.key is not None:
+                    if (mark.staff_id, mark.key) in logged:
+                        outcomes.append(DuplicateMark(mark.key))
+                        continue
+                    logged.add((mark.staff_id, mark.key))
+                last = latest.get(mark.student_id)
+                if mark.client_time and last is not None and mark.marked_at < last:
+                    outcomes.append(StaleMark(mark.key))
+                    continue
+                latest[mark.student_id] = max(last, mark.marked_at) if last else mark.marked_at
+                outcomes.append(student.present)
+                student.present = mark.present
+                db.add(AttendanceEvent(
+                    student_id=mark.student_id,
+                    session_id=mark.session_id,
+                    staff_id=mark.staff_id,
+                    present=mark.present,
+                    marked_at=mark.marked_at,
+                    client_key=mark.key,
+                ))
+            await db.commit()
+        return outcomes
+
+
+attendance_log = AttendanceLog(ATTENDANCE_LOG_BATCH_MAX)
+
+
+def _session_filter(session_id: Optional[int]):
+    if session_id is None:
+        return AttendanceEvent.session_id.is_(None)
+    return AttendanceEvent.session_id == session_id
+
+
+async def attendance_as_of(
+    db: AsyncSession,
+    at: Optional[datetime] = None,
+    session_id: Optional[int] = None,
+    any_session: bool = True,
+) -> Dict[object, bool]:
+    """
+    Each marked student's last value at `at` (now when None), over every
+    session or, with any_session=False, in session_id only (None: marks
+    made outside sessions). Students never marked are left out.
+    """
+    last = select(func.max(AttendanceEvent.id).label("id")).group_by(AttendanceEvent.student_id)
+    if at is not None:
+        last = last.where(AttendanceEvent.marked_at <= at.astimezone(timezone.utc))
+    if not any_session:
+        last = last.where(_session_filter(session_id))
+    last = last.subquery()
+
+    result = await db.execute(
+        select(AttendanceEvent.student_id, AttendanceEvent.present)
+        .join(last, last.c.id == AttendanceEvent.id)
+    )
+    return dict(result.all())
+
+
+async def events_since(
+    db: AsyncSession, after_id: int = 0, student_ids=None, limit: int = 1000,
+) -> Tuple[List[AttendanceEvent], int]:
+    """Events after `after_id` in log order, and the id to continue from."""
+    query = select(AttendanceEvent).where(AttendanceEvent.id > after_id)
+    if student_ids is not None:
+        query = query.where(AttendanceEvent.student_id.in_(student_ids))
+    events = (await db.execute(query.order_by(AttendanceEvent.id).limit(limit))).scalars().all()
+    return events, events[-1].id if events else after_id
+
+
+async def compact(db: AsyncSession, session_id: Optional[int]) -> int:
+    """
+    Keeps only each student's last mark of the session (None: marks made
+    outside sessions); returns how many events were dropped.
+    """
+    last = (
+        select(func.max(AttendanceEvent.id))
+        .where(_session_filter(session_id))
+        .group_by(AttendanceEvent.student_id)
+    )
+    result = await db.execute(
+        delete(AttendanceEvent)
+        .where(_session_filter(session_id), AttendanceEvent.id.not_in(last))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def logged_keys(db: AsyncSession, staff_id, keys) -> set:
+    """Which of a staff member's mark keys are already logged."""
+    if not keys:
+        return set()
+    result = await db.execute(
+        select(AttendanceEvent.client_key)
+        .where(AttendanceEvent.staff_id == staff_id, AttendanceEvent.client_key.in_(set(keys)))
+    )
+    return set(result.scalars())
+
+
+async def students_changed_since(db: AsyncSession, after_id: Optional[int]) -> Tuple[Optional[set], int]:
+    """
+    The students marked after event `after_id` (None: everyone, no cursor
+    yet), and the cursor to continue from.
+    """
+    if after_id is None:
+        return None, await db.scalar(select(func.max(AttendanceEvent.id))) or 0
+    result = await db.execute(
+        select(AttendanceEvent.student_id, func.max(AttendanceEvent.id))
+        .where(AttendanceEvent.id > after_id)
+        .group_by(AttendanceEvent.student_id)
+    )
+    changed, cursor = set(), after_id
+    for student_id, last_id in result:
+        changed.add(student_id)
+        cursor = max(cursor, last_id)
+    return changed, cursor
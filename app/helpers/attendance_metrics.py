@@ -0,0 +1,87 @@
+import time
+from collections import deque
+
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ProgramType, Class, Student
+from app.helpers.data_changes import on_tables_changed
+from app.helpers.metrics import Gauge, attendance_marks_total
+
+# Writes to these can change the counts without a mark (students added,
+# moved or deleted, classes moved between program types)
+PROGRESS_TABLES = ("program_types", "classes", "students")
+
+
+class AttendanceProgress:
+    """
+    Ceremony progress fed from the marking path: present students per
+    program type and marks in the last minute. Other writes to the students
+    or classes leave the counts stale until the next refresh().
+    """
+
+    def __init__(self):
+        self.program_type_names = {}
+        self.present_by_program_type = {}
+        self._recent_marks = deque()
+        self._stale = False
+
+    def invalidate(self, tables: frozenset):
+        if not tables.isdisjoint(PROGRESS_TABLES):
+            self._stale = True
+
+    async def refresh(self, db: AsyncSession):
+        """Counts again if a write may have changed them since the last load."""
+        if self._stale:
+            await self.load(db)
+
+    async def load(self, db: AsyncSession):
+        # A write committing while this runs marks the counts stale again
+        self._stale = False
+        db.info["use_primary"] = True
+        result = await db.execute(
+            select(ProgramType.id, ProgramType.type_name, func.count(Student.id))
+            .select_from(ProgramType)
+            .outerjoin(Class, Class.program_type_id == ProgramType.id)
+            .outerjoin(Student, and_(Student.class_id == Class.id, Student.present.is_(True)))
+            .group_by(ProgramType.id, ProgramType.type_name)
+        )
+        program_type_names, present_by_program_type = {}, {}
+        for program_type_id, type_name, present in result:
+            program_type_names[program_type_id] = type_name
+            present_by_program_type[program_type_id] = present
+        self.program_type_names = program_type_names
+        self.present_by_program_type = present_by_program_type
+
+    def record_mark(self, program_type_id, was_present: bool, present: bool):
+        attendance_marks_total.inc(present=str(present).lower())
+        self._recent_marks.append(time.monotonic())
+
+        if was_present != present:
+            count = self.present_by_program_type.get(program_type_id, 0)
+            self.present_by_program_type[program_type_id] = count + (1 if present else -1)
+
+    def marks_last_minute(self) -> int:
+        cutoff = time.monotonic() - 60
+        while self._recent_marks and self._recent_marks[0] < cutoff:
+            self._recent_marks.popleft()
+        return len(self._recent_marks)
+
+
+attendance_progress = AttendanceProgress()
+on_tables_changed(attendance_progress.invalidate)
+
+Gauge(
+    "attendance_marks_per_minute",
+    "Attendance marks committed in the last 60 seconds",
+    collect=lambda: {(): attendance_progress.marks_last_minute()},
+)
+Gauge(
+    "attendance_present_students",
+    "Students currently marked present",
+    ("program_type",),
+    collect=lambda: {
+        (attendance_progress.program_type_names.get(pt_id, "unknown"),): count
+        for pt_id, count in attendance_progress.present_by_program_type.items()
+    },
+)
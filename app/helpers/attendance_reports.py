@@ -0,0 +1,184 @@
+"""
+Attendance report files: the present students PDF and the CSV export.
+
+Both are built from a ReferenceSnapshot and a RosterStore, either the live
+ones or a copy (a frozen snapshot, app/helpers/attendance_freeze.py, or the
+pre-warm's, app/helpers/prewarm.py). A copy never changes, so its files can
+be rendered off the event loop:
+
+    pdfs, export = await asyncio.to_thread(render_reports, ref, roster.copy())
+
+The routes cache finished files in response_cache under PDF_CACHE_KEY and
+EXPORT_CACHE_KEY, tagged with REPORT_TABLES.
+"""
+import csv
+from io import BytesIO, StringIO
+from typing import Dict, List, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from app.helpers.reference_data import ClassRecord, ReferenceSnapshot
+from app.helpers.roster import RosterStore
+
+REPORT_TABLES = ("classes", "class_names", "program_types", "students")
+PDF_CACHE_KEY = "report:present-students:{}"
+EXPORT_CACHE_KEY = "export:attendance"
+
+PDF_HEADERS = {"Content-Disposition": "attachment; filename=present_students_report.pdf"}
+CSV_HEADERS = {"Content-Disposition": "attachment; filename=attendance.csv"}
+
+EXPORT_COLUMNS = (
+    "roll_number", "name", "gender", "class_name", "department", "section", "program_type", "present",
+)
+
+
+def report_classes(ref: ReferenceSnapshot, program_type: Optional[str] = None) -> List[ClassRecord]:
+    """The classes a report covers, by class name."""
+    classes = sorted(ref.classes.values(), key=lambda cls: cls.class_name or "")
+    if program_type:
+        classes = [cls for cls in classes if cls.program_type == program_type.upper()]
+    return classes
+
+
+def present_students_pdf(classes: List[ClassRecord], roster: RosterStore) -> Optional[bytes]:
+    """The present students report, or None when no PG or UG class is listed."""
+    pg_classes = [cls for cls in classes if cls.program_type == "PG"]
+    ug_classes = [cls for cls in classes if cls.program_type == "UG"]
+
+    # -------------------------
+    # PDF Setup
+    # -------------------------
+    buffer = BytesIO()
+    pdf = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=30,
+        rightMargin=30,
+        topMargin=30,
+        bottomMargin=30,
+    )
+
+    styles = getSampleStyleSheet()
+    elements = []
+
+    # -------------------------
+    # Title
+    # -------------------------
+    title_style = ParagraphStyle(
+        "TitleStyle",
+        parent=styles["Title"],
+        alignment=1,
+        textColor=colors.darkblue
+    )
+
+    section_style = ParagraphStyle(
+        "SectionStyle",
+        parent=styles["Heading2"],
+        textColor=colors.HexColor("#1F4E79"),
+        spaceBefore=20,
+        spaceAfter=10
+    )
+
+    elements.append(Paragraph("Present Students Report", title_style))
+    elements.append(Spacer(1, 20))
+
+    # -------------------------
+    # Function to render class tables
+    # -------------------------
+    def render_classes(class_list):
+        for cls in class_list:
+            students = roster.class_roster(cls.id).present_students()
+
+            if not students:
+                continue
+
+            # Class info (NO program here)
+            class_info = f"""
+            <b>Class:</b> {cls.class_name} &nbsp;&nbsp;
+            <b>Section:</b> {cls.section or '-'}
+            """
+
+            elements.append(Paragraph(class_info, styles["Normal"]))
+            elements.append(Spacer(1, 8))
+
+            table_data = [["Roll No", "Student Name"]]
+            for s in students:
+                table_data.append([s.roll_number, s.name])
+
+            table = Table(
+                table_data,
+                colWidths=[90, 260, 90],
+                repeatRows=1
+            )
+
+            table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2F5597")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+
+            ("ALIGN", (0, 1), (0, -1), "CENTER"),  # Roll No
+            ("ALIGN", (1, 1), (1, -1), "LEFT"),    # Student Name
+
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("BACKGROUND", (0, 1), (-1, -1), colors.whitesmoke),
+        ]))
+
+
+            elements.append(table)
+            elements.append(Spacer(1, 25))
+
+    # -------------------------
+    # Render PG section
+    # -------------------------
+    if pg_classes:
+        elements.append(Paragraph("PG Classes", section_style))
+        render_classes(pg_classes)
+
+    # -------------------------
+    # Render UG section
+    # -------------------------
+    if ug_classes:
+        elements.append(Paragraph("UG Classes", section_style))
+        render_classes(ug_classes)
+
+    if len(elements) <= 2:
+        return None
+
+    # -------------------------
+    # Build PDF
+    # -------------------------
+    pdf.build(elements)
+    return buffer.getvalue()
+
+
+def attendance_csv(ref: ReferenceSnapshot, roster: RosterStore) -> bytes:
+    """Every student's attendance, class by class in roll number order."""
+    out = StringIO()
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    for cls in report_classes(ref):
+        for s in roster.class_roster(cls.id).students:
+            writer.writerow((
+                s.roll_number, s.name, s.gender, cls.class_name, cls.department,
+                cls.section or "", cls.program_type, "yes" if s.present else "no",
+            ))
+    return out.getvalue().encode()
+
+
+def render_reports(ref: ReferenceSnapshot, roster: RosterStore) -> Tuple[Dict[str, bytes], bytes]:
+    """
+    Every present students PDF, by upper-case program type ("" for all;
+    left out when it would be empty), and the CSV export.
+    """
+    pdfs = {}
+    for key in [""] + [name.upper() for name in ref.program_types_by_name]:
+        body = present_students_pdf(report_classes(ref, key), roster)
+        if body is not None:
+            pdfs[key] = body
+    return pdfs, attendance_csv(ref, roster)
@@ -1,19 +1,235 @@
-from fastapi import HTTPException
-from datetime import datetime, time
+"""
+Attendance windows.
+
+Marking is allowed during the attendance sessions admins configure
+(attendance_sessions: rehearsal, ceremony day 1, day 2...), each for every
+class or only one program type and/or department, so windows can be
+staggered to spread the load. With no session configured the fixed daily
+12:05 PM - 1:15 PM IST window applies.
+
+Sessions are cached like the reference data: loaded once, and again on the
+first read after a commit writes attendance_sessions or classes. Each
+class's windows are precomputed as merged (start, end) timestamps, so a
+check is one bisect and no query.
+
+    schedule = await attendance_windows.get(db)
+    check_attendance_time_limit(schedule)            # is any window open?
+    check_attendance_time_limit(schedule, class_id)  # is this class's open?
+    check_attendance_time_limit(schedule, class_id, at)  # was it open at `at`?
+    check_synced_in_time(schedule, class_id, at, now)    # an offline mark, uploaded in time?
+"""
+import asyncio
+import bisect
+import time as clock
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
 import pytz
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ATTENDANCE_SYNC_GRACE_SECONDS, ENFORCE_ATTENDANCE_WINDOW
+from app.helpers.data_changes import on_tables_changed, table_versions
+from app.helpers.reference_data import ReferenceSnapshot, reference_data
+from app.models import AttendanceSession
+
+IST = pytz.timezone("Asia/Kolkata")
+WINDOW_START = time(12, 5, 0)   # 12:05 PM IST
+WINDOW_END = time(13, 15, 0)    # 1:15 PM IST
+
+WINDOW_TABLES = ("attendance_sessions", "classes")
+
+
+def window_end_today() -> datetime:
+    """When today's daily marking window closes (IST, timezone-aware)."""
+    return IST.localize(datetime.combine(datetime.now(IST).date(), WINDOW_END))
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite hands DateTime columns back naive; they are stored in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class SessionRecord:
+    __slots__ = ("id", "name", "starts_at", "ends_at", "program_type_id", "department")
+
+    def __init__(self, id, name: str, starts_at: float, ends_at: float, program_type_id, department):
+        self.id = id
+        self.name = name
+        self.starts_at = starts_at
+        self.ends_at = ends_at
+        self.program_type_id = program_type_id
+        self.department = department
+
+    def covers(self, cls) -> bool:
+        return (self.program_type_id in (None, cls.program_type_id)
+                and self.department in (None, cls.department))
+
+
+class Windows:
+    """Non-overlapping (start, end) timestamps, sorted."""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals: Iterable[Tuple[float, float]]):
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def is_open(self, at: float) -> bool:
+        return self.closes_at(at) is not None
+
+    def closes_at(self, at: float) -> Optional[float]:
+        """The end of the window open at `at`; None when none was."""
+        i = bisect.bisect_right(self.starts, at) - 1
+        return self.ends[i] if i >= 0 and at <= self.ends[i] else None
+
+
+NO_WINDOWS = Windows(())
+
+
+class WindowSchedule:
+    """One consistent, read-only view of the attendance sessions."""
+
+    def __init__(self, sessions: List[SessionRecord], ref: ReferenceSnapshot):
+        self.sessions = sorted(sessions, key=lambda s: s.starts_at)
+        self.any = Windows((s.starts_at, s.ends_at) for s in self.sessions)
+        self.sessions_by_class: Dict[object, List[SessionRecord]] = {
+            cls.id: [s for s in self.sessions if s.covers(cls)] for cls in ref.classes.values()
+        }
+        self.by_class: Dict[object, Windows] = {
+            class_id: Windows((s.starts_at, s.ends_at) for s in sessions)
+            for class_id, sessions in self.sessions_by_class.items()
+        }
+
+    def is_open(self, class_id=None, at: Optional[float] = None) -> bool:
+        """Whether marking is open now (or `at`), for the class or for any class."""
+        if not self.sessions:
+            now = datetime.now(IST) if at is None else datetime.fromtimestamp(at, IST)
+            return WINDOW_START <= now.time() <= WINDOW_END
+        windows = self.any if class_id is None else self.by_class.get(class_id, NO_WINDOWS)
+        return windows.is_open(clock.time() if at is None else at)
+
+    def closes_at(self, class_id, at: float) -> Optional[float]:
+        """When the class's window open at `at` closed (or closes); None when it wasn't open."""
+        if not self.sessions:
+            then = datetime.fromtimestamp(at, IST)
+            if not WINDOW_START <= then.time() <= WINDOW_END:
+                return None
+            return IST.localize(datetime.combine(then.date(), WINDOW_END)).timestamp()
+        return self.by_class.get(class_id, NO_WINDOWS).closes_at(at)
+
+    def session_at(self, class_id, at: Optional[float] = None) -> Optional[int]:
+        """The id of the class's session open now (or `at`); None outside sessions."""
+        at = clock.time() if at is None else at
+        for session in self.sessions_by_class.get(class_id, ()):
+            if session.starts_at <= at <= session.ends_at:
+                return session.id
+        return None
+
+    def next_opening(self, after: float) -> Optional[float]:
+        """When a window next opens after `after` (None: no session left)."""
+        if not self.sessions:
+            day = datetime.fromtimestamp(after, IST).date()
+            for _ in range(2):
+                opens = IST.localize(datetime.combine(day, WINDOW_START)).timestamp()
+                if opens > after:
+                    return opens
+                day += timedelta(days=1)
+        i = bisect.bisect_right(self.any.starts, after)
+        return self.any.starts[i] if i < len(self.any.starts) else None
+
+    def last_close(self) -> float:
+        """When marking closes for good: today's window, or the last session's."""
+        if not self.sessions:
+            return window_end_today().timestamp()
+        return self.any.ends[-1]
+
+
+class AttendanceWindows:
+    def __init__(self):
+        self._schedule: Optional[WindowSchedule] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, tables: frozenset):
+        if not tables.isdisjoint(WINDOW_TABLES):
+            self._schedule = None
+
+    async def load(self, db: AsyncSession) -> WindowSchedule:
+        versions = table_versions(WINDOW_TABLES)
+        ref = await reference_data.get(db)
+        db.info["use_primary"] = True
+        result = await db.execute(select(
+            AttendanceSession.id, AttendanceSession.name, AttendanceSession.starts_at,
+            AttendanceSession.ends_at, AttendanceSession.program_type_id, AttendanceSession.department,
+        ))
+        schedule = WindowSchedule([
+            SessionRecord(row.id, row.name, _timestamp(row.starts_at), _timestamp(row.ends_at),
+                          row.program_type_id, row.department)
+            for row in result
+        ], ref)
+
+        # A write committed while loading: serve this one, load again next time
+        if table_versions(WINDOW_TABLES) == versions:
+            self._schedule = schedule
+        return schedule
+
+    async def get(self, db: AsyncSession) -> WindowSchedule:
+        schedule = self._schedule
+        if schedule is not None:
+            return schedule
+        async with self._lock:
+            return self._schedule or await self.load(db)
+
+
+attendance_windows = AttendanceWindows()
+on_tables_changed(attendance_windows.invalidate)
+
 
 # -------------------------
-# Helper: Check IST Time Limit (Before 10:00 AM)
+# Helper: Check the attendance window
 # -------------------------
-def check_attendance_time_limit():
-    ist = pytz.timezone("Asia/Kolkata")
-    now_ist = datetime.now(ist).time()
+def check_attendance_time_limit(schedule: WindowSchedule, class_id=None, at: Optional[float] = None):
+    if not ENFORCE_ATTENDANCE_WINDOW:
+        return
 
-    start_time = time(12, 5, 0)   # 12:05 PM IST
-    end_time = time(13, 15, 0)    # 1:15 PM IST
+    if schedule.is_open(class_id, at):
+        return
 
-    if not (start_time <= now_ist <= end_time):
+    if not schedule.sessions:
         raise HTTPException(
             status_code=403,
             detail="Attendance marking is allowed only from 12:05 PM to 1:15 PM IST"
-        )
\ No newline at end of file
+        )
+    raise HTTPException(
+        status_code=403,
+        detail=("Attendance marking was not open for this class then" if at is not None
+                else "Attendance marking is not open for this class now") if class_id
+        else "Attendance marking is allowed only during an attendance session"
+    )
+
+
+def check_synced_in_time(schedule: WindowSchedule, class_id, at: float, now: float):
+    """
+    An offline mark made at `at` is taken only until ATTENDANCE_SYNC_GRACE_SECONDS
+    after the class's window it was made in closed: the device's clock is the
+    only witness of `at`, so a mark dated back into a window long closed is
+    refused rather than trusted.
+    """
+    if not ENFORCE_ATTENDANCE_WINDOW:
+        return
+
+    closes = schedule.closes_at(class_id, at)
+    if closes is not None and now > closes + ATTENDANCE_SYNC_GRACE_SECONDS:
+        raise HTTPException(
+            status_code=403,
+            detail="The attendance window this mark was made in closed too long ago to sync"
+        )
@@ -1,59 +1,98 @@
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List,Optional
+from typing import Iterable, List, Optional
 import uuid
 
 from app.models import Class,ClassName
 
-async def get_classes_from_request(
-    db: AsyncSession, ids: Optional[List[str]] = None, names: Optional[List[str]] = None
-) -> List[Class]:
-    classes = []
-    count:int=0
 
-    invalid_ids = []
+def _as_uuid(class_id) -> uuid.UUID:
+    return class_id if isinstance(class_id, uuid.UUID) else uuid.UUID(class_id)
+
+
+class ClassLookup:
+    """
+    The classes a batch of staff refers to, by id and by name, loaded in at
+    most two queries however many staff the batch has.
+    """
+
+    def __init__(self, by_id: dict, by_name: dict):
+        self.by_id = by_id
+        self.by_name = by_name
 
-    # If UUIDs provided
-    if ids:
+    @classmethod
+    async def load(cls, db: AsyncSession, ids: Iterable = (), names: Iterable[str] = ()) -> "ClassLookup":
+        # Invalid ids are reported by resolve(), for the staff that sent them
+        valid_ids = set()
         for class_id in ids:
-            count+=1
             try:
-                class_bytes = uuid.UUID(class_id)
-                print(f"{count} Id:{class_bytes}")
+                valid_ids.add(_as_uuid(class_id))
             except (ValueError, TypeError):
-                invalid_ids.append(class_id)
                 continue
 
-            result = await db.execute(select(Class).where(Class.id == class_bytes))
-            cls = result.scalars().first()
-            if not cls:
-                raise HTTPException(status_code=404, detail=f"Class with id {class_id} not found")
-            classes.append(cls)
+        by_id = {}
+        if valid_ids:
+            result = await db.execute(select(Class).where(Class.id.in_(valid_ids)))
+            by_id = {c.id: c for c in result.scalars()}
 
-        if invalid_ids:
-            raise HTTPException(
-                status_code=400,
-                detail=f"The following class IDs are not valid UUIDs: {invalid_ids}"
-            )
-
-    # If class names provided
-    if names:
-        for class_name in names:
+        by_name = {}
+        names = set(names)
+        if names:
             result = await db.execute(
-                select(Class).join(Class.class_name_ref).where(ClassName.name == class_name)
+                select(Class, ClassName.name).join(Class.class_name_ref).where(ClassName.name.in_(names))
             )
-            matched_classes = result.scalars().all()
-            if len(matched_classes) > 1:
+            for c, name in result:
+                by_name.setdefault(name, []).append(c)
+
+        return cls(by_id, by_name)
+
+    def resolve(self, ids: Optional[List[str]] = None, names: Optional[List[str]] = None) -> List[Class]:
+        classes = []
+
+        invalid_ids = []
+
+        # If UUIDs provided
+        if ids:
+            for class_id in ids:
+                try:
+                    class_bytes = _as_uuid(class_id)
+                except (ValueError, TypeError):
+                    invalid_ids.append(class_id)
+                    continue
+
+                cls = self.by_id.get(class_bytes)
+                if not cls:
+                    raise HTTPException(status_code=404, detail=f"Class with id {class_id} not found")
+                classes.append(cls)
+
+            if invalid_ids:
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Duplicate class names found for '{class_name}' (count: {len(matched_classes)})"
+                    detail=f"The following class IDs are not valid UUIDs: {invalid_ids}"
                 )
-            if not matched_classes:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"No class found with name '{class_name}'"
-                )
-            classes.append(matched_classes[0])
 
-    return classes
\ No newline at end of file
+        # If class names provided
+        if names:
+            for class_name in names:
+                matched_classes = self.by_name.get(class_name, [])
+                if len(matched_classes) > 1:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Duplicate class names found for '{class_name}' (count: {len(matched_classes)})"
+                    )
+                if not matched_classes:
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"No class found with name '{class_name}'"
+                    )
+                classes.append(matched_classes[0])
+
+        return classes
+
+
+async def get_classes_from_request(
+    db: AsyncSession, ids: Optional[List[str]] = None, names: Optional[List[str]] = None
+) -> List[Class]:
+    lookup = await ClassLookup.load(db, ids or (), names or ())
+    return lookup.resolve(ids, names)
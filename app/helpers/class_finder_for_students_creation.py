@@ -1,7 +1,7 @@
-from sqlalchemy.future import select
+from sqlalchemy.exc import MultipleResultsFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_
-from app.models import Class, ClassName, ProgramType
+
+from app.helpers.reference_data import ClassRecord, reference_data
 
 
 async def get_class_object(
@@ -10,30 +10,16 @@ async def get_class_object(
     program_type: str | None = None,
     department: str | None = None,
     section: str | None = None
-):
-    # Base query
-    query = (
-        select(Class)
-        .join(ClassName, Class.class_name_id == ClassName.id)
-        .join(ProgramType, Class.program_type_id == ProgramType.id)
-        .where(ClassName.name == class_name)   # class_name is mandatory
-    )
-
-    # Add filters ONLY if values are provided
-    conditions = []
-
-    if program_type:
-        conditions.append(ProgramType.type_name == program_type)
-
-    if department:
-        conditions.append(Class.department == department)
-
-    if section:
-        conditions.append(Class.section == section)
-
-    # Apply dynamic conditions
-    if conditions:
-        query = query.where(and_(*conditions))
-
-    result = await db.execute(query)
-    return result.scalar_one_or_none()
+) -> ClassRecord | None:
+    # class_name is mandatory, the other filters apply ONLY if values are provided
+    ref = await reference_data.get(db)
+    matches = [
+        c for c in ref.classes_by_name.get(class_name, ())
+        if (not program_type or c.program_type == program_type)
+        and (not department or c.department == department)
+        and (not section or c.section == section)
+    ]
+
+    if len(matches) > 1:
+        raise MultipleResultsFound("Multiple rows were found when one or none was required")
+    return matches[0] if matches else None
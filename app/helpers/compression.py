@@ -0,0 +1,117 @@
+"""
+gzip / brotli response compression.
+
+CompressionMiddleware compresses single-chunk responses (JSONResponse,
+HTMLResponse, ...) of a compressible type once they reach
+COMPRESSION_MIN_SIZE. Streaming responses and responses that already carry
+a Content-Encoding (e.g. precompressed cache entries) pass through.
+brotli is optional: without the package only gzip is offered.
+"""
+import asyncio
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import BROTLI_QUALITY, COMPRESSION_MIN_SIZE, COMPRESSION_OFFLOAD_SIZE, GZIP_LEVEL
+from app.helpers.metrics import Counter
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+response_compression_bytes_saved = Counter(
+    "response_compression_saved_bytes_total",
+    "Bytes not sent thanks to response compression",
+    ("encoding",),
+)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header (q=0 means refused)."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def is_compressible(media_type: Optional[str], size: int) -> bool:
+    return size >= COMPRESSION_MIN_SIZE and bool(media_type) and media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+async def compress_async(body: bytes, encoding: str) -> bytes:
+    # zlib and brotli release the GIL, so large bodies don't hold the loop
+    if len(body) > COMPRESSION_OFFLOAD_SIZE:
+        return await asyncio.to_thread(compress, body, encoding)
+    return compress(body, encoding)
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        encoding = None
+        if scope["type"] == "http":
+            encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type"), len(body))
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = await compress_async(body, encoding)
+            response_compression_bytes_saved.inc(len(body) - len(compressed), encoding=encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            passthrough = True
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,156 @@
+"""
+Which tables a committed transaction wrote to.
+
+Every Session records the tables it inserts into, updates or deletes from
+(flushed objects, secondary tables of changed relationships and bulk
+statements). After a successful commit the set is handed to the callbacks
+registered with on_tables_changed, so caches built from those tables can
+drop their entries, and each table's version counter goes up. Rolled-back
+changes are never published.
+
+Tables with an on_rows_changed listener also report which rows changed,
+with the values the session had loaded for them, so in-memory indexes can
+follow writes row by row.
+
+Students are also versioned per class, so a class roster only changes
+version when a student of that class is written. Bulk statements on a
+partitioned table can't be attributed to a class and move every partition.
+
+Versions live in this process and start from zero on every boot; anything
+handed to clients (ETags) must include BOOT_ID.
+"""
+import uuid
+from itertools import chain
+from typing import Callable, FrozenSet, Iterable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, attributes
+
+BOOT_ID = uuid.uuid4().hex[:8]
+
+# Tables versioned per value of one of their columns
+PARTITION_COLUMNS = {"students": "class_id"}
+
+_listeners = []
+_row_listeners = {}
+_versions = {}
+_partition_versions = {}
+# Writes to a partitioned table that could not be attributed to a partition
+_unattributed_versions = {}
+
+
+def on_tables_changed(callback: Callable[[FrozenSet[str]], None]):
+    _listeners.append(callback)
+    return callback
+
+
+def on_rows_changed(table: str, callback: Callable[[Optional[dict]], None]):
+    """
+    callback(changes) after each commit that wrote `table`: changes maps a
+    primary key to the row's loaded column values, or to None once deleted.
+    It is None when the writes can't be attributed to rows (bulk statements).
+    """
+    _row_listeners.setdefault(table, []).append(callback)
+    return callback
+
+
+def table_versions(tables: Iterable[str]) -> tuple:
+    """Current version of each table; changes whenever one of them is written."""
+    return tuple(_versions.get(table, 0) for table in tables)
+
+
+def partition_versions(table: str, keys: Iterable) -> tuple:
+    """Version of the rows of `table` with these partition keys (e.g. class ids)."""
+    return (_unattributed_versions.get(table, 0),) + tuple(
+        _partition_versions.get((table, key), 0) for key in keys
+    )
+
+
+def _pending(session, name: str) -> set:
+    return session.info.setdefault(name, set())
+
+
+def _collect_row(session, obj, mapper, table: str):
+    changed_rows = session.info.setdefault("changed_rows", {})
+    if table in changed_rows and changed_rows[table] is None:
+        return
+    rows = changed_rows.setdefault(table, {})
+    state = inspect(obj)
+    key = state.dict.get(mapper.get_property_by_column(mapper.primary_key[0]).key)
+    if obj in session.deleted:
+        rows[key] = None
+    else:
+        rows[key] = {
+            prop.key: state.dict[prop.key] for prop in mapper.column_attrs if prop.key in state.dict
+        }
+
+
+def _collect_partitions(session, obj, table: str):
+    column = PARTITION_COLUMNS.get(table)
+    if column is None:
+        return
+    history = attributes.get_history(obj, column, passive=attributes.PASSIVE_NO_INITIALIZE)
+    keys = set(history.sum())
+    if not keys:
+        _pending(session, "unattributed_tables").add(table)
+    for key in keys:
+        _pending(session, "changed_partitions").add((table, key))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed(session, flush_context):
+    tables = _pending(session, "changed_tables")
+    for obj in chain(session.new, session.dirty, session.deleted):
+        mapper = inspect(obj).mapper
+        table = mapper.local_table.name
+        # Objects only dirty through a collection (the other side of a
+        # many-to-many, say) had their own row left alone
+        if obj not in session.dirty or session.is_modified(obj, include_collections=False):
+            tables.add(table)
+            _collect_partitions(session, obj, table)
+            if table in _row_listeners:
+                _collect_row(session, obj, mapper, table)
+        for relationship in mapper.relationships:
+            if relationship.secondary is not None and (
+                obj in session.deleted
+                or attributes.get_history(
+                    obj, relationship.key, passive=attributes.PASSIVE_NO_INITIALIZE
+                ).has_changes()
+            ):
+                tables.add(relationship.secondary.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table.name
+        _pending(orm_execute_state.session, "changed_tables").add(table)
+        if table in PARTITION_COLUMNS:
+            _pending(orm_execute_state.session, "unattributed_tables").add(table)
+        if table in _row_listeners:
+            orm_execute_state.session.info.setdefault("changed_rows", {})[table] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session):
+    tables = session.info.pop("changed_tables", None)
+    for key in session.info.pop("changed_partitions", ()):
+        _partition_versions[key] = _partition_versions.get(key, 0) + 1
+    for table in session.info.pop("unattributed_tables", ()):
+        _unattributed_versions[table] = _unattributed_versions.get(table, 0) + 1
+    for table, rows in session.info.pop("changed_rows", {}).items():
+        for callback in _row_listeners[table]:
+            callback(rows)
+
+    if tables:
+        changed = frozenset(tables)
+        for table in changed:
+            _versions[table] = _versions.get(table, 0) + 1
+        for callback in _listeners:
+            callback(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    for name in ("changed_tables", "changed_partitions", "unattributed_tables", "changed_rows"):
+        session.info.pop(name, None)
@@ -0,0 +1,153 @@
+"""
+Strong ETags for listing routes, derived from data versions.
+
+A listing route declares which tables its body is built from:
+
+    @router.get("/list-classes", dependencies=[data_etag(*CLASS_TABLES)])
+
+The dependency hashes the path, the query string and the current versions
+of those tables (app/helpers/data_changes.py) into an ETag. When the
+client's If-None-Match already has it, the request ends with 304 before
+the route runs a query; otherwise ETagMiddleware puts the ETag on the 200.
+Versions are read before the route's queries, so a write that commits
+while the body is being built changes the ETag of the next request. The
+versions count the primary's commits, so the dependency also points the
+request's read session at the primary: a body read from a lagging replica
+would otherwise go out under an ETag that claims newer data.
+
+Compressed bodies get the encoding appended ("...-br"), as a strong ETag
+must differ per representation; If-None-Match accepts any of them.
+
+Routes that read attendance through attendance_view opt in with
+frozen=True: while attendance is frozen (app/helpers/attendance_freeze.py)
+the snapshot stands in for the student and reference table versions, and
+the response may be reused for FROZEN_CACHE_MAX_AGE without asking again.
+"""
+import hashlib
+import uuid
+from typing import Optional
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+
+from app.auth.dependencies import get_current_user
+from app.config import FROZEN_CACHE_MAX_AGE
+from app.database import get_read_db
+from app.helpers.attendance_freeze import FROZEN_TABLES, attendance_freeze
+from app.helpers.data_changes import BOOT_ID, partition_versions, table_versions
+from app.helpers.roster import assigned_class_ids
+from app.models import User, UserRole
+
+
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str, cache_control: str = DEFAULT_CACHE_CONTROL):
+        self.etag = etag
+        self.cache_control = cache_control
+
+
+async def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": exc.cache_control})
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The If-None-Match entry that matches `etag` or one of its encoded variants."""
+    if not if_none_match:
+        return None
+    encoded_prefix = etag[:-1] + "-"
+    for token in if_none_match.split(","):
+        token = token.strip()
+        if token == "*":
+            return etag
+        if token.startswith("W/"):
+            token = token[2:]
+        if token == etag or (token.startswith(encoded_prefix) and token.endswith('"')):
+            return token
+    return None
+
+
+def data_etag(*tables: str, per_user: bool = False, students_of: Optional[str] = None, frozen: bool = False):
+    """
+    Dependency that makes the route conditional on these tables' versions.
+
+    per_user: the body depends on who is asking.
+    students_of="path": the body holds the students of the {class_id} path
+    parameter; "assigned": of the caller's assigned classes (every class
+    for admins).
+    frozen: the body comes from attendance_view, so a frozen snapshot
+    replaces the students_of part and FROZEN_TABLES.
+    """
+
+    async def dependency(
+        request: Request,
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_read_db),
+    ):
+        # The route shares this session: its body is read where the versions are
+        db.info["use_primary"] = True
+        snapshot = attendance_freeze.snapshot if frozen else None
+        if snapshot is None:
+            parts = [request.url.path, request.url.query, table_versions(tables)]
+            students = students_of
+            cache_control = DEFAULT_CACHE_CONTROL
+        else:
+            # The snapshot holds every student: its token covers students_of too
+            live_tables = tuple(table for table in tables if table not in FROZEN_TABLES)
+            parts = [request.url.path, request.url.query, table_versions(live_tables), snapshot.token]
+            students = None
+            cache_control = f"private, max-age={FROZEN_CACHE_MAX_AGE}"
+        if per_user:
+            parts.append(current_user.id)
+
+        if students == "path":
+            try:
+                class_id = uuid.UUID(request.path_params["class_id"])
+            except ValueError:
+                return  # the route answers 400
+            parts.append(partition_versions("students", (class_id,)))
+        elif students == "assigned":
+            if current_user.role == UserRole.admin:
+                parts.append(table_versions(("students",)))
+            else:
+                class_ids = await assigned_class_ids(db, current_user.id)
+                parts.append(partition_versions("students", class_ids))
+
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=10).hexdigest()
+        etag = f'"{BOOT_ID}-{digest}"'
+
+        matched = matching_etag(request.headers.get("if-none-match"), etag)
+        if matched:
+            raise NotModified(matched, cache_control)
+        request.state.etag = etag
+        request.state.cache_control = cache_control
+
+    return Depends(dependency)
+
+
+class ETagMiddleware:
+    """Adds the ETag chosen by data_etag to successful responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                state = scope.get("state", {})
+                etag = state.get("etag")
+                if etag:
+                    headers = MutableHeaders(scope=message)
+                    encoding = headers.get("content-encoding")
+                    headers["ETag"] = f'{etag[:-1]}-{encoding}"' if encoding else etag
+                    headers["Cache-Control"] = state.get("cache_control", DEFAULT_CACHE_CONTROL)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
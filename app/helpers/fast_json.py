@@ -0,0 +1,47 @@
+"""
+Fast path for large listing responses.
+
+Routes that build their payload from column-projected rows can return
+trusted_json(...) instead of going through response_model: FastAPI then
+skips re-validating every row and the body is serialized with orjson
+(UUIDs, enums and datetimes natively). The route keeps its response_model
+for the OpenAPI docs; in development the rendered body is still checked
+against it with a TypeAdapter that is built once per model.
+"""
+import json
+from functools import lru_cache
+from typing import Any, Optional
+
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from app.config import APP_ENV
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback, same output, slower
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _adapter(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def trusted_json(content: Any, model: Optional[type] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Response for payloads built by the route itself from database rows.
+    `model` is the route's response_model, only validated in development.
+    """
+    response = FastJSONResponse(content, status_code=status_code)
+    if model is not None and APP_ENV == "development":
+        # Check what the client will actually receive
+        _adapter(model).validate_json(response.body)
+    return response
@@ -0,0 +1,249 @@
+"""
+Idempotency-Key support for every mutating request (single worker).
+
+A client that may retry a POST / PUT / PATCH / DELETE sends a key of its
+own choosing with it:
+
+    Idempotency-Key: 6f1c...   (any string up to 255 characters)
+
+The first request with a key runs as usual and its response is kept for
+IDEMPOTENCY_TTL_SECONDS, keyed by the caller (the token's user) and the
+key; past IDEMPOTENCY_MAX_ENTRIES keys or IDEMPOTENCY_MAX_BYTES of kept
+bodies the oldest responses are dropped early, never a request still
+running. A retry gets the kept response back, marked `Idempotent-Replayed:
+true`, without reaching the route or the database; a retry sent while the
+first is still running waits for it. Reusing a key for a different request
+(method, path, query or body) is refused with 422. Only successes (2xx)
+and the errors a retry would get again (400, 404, 422) are kept: anything
+else may clear by itself (403 outside the attendance window, 409 while
+attendance is frozen, 429, server errors), so its retry runs again.
+
+Requests without a key, or without a valid token (logins), are not
+touched.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from jose import JWTError
+from starlette.datastructures import Headers
+
+from app.auth.jwt import decode_access_token
+from app.config import IDEMPOTENCY_MAX_BYTES, IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_TTL_SECONDS
+from app.helpers.fast_json import FastJSONResponse
+from app.helpers.metrics import Counter
+
+IDEMPOTENT_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+MAX_KEY_LENGTH = 255
+
+# Per-execution headers that must not be replayed
+_NOT_KEPT = frozenset((b"server-timing", b"date"))
+# Errors that don't depend on when the request runs
+_KEPT_ERRORS = frozenset((400, 404, 422))
+
+idempotent_requests_total = Counter(
+    "idempotent_requests_total",
+    "Requests sent with an Idempotency-Key, by what happened to them",
+    ("outcome",),
+)
+
+
+class KeptResponse:
+    __slots__ = ("fingerprint", "expires_at", "done", "status", "headers", "body")
+
+    def __init__(self, fingerprint: str, expires_at: float):
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        # True once the response is kept, False if the first run gave up
+        self.done = asyncio.get_running_loop().create_future()
+        self.status: Optional[int] = None
+        self.headers: List[Tuple[bytes, bytes]] = []
+        self.body = b""
+
+
+class IdempotencyStore:
+    """Bounded, TTL'd store of responses, oldest first."""
+
+    def __init__(self, max_entries: int, ttl: float, max_bytes: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, KeptResponse]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: tuple) -> Optional[KeptResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._drop(key, entry)
+            return None
+        return entry
+
+    def begin(self, key: tuple, fingerprint: str) -> KeptResponse:
+        now = time.monotonic()
+        self._evict(now, self.max_entries - 1)
+        entry = self._entries[key] = KeptResponse(fingerprint, now + self.ttl)
+        return entry
+
+    def finish(self, key: tuple, entry: KeptResponse, status: int, headers, body: bytes):
+        if len(body) > self.max_bytes:
+            # Replayed to the retries already waiting, not kept for later ones
+            self._drop(key, entry)
+        elif self._entries.get(key) is entry:
+            self._bytes += len(body)
+        entry.status = status
+        entry.headers = [(name, value) for name, value in headers if name.lower() not in _NOT_KEPT]
+        entry.body = body
+        entry.done.set_result(True)
+        self._evict(time.monotonic(), self.max_entries)
+
+    def abandon(self, key: tuple, entry: KeptResponse):
+        """The first run failed: let the next retry run again."""
+        self._drop(key, entry)
+        if not entry.done.done():
+            entry.done.set_result(False)
+
+    def _evict(self, now: float, max_entries: int):
+        # Every entry lives as long, so the expired ones are at the front,
+        # then the oldest; a running request's entry stays whatever the
+        # limits, its retries are waiting on it
+        evicted = []
+        count, size = len(self._entries), self._bytes
+        for key, entry in self._entries.items():
+            if entry.expires_at > now and count <= max_entries and size <= self.max_bytes:
+                break
+            if entry.done.done():
+                evicted.append((key, entry))
+                count -= 1
+                size -= len(entry.body)
+        for key, entry in evicted:
+            self._drop(key, entry)
+
+    def _drop(self, key: tuple, entry: KeptResponse):
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+            self._bytes -= len(entry.body)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+idempotency_store = IdempotencyStore(IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_BYTES)
+
+
+def _kept(status: int) -> bool:
+    return 200 <= status < 300 or status in _KEPT_ERRORS
+
+
+def _principal(authorization: Optional[str]) -> Optional[str]:
+    """The token's user, without a database lookup; None without a valid token."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return decode_access_token(authorization[7:]).get("user_id")
+    except JWTError:
+        return None
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+async def _send_error(send, status: int, detail: str):
+    response = FastJSONResponse({"detail": detail}, status_code=status)
+    await send({"type": "http.response.start", "status": status, "headers": response.raw_headers})
+    await send({"type": "http.response.body", "body": response.body})
+
+
+async def _replay(send, entry: KeptResponse):
+    await send({
+        "type": "http.response.start",
+        "status": entry.status,
+        "headers": entry.headers + [(b"idempotent-replayed", b"true")],
+    })
+    await send({"type": "http.response.body", "body": entry.body})
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get("idempotency-key")
+        principal = _principal(headers.get("authorization")) if idempotency_key else None
+        if principal is None:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await _send_error(send, 400, f"Idempotency-Key is longer than {MAX_KEY_LENGTH} characters")
+            return
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.sha256(b"\n".join((
+            scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body,
+        ))).hexdigest()
+        key = (principal, idempotency_key)
+
+        while True:
+            entry = idempotency_store.get(key)
+            if entry is None:
+                break
+            if entry.fingerprint != fingerprint:
+                idempotent_requests_total.inc(outcome="conflict")
+                await _send_error(send, 422, "Idempotency-Key was already used for a different request")
+                return
+            if not entry.done.done():
+                idempotent_requests_total.inc(outcome="waited")
+            # Shielded: a waiter going away must not cancel the first run's future
+            if await asyncio.shield(entry.done):
+                idempotent_requests_total.inc(outcome="replayed")
+                await _replay(send, entry)
+                return
+            # The first run gave up: run again (the first waiter to get here does)
+
+        idempotent_requests_total.inc(outcome="executed")
+        entry = idempotency_store.begin(key, fingerprint)
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        start, chunks = None, []
+
+        async def send_and_keep(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and _kept(start["status"]):
+                    idempotency_store.finish(key, entry, start["status"], start["headers"], b"".join(chunks))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_and_keep)
+        finally:
+            if not entry.done.done():
+                idempotency_store.abandon(key, entry)
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from app.config import LOOP_MONITOR_INTERVAL, LOOP_BLOCK_THRESHOLD_MS
+from app.helpers.metrics import (
+    event_loop_lag,
+    event_loop_lag_histogram,
+    event_loop_blocks_total,
+    event_loop_blocked_seconds_total,
+    event_loop_delayed_requests_total,
+)
+from app.helpers.request_context import task_route, in_flight_routes
+
+logger = logging.getLogger("app.loop")
+
+
+class LoopWatchdog(threading.Thread):
+    """
+    Watches the heartbeat of monitor_event_loop from outside the loop.
+    When the heartbeat is overdue by more than `threshold` some callback is
+    holding the loop: log the route whose task is running and a sample of
+    its stack, and once the loop is back count the blocked time against
+    that route and against every request that had to wait for it.
+    """
+
+    def __init__(self, loop, interval: float, threshold: float):
+        super().__init__(name="loop-watchdog", daemon=True)
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident()
+        self.interval = interval
+        self.threshold = threshold
+        self._last_wake = time.perf_counter()
+        self._last_lag = 0.0
+        self._episode = None
+        self._done = threading.Event()
+
+    def beat(self, lag: float):
+        """Called on the loop after every monitor sleep."""
+        self._last_lag = lag
+        self._last_wake = time.perf_counter()
+
+    def run(self):
+        while not self._done.wait(self.threshold / 4):
+            wake = self._last_wake
+            if self._episode is None:
+                overdue = time.perf_counter() - wake - self.interval
+                if overdue > self.threshold:
+                    self._episode = self._start_episode(wake, overdue)
+            elif wake != self._episode["wake"]:
+                self._end_episode(self._episode, self._last_lag)
+                self._episode = None
+
+    def stop(self):
+        self._done.set()
+
+    def _start_episode(self, wake: float, overdue: float) -> dict:
+        task = asyncio.current_task(self.loop)
+        route = task_route(task) if task is not None else None
+        frame = sys._current_frames().get(self.loop_thread_id)
+        stack = [
+            f"{entry.filename}:{entry.lineno} in {entry.name}"
+            for entry in (traceback.extract_stack(frame)[-20:] if frame is not None else [])
+        ]
+        delayed = in_flight_routes(exclude=task)
+
+        episode = {"wake": wake, "route": route or "<background>", "delayed": delayed}
+        logger.warning(json.dumps({
+            "event": "event_loop_blocked",
+            "route": episode["route"],
+            "blocked_ms": round(overdue * 1000, 2),
+            "delayed_requests": dict(delayed),
+            "stack": stack,
+        }))
+        return episode
+
+    def _end_episode(self, episode: dict, lag: float):
+        route = episode["route"]
+        event_loop_blocks_total.inc(route=route)
+        event_loop_blocked_seconds_total.inc(lag, route=route)
+        for delayed_route, count in episode["delayed"].items():
+            event_loop_delayed_requests_total.inc(count, route=delayed_route, blocked_by=route)
+        logger.warning(json.dumps({
+            "event": "event_loop_unblocked",
+            "route": route,
+            "blocked_ms": round(lag * 1000, 2),
+        }))
+
+
+async def monitor_event_loop(interval: float = LOOP_MONITOR_INTERVAL):
+    """
+    Sleep for `interval` over and over; anything beyond `interval` that the
+    sleep actually took is time the loop was busy with other callbacks.
+    A LoopWatchdog thread catches the callbacks that block for too long.
+    """
+    loop = asyncio.get_running_loop()
+    watchdog = LoopWatchdog(loop, interval, LOOP_BLOCK_THRESHOLD_MS / 1000)
+    watchdog.start()
+    try:
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - started - interval)
+            event_loop_lag.set(lag)
+            event_loop_lag_histogram.observe(lag)
+            watchdog.beat(lag)
+    finally:
+        watchdog.stop()
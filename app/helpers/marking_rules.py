@@ -0,0 +1,46 @@
+"""
+Who may mark whom: the checks shared by mark_attendance and the offline
+sync (app/routes/staff_attendance_sync.py). They read only the in-process
+caches and raise the HTTPException the route would return.
+"""
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.helpers.attendance_time_checker import WindowSchedule, check_attendance_time_limit
+from app.helpers.roster import StudentRecord
+from app.models import User, UserRole
+
+
+def check_marking_role(user: User):
+    """Only attendance incharges (or staff with both roles) mark attendance."""
+    if (user.role != UserRole.attendance_incharge and
+        not getattr(user, "can_access_both", False)):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+
+def check_student_markable(
+    user: User,
+    student: StudentRecord,
+    class_ids: tuple,
+    schedule: WindowSchedule,
+    at: Optional[float] = None,
+):
+    """Whether `user` may mark `student` now (or at `at`, an offline mark's time)."""
+    # Assigned class constraint
+    if student.class_id not in class_ids:
+        raise HTTPException(
+            status_code=403,
+            detail="You are not assigned to this student's class"
+        )
+
+    # Same gender restriction
+    if student.gender != user.gender:
+        raise HTTPException(
+            status_code=403,
+            detail="You can mark attendance only for same-gender students"
+        )
+
+    # The class's own window (windows may be staggered per program type or
+    # department)
+    check_attendance_time_limit(schedule, student.class_id, at)
@@ -0,0 +1,232 @@
+"""
+Minimal Prometheus-style metrics (text exposition format 0.0.4).
+
+Only bounded labels belong here: route templates, pool names, program types.
+Never student / staff ids.
+"""
+import math
+import time
+from typing import Callable, Optional
+
+
+from app.helpers.request_context import route_label, track_request_task, untrack_request_task
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=None) -> str:
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, description, labelnames=(), collect: Optional[Callable[[], dict]] = None):
+        """
+        `collect`, when given, is called at scrape time and returns
+        {label_values_tuple: value}, replacing the stored values.
+        """
+        super().__init__(name, description, labelnames)
+        self._collect = collect
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> list:
+        values = self._collect() if self._collect else self._values
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        counts = state[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ------------------ HTTP ------------------ #
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ("route", "status"),
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        http_requests_in_flight.inc()
+        task = track_request_task(scope)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            untrack_request_task(task)
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                route=route_label(scope),
+                status=f"{status // 100}xx",
+            )
+
+
+# ------------------ DB pool ------------------ #
+db_pool_wait = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ("pool",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_checkout_duration = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "How long a connection stayed checked out",
+    ("pool",),
+)
+
+
+# ------------------ Event loop ------------------ #
+event_loop_lag = Gauge(
+    "event_loop_lag_seconds",
+    "Most recent event loop scheduling delay",
+)
+event_loop_lag_histogram = Histogram(
+    "event_loop_lag_distribution_seconds",
+    "Event loop scheduling delay",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+event_loop_blocks_total = Counter(
+    "event_loop_blocks_total",
+    "Times a request blocked the event loop for longer than LOOP_BLOCK_THRESHOLD_MS",
+    ("route",),
+)
+event_loop_blocked_seconds_total = Counter(
+    "event_loop_blocked_seconds_total",
+    "Time the event loop spent blocked, by the route that blocked it",
+    ("route",),
+)
+event_loop_delayed_requests_total = Counter(
+    "event_loop_delayed_requests_total",
+    "Requests that were in flight while another route blocked the event loop",
+    ("route", "blocked_by"),
+)
+
+
+# ------------------ Attendance ------------------ #
+attendance_marks_total = Counter(
+    "attendance_marks_total",
+    "Attendance marks committed",
+    ("present",),
+)
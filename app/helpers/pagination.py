@@ -0,0 +1,75 @@
+"""
+Keyset (cursor) pagination for listing and search routes.
+
+A route orders by a unique key (roll number, id), asks for limit + 1 rows
+after the cursor's key and hands them to `page.split`:
+
+    async def route(page: PageParams = Depends(), db = Depends(get_read_db)):
+        total = await count_rows(db, query) if page.include_total else None
+        after = page.after_key(str)
+        if after:
+            query = query.where(Student.roll_number > after[0])
+        rows = (await db.execute(query.order_by(Student.roll_number).limit(page.limit + 1))).all()
+        rows, next_cursor = page.split(rows, lambda s: (s.roll_number,))
+
+Cursors are the last row's key, so they stay valid while rows are added
+or removed, and every page costs the same however deep it is. The total
+is a separate COUNT, only run when the client asks for it.
+"""
+import base64
+import json
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import MAX_PAGE_SIZE, PAGE_SIZE
+
+
+def encode_cursor(key: Sequence) -> str:
+    raw = json.dumps([str(value) for value in key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(key, list):
+        raise ValueError("cursor is not a key")
+    return key
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        include_total: bool = Query(False, description="Also count every matching row"),
+    ):
+        self.limit = limit
+        self.after = after
+        self.include_total = include_total
+
+    def after_key(self, *types: Callable) -> Optional[Tuple]:
+        """The cursor's key converted with `types` (e.g. UUID), or None on the first page."""
+        if self.after is None:
+            return None
+        try:
+            key = decode_cursor(self.after)
+            if len(key) != len(types):
+                raise ValueError("cursor does not fit this listing")
+            return tuple(convert(value) for convert, value in zip(types, key))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def split(self, rows: List, key: Callable) -> Tuple[List, Optional[str]]:
+        """This page's rows and the cursor of the next page (None on the last one)."""
+        if len(rows) <= self.limit:
+            return rows, None
+        rows = rows[:self.limit]
+        return rows, encode_cursor(key(rows[-1]))
+
+
+async def count_rows(db: AsyncSession, query) -> int:
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
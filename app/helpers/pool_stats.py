@@ -0,0 +1,121 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.helpers.metrics import Gauge, db_pool_wait, db_pool_checkout_duration
+
+
+class PoolStats:
+    """
+    Running totals for how long requests waited to check out a connection.
+    """
+
+    def __init__(self):
+        self.label = "default"
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+
+    def record(self, wait: float):
+        self.checkouts += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+        db_pool_wait.observe(wait, pool=self.label)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that times every checkout, including the time spent
+    queueing when the pool and its overflow are exhausted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.record(time.perf_counter() - started)
+
+
+def pool_snapshot(engine) -> dict:
+    pool = engine.sync_engine.pool
+    snapshot = {
+        "pool_class": type(pool).__name__,
+    }
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        snapshot.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+
+    stats = getattr(pool, "stats", None)
+    if stats:
+        snapshot.update({
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "avg_wait_ms": round(stats.total_wait / stats.checkouts * 1000, 3) if stats.checkouts else 0.0,
+            "max_wait_ms": round(stats.max_wait * 1000, 3),
+        })
+
+    return snapshot
+
+
+# ------------------ Metrics ------------------ #
+# label -> engine, for the scrape-time pool gauges
+_labelled_engines = {}
+
+
+def label_pool(engine, label: str) -> None:
+    """
+    Name an engine's pool in metrics and time how long each connection
+    stays checked out.
+    """
+    pool = engine.sync_engine.pool
+    stats = getattr(pool, "stats", None)
+    if stats is None:
+        return
+    stats.label = label
+    _labelled_engines[label] = engine
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            db_pool_checkout_duration.observe(time.perf_counter() - started, pool=label)
+
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+
+
+def labelled_engines() -> dict:
+    return dict(_labelled_engines)
+
+
+def _collect(field):
+    def collect():
+        values = {}
+        for label, engine in _labelled_engines.items():
+            snapshot = pool_snapshot(engine)
+            if field in snapshot:
+                values[(label,)] = snapshot[field]
+        return values
+    return collect
+
+
+Gauge("db_pool_size", "Configured pool size", ("pool",), collect=_collect("size"))
+Gauge("db_pool_checked_out", "Connections currently checked out", ("pool",), collect=_collect("checked_out"))
+Gauge("db_pool_overflow", "Overflow connections currently open", ("pool",), collect=_collect("overflow"))
@@ -0,0 +1,76 @@
+"""
+Pre-warm before each attendance window (single worker).
+
+Every staff member opens their listing and starts marking within the first
+minutes of a window. PREWARM_LEAD_SECONDS before each window opens this
+task makes sure none of them pays for a cold cache: the reference data,
+roster, assigned classes and windows are loaded, the connection pools are
+filled, and the present students reports and CSV export are rendered (off
+the event loop, from a copy of the roster) into response_cache.
+"""
+import asyncio
+import logging
+import time
+
+from app.config import PREWARM_LEAD_SECONDS
+from app.database import AsyncReadSessionLocal, all_engines, warm_up_pool
+from app.helpers.attendance_freeze import attendance_freeze
+from app.helpers.attendance_reports import (
+    CSV_HEADERS, EXPORT_CACHE_KEY, PDF_CACHE_KEY, PDF_HEADERS, REPORT_TABLES, render_reports,
+)
+from app.helpers.attendance_time_checker import attendance_windows
+from app.helpers.data_changes import table_versions
+from app.helpers.reference_data import reference_data
+from app.helpers.response_cache import response_cache
+from app.helpers.roster import roster, warm_assigned_classes
+
+logger = logging.getLogger("app.prewarm")
+
+# How long to sleep at most before looking at the windows again
+PREWARM_POLL_SECONDS = 60
+
+
+async def prewarm():
+    """Warms the caches, the pools and the reports now."""
+    started = time.perf_counter()
+    async with AsyncReadSessionLocal() as db:
+        ref = await reference_data.get(db)
+        await roster.ready(db)
+        await warm_assigned_classes(db)
+        await attendance_windows.get(db)
+        versions = table_versions(REPORT_TABLES)
+        copy = roster.copy()
+
+    for engine in all_engines():
+        await warm_up_pool(engine)
+
+    # A frozen attendance serves its own reports
+    if attendance_freeze.snapshot is None:
+        pdfs, export = await asyncio.to_thread(render_reports, ref, copy)
+        for key, body in pdfs.items():
+            response_cache.put(PDF_CACHE_KEY.format(key), body, "application/pdf", REPORT_TABLES, versions,
+                               headers=PDF_HEADERS)
+        response_cache.put(EXPORT_CACHE_KEY, export, "text/csv; charset=utf-8", REPORT_TABLES, versions,
+                           headers=CSV_HEADERS)
+
+    logger.info("Pre-warmed in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+async def prewarm_before_windows():
+    """Background task: runs prewarm() PREWARM_LEAD_SECONDS before each window opens."""
+    while True:
+        wait = PREWARM_POLL_SECONDS
+        try:
+            async with AsyncReadSessionLocal() as db:
+                opens = (await attendance_windows.get(db)).next_opening(time.time())
+            if opens is not None:
+                until_warm = opens - PREWARM_LEAD_SECONDS - time.time()
+                if until_warm <= 0:
+                    await prewarm()
+                    # Not again for this window
+                    wait = max(opens - time.time(), 0) + 1
+                else:
+                    wait = min(wait, until_warm)
+        except Exception:
+            logger.exception("Pre-warm failed")
+        await asyncio.sleep(wait)
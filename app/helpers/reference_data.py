@@ -0,0 +1,123 @@
+"""
+In-process cache of the reference data: classes, class names and program
+types (single worker).
+
+These rows are written a handful of times while the event is being set up
+and read by nearly every listing. The whole set is loaded at startup into
+compact records with id / name indexes, and loaded again on the first read
+after a commit writes one of the tables (app/helpers/data_changes.py), so
+class creation, update and deletion are picked up without extra calls.
+
+    ref = await reference_data.get(db)
+    program_type = ref.program_types_by_name.get("UG")
+    classes = ref.classes_of_program_type(program_type.id)
+
+A load runs on the request's own session (no second connection while the
+request holds one) and switches it to the primary: a lagging replica would
+otherwise be cached until the next write.
+"""
+import asyncio
+from typing import Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.helpers.data_changes import on_tables_changed, table_versions
+from app.models import Class, ClassName, ProgramType
+
+REFERENCE_TABLES = ("classes", "class_names", "program_types")
+
+
+class ProgramTypeRecord:
+    __slots__ = ("id", "type_name")
+
+    def __init__(self, id, type_name: str):
+        self.id = id
+        self.type_name = type_name
+
+
+class ClassRecord:
+    __slots__ = (
+        "id", "class_name_id", "class_name", "program_type_id", "program_type",
+        "department", "section", "regular_or_self",
+    )
+
+    def __init__(self, id, class_name_id, class_name, program_type_id, program_type,
+                 department, section, regular_or_self):
+        self.id = id
+        self.class_name_id = class_name_id
+        self.class_name = class_name
+        self.program_type_id = program_type_id
+        self.program_type = program_type
+        self.department = department
+        self.section = section
+        self.regular_or_self = regular_or_self
+
+
+class ReferenceSnapshot:
+    """One consistent, read-only view of the reference tables."""
+
+    def __init__(self, program_types: Iterable[ProgramTypeRecord], class_names: dict,
+                 classes: Iterable[ClassRecord]):
+        self.program_types = {pt.id: pt for pt in program_types}
+        self.program_types_by_name = {pt.type_name: pt for pt in self.program_types.values()}
+        self.class_names = class_names
+        self.classes = {c.id: c for c in classes}
+
+        self.classes_by_name = {}
+        self.classes_by_program_type = {}
+        for c in self.classes.values():
+            self.classes_by_name.setdefault(c.class_name, []).append(c)
+            self.classes_by_program_type.setdefault(c.program_type_id, []).append(c)
+
+    def classes_of_program_type(self, program_type_id) -> List[ClassRecord]:
+        return self.classes_by_program_type.get(program_type_id, [])
+
+
+class ReferenceData:
+    def __init__(self):
+        self._snapshot: Optional[ReferenceSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, tables: frozenset):
+        if not tables.isdisjoint(REFERENCE_TABLES):
+            self._snapshot = None
+
+    async def load(self, db: AsyncSession) -> ReferenceSnapshot:
+        versions = table_versions(REFERENCE_TABLES)
+        db.info["use_primary"] = True
+        program_types = [
+            ProgramTypeRecord(row.id, row.type_name)
+            for row in await db.execute(select(ProgramType.id, ProgramType.type_name))
+        ]
+        class_names = dict((await db.execute(select(ClassName.id, ClassName.name))).all())
+        rows = await db.execute(
+            select(Class.id, Class.class_name_id, Class.program_type_id,
+                   Class.department, Class.section, Class.regular_or_self)
+        )
+
+        program_type_names = {pt.id: pt.type_name for pt in program_types}
+        snapshot = ReferenceSnapshot(program_types, class_names, [
+            ClassRecord(
+                row.id, row.class_name_id, class_names.get(row.class_name_id),
+                row.program_type_id, program_type_names.get(row.program_type_id),
+                row.department, row.section, row.regular_or_self,
+            )
+            for row in rows
+        ])
+
+        # A write committed while loading: serve this one, load again next time
+        if table_versions(REFERENCE_TABLES) == versions:
+            self._snapshot = snapshot
+        return snapshot
+
+    async def get(self, db: AsyncSession) -> ReferenceSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        async with self._lock:
+            return self._snapshot or await self.load(db)
+
+
+reference_data = ReferenceData()
+on_tables_changed(reference_data.invalidate)
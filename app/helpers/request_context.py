@@ -0,0 +1,42 @@
+import asyncio
+from collections import Counter
+from typing import Optional
+
+# Request scope of every task currently handling a request (single worker)
+_request_scopes = {}
+
+
+def route_label(scope) -> str:
+    """
+    Bounded label for a request: the matched route template
+    (e.g. /student/list-by-class/{class_id}), never the raw path.
+    """
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return f"{scope.get('method', '')} {route.path}"
+    return f"{scope.get('method', '')} <unmatched>"
+
+
+def track_request_task(scope):
+    """Remember which request the current task is handling."""
+    task = asyncio.current_task()
+    _request_scopes[task] = scope
+    return task
+
+
+def untrack_request_task(task):
+    _request_scopes.pop(task, None)
+
+
+def task_route(task) -> Optional[str]:
+    scope = _request_scopes.get(task)
+    return route_label(scope) if scope is not None else None
+
+
+def in_flight_routes(exclude=None) -> Counter:
+    """Requests being handled right now, per route. Safe to call from other threads."""
+    return Counter(
+        route_label(scope)
+        for task, scope in list(_request_scopes.items())
+        if task is not exclude
+    )
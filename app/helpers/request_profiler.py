@@ -0,0 +1,263 @@
+"""
+On-demand profiling of a single request.
+
+An admin sends ``X-Profile: sample`` (or ``?_profile=sample``) and the
+request runs under a sampling profiler that writes folded stacks
+(``thread;frame;frame cpu_microseconds``, readable by flamegraph.pl and
+speedscope).
+``X-Profile: cprofile`` runs it under cProfile instead and stores a .prof
+file (snakeviz, flameprof). Either way the time is broken out into
+ReportLab, ORM / database, serialization and everything else.
+
+The profile id comes back in the X-Profile-Id response header; the files
+and breakdowns are served by /admin/profiles. Requests without the flag
+only pay for the header lookup.
+
+Both profilers see the whole process while the request runs, so profile
+on a quiet worker if you want a clean picture. For the same reason one
+request is profiled at a time: another asking while it runs gets 409.
+"""
+import asyncio
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+from app.auth.dependencies import get_current_user, is_admin
+from app.config import PROFILE_DIR, PROFILE_SAMPLE_INTERVAL_MS
+from app.database import AsyncReadSessionLocal
+from app.helpers.request_context import route_label
+
+PROFILE_MODES = ("sample", "cprofile")
+
+# Checked in order: a stack that renders a PDF from query results is ReportLab time
+_CATEGORY_MARKERS = (
+    ("reportlab", ("/reportlab/",)),
+    ("orm", ("/sqlalchemy/", "/aiosqlite/", "/asyncpg/", "/sqlite3/")),
+    ("serialization", ("/pydantic/", "/pydantic_core/", "/json/", "/orjson", "fastapi/encoders.py")),
+)
+CATEGORIES = tuple(name for name, _ in _CATEGORY_MARKERS) + ("other",)
+
+# Leaf frames of threads that are parked rather than working
+_IDLE_FILES = ("selectors.py", "threading.py", "queue.py", "concurrent/futures/thread.py")
+
+# Metadata of the latest profiles, newest last (single worker)
+recent_profiles = deque(maxlen=50)
+
+# Held while a request is profiled: the samplers would count each other's
+# samples and restore each other's switch interval, cProfile would clash
+_profiling = asyncio.Lock()
+
+
+def categorize(filenames) -> str:
+    for category, markers in _CATEGORY_MARKERS:
+        if any(marker in filename for filename in filenames for marker in markers):
+            return category
+    return "other"
+
+
+_labels = {}
+
+
+def _frame_label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        path = code.co_filename.replace(os.sep, "/")
+        if "site-packages/" in path:
+            path = path.rsplit("site-packages/", 1)[1]
+        elif path.startswith(os.getcwd().replace(os.sep, "/") + "/"):
+            path = path[len(os.getcwd()) + 1:]
+        else:
+            path = path.rsplit("/", 1)[-1]
+        module = path[:-3] if path.endswith(".py") else path
+        label = _labels[code] = f"{module.replace('/', '.')}:{code.co_name}"
+    return label
+
+
+# ---------------- Sampling profiler ---------------- #
+
+class StackSampler(threading.Thread):
+    """
+    Samples every thread's stack and folds identical stacks together.
+    Each sample is weighted by the CPU time the thread used since the
+    previous one, so threads parked on a queue (idle aiosqlite connections)
+    or in select() drop out and the folded counts are microseconds of CPU.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.category_time = Counter()
+        self._cpu = {}
+        self._done = threading.Event()
+
+    def _weight(self, ident, codes, elapsed):
+        idle = codes[0].co_filename.replace(os.sep, "/").endswith(_IDLE_FILES)
+        try:
+            cpu = time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (AttributeError, OSError):
+            # No per-thread CPU clocks on this platform: wall time of non-idle stacks
+            return 0 if idle else elapsed
+        previous, self._cpu[ident] = self._cpu.get(ident), cpu
+        if idle or previous is None:
+            return 0
+        return min(cpu - previous, elapsed)
+
+    def run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._done.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                weight = self._weight(ident, codes, elapsed)
+                if weight <= 0:
+                    continue
+
+                codes.reverse()
+                stack = (names.get(ident, "thread"),) + tuple(_frame_label(code) for code in codes)
+                self.stacks[stack] += round(weight * 1_000_000)
+                self.category_time[categorize([code.co_filename for code in codes])] += weight
+
+    def start(self):
+        # A thread only gets sampled when it hands over the GIL; with the
+        # default 5ms switch interval that is mostly when it blocks in I/O
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 2))
+        super().start()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def folded(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common() if count)
+
+
+def _cprofile_breakdown(profiler: cProfile.Profile) -> Counter:
+    category_time = Counter()
+    for (filename, _, _), (_, _, own_time, _, _) in pstats.Stats(profiler).stats.items():
+        category_time[categorize((filename,))] += own_time
+    return category_time
+
+
+# ---------------- Middleware ---------------- #
+
+def requested_mode(scope):
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value.decode("latin-1").strip().lower()
+    query = scope.get("query_string", b"")
+    if b"_profile=" in query:
+        return parse_qs(query.decode("latin-1")).get("_profile", [""])[0].lower()
+    return None
+
+
+async def _check_admin(scope):
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    async with AsyncReadSessionLocal() as db:
+        user = await get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+    await is_admin(user)
+
+
+def _write(path: str, content):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    if isinstance(content, cProfile.Profile):
+        content.dump_stats(path)
+    else:
+        with open(path, "w") as f:
+            f.write(content)
+
+
+class RequestProfilerMiddleware:
+    """
+    Runs a request under a profiler when an admin asks for it with the
+    X-Profile header or the _profile query parameter.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        mode = requested_mode(scope) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            if mode not in PROFILE_MODES:
+                raise HTTPException(status_code=400, detail=f"Profile mode must be one of {', '.join(PROFILE_MODES)}")
+            await _check_admin(scope)
+            if _profiling.locked():
+                raise HTTPException(status_code=409, detail="Another request is being profiled")
+        except HTTPException as exc:
+            await JSONResponse({"detail": exc.detail}, status_code=exc.status_code)(scope, receive, send)
+            return
+
+        async with _profiling:
+            await self._profile(scope, receive, send, mode)
+
+    async def _profile(self, scope, receive, send, mode):
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        started = time.perf_counter()
+        if mode == "sample":
+            sampler = StackSampler(PROFILE_SAMPLE_INTERVAL_MS / 1000)
+            sampler.start()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                sampler.stop()
+            duration = time.perf_counter() - started
+            filename, content, category_time = f"{profile_id}.folded", sampler.folded(), sampler.category_time
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - started
+            filename, content, category_time = f"{profile_id}.prof", profiler, _cprofile_breakdown(profiler)
+
+        await asyncio.to_thread(_write, os.path.join(PROFILE_DIR, filename), content)
+        recent_profiles.append({
+            "id": profile_id,
+            "mode": mode,
+            "route": route_label(scope),
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+            "breakdown_ms": {category: round(category_time[category] * 1000, 2) for category in CATEGORIES},
+            "file": filename,
+        })
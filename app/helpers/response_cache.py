@@ -0,0 +1,129 @@
+"""
+In-process cache of finished response bodies (single worker).
+
+Entries are tagged with the tables they were built from and dropped as soon
+as a commit writes to one of them (app/helpers/data_changes.py). Each entry
+keeps its gzip / brotli encodings next to the raw body, compressed on first
+use, so a cached payload is never compressed twice.
+
+    cached = response_cache.get(key)
+    if cached:
+        return await cached.response(request)
+    versions = table_versions(TABLES)
+    ... build body ...
+    entry = response_cache.put(key, body, "application/json", TABLES, versions)
+    return await entry.response(request)
+"""
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable, Iterable, Optional
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response
+
+from app.config import RESPONSE_CACHE_MAX_ENTRIES
+from app.helpers.compression import compress_async, is_compressible, negotiate
+from app.helpers.data_changes import on_tables_changed, table_versions
+from app.helpers.fast_json import FastJSONResponse
+
+
+class CachedResponse:
+    __slots__ = ("body", "media_type", "headers", "tags", "encoded")
+
+    def __init__(self, body: bytes, media_type: str, tags: frozenset, headers: Optional[dict] = None):
+        self.body = body
+        self.media_type = media_type
+        self.tags = tags
+        self.headers = headers or {}
+        self.encoded = {}
+
+    async def encoded_body(self, encoding: str) -> bytes:
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = self.encoded[encoding] = await compress_async(self.body, encoding)
+        return body
+
+    async def response(self, request: Request) -> Response:
+        headers = dict(self.headers)
+        if not is_compressible(self.media_type, len(self.body)):
+            return Response(self.body, media_type=self.media_type, headers=headers)
+
+        headers["Vary"] = "Accept-Encoding"
+        encoding = negotiate(request.headers.get("accept-encoding", ""))
+        if encoding is None:
+            return Response(self.body, media_type=self.media_type, headers=headers)
+
+        headers["Content-Encoding"] = encoding
+        return Response(await self.encoded_body(encoding), media_type=self.media_type, headers=headers)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._keys_by_table = defaultdict(set)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, body: bytes, media_type: str, tables: Iterable[str],
+            versions: tuple, headers: Optional[dict] = None) -> CachedResponse:
+        """
+        `versions` is table_versions(tables) taken before the body's queries
+        ran; if a write committed since, the body may be stale and is not kept.
+        """
+        tables = tuple(tables)
+        entry = CachedResponse(body, media_type, frozenset(tables), headers)
+        if table_versions(tables) != versions:
+            return entry
+
+        self._drop(key)
+        self._entries[key] = entry
+        for table in entry.tags:
+            self._keys_by_table[table].add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+        return entry
+
+    def invalidate(self, tables: Iterable[str]):
+        for table in tables:
+            for key in self._keys_by_table.pop(table, ()):
+                self._drop(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_table.clear()
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for table in entry.tags:
+                self._keys_by_table.get(table, set()).discard(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES)
+on_tables_changed(response_cache.invalidate)
+
+
+async def cached_json(request: Request, db: AsyncSession, key: str, tables: Iterable[str],
+                      build: Callable[[], Awaitable[dict]]) -> Response:
+    """
+    JSON response from the cache, or from `build()` (then cached) on a miss.
+
+    The version tags count the primary's commits, so `build()` reads the
+    primary too: a lagging replica would cache a body under tags it predates.
+    """
+    entry = response_cache.get(key)
+    if entry is None:
+        db.info["use_primary"] = True
+        tables = tuple(tables)
+        versions = table_versions(tables)
+        content = await build()
+        entry = response_cache.put(key, FastJSONResponse(content).body, "application/json", tables, versions)
+    return await entry.response(request)
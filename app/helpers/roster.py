@@ -0,0 +1,347 @@
+"""
+In-process roster: every student as a compact record, per class and per
+gender (single worker).
+
+The roster is read by every staff and admin listing and written a few
+times per student (creation, then attendance marks). Records are loaded
+once at startup; each class keeps its students in roll number order, plus
+one list per gender for the attendance incharge's same-gender view. The
+lists share the records, so a committed mark (seen through
+on_rows_changed, app/helpers/data_changes.py) only flips `present` on one
+object and one bit. Other row changes move or drop the record; bulk
+statements mark the roster stale and the next read loads it again.
+
+Attendance is also held as one bitset per class over its roll number
+order (ClassRoster.present_bits, plus a mask per gender): present counts,
+gender-masked or not, are popcounts and changed_since diffs two snapshots
+with one XOR per class.
+
+    await roster.ready(db)
+    students = roster.students_of(class_id, gender="female", present=True)
+    present = roster.class_roster(class_id).present_count()
+
+Loads run on the request's own session, switched to the primary so a
+lagging replica isn't cached until the next write.
+"""
+import asyncio
+import bisect
+import itertools
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.helpers.data_changes import on_rows_changed, table_versions
+from app.models import Student, staff_classes
+
+STUDENT_COLUMNS = ("id", "roll_number", "name", "gender", "present", "class_id")
+
+# Layout numbers are unique across classes and reloads
+_layouts = itertools.count(1)
+
+
+def _roll_number(record) -> str:
+    return record.roll_number
+
+
+class StudentRecord:
+    __slots__ = STUDENT_COLUMNS
+
+    def __init__(self, id, roll_number: str, name: str, gender: str, present: bool, class_id):
+        self.id = id
+        self.roll_number = roll_number
+        self.name = name
+        self.gender = gender
+        self.present = present
+        self.class_id = class_id
+
+
+def _insert_bit(bits: int, i: int, value: bool) -> int:
+    low = bits & ((1 << i) - 1)
+    return low | ((bits >> i) << (i + 1)) | (int(value) << i)
+
+
+def _delete_bit(bits: int, i: int) -> int:
+    low = bits & ((1 << i) - 1)
+    return low | ((bits >> (i + 1)) << i)
+
+
+class ClassRoster:
+    """
+    One class's students in roll number order, also split by gender.
+
+    Attendance is kept as bitsets over `students` (bit i is students[i]):
+    `present_bits` and one mask per gender, so counts are popcounts and
+    diffs are XORs. `layout` changes whenever a student is added or
+    removed, i.e. whenever bit positions move.
+    """
+
+    __slots__ = ("students", "by_gender", "present_bits", "gender_bits", "layout")
+
+    def __init__(self):
+        self.students: List[StudentRecord] = []
+        self.by_gender: Dict[str, List[StudentRecord]] = {}
+        self.present_bits = 0
+        self.gender_bits: Dict[str, int] = {}
+        self.layout = next(_layouts)
+
+    def rebuild_bits(self):
+        self.present_bits = 0
+        self.gender_bits = {gender: 0 for gender in self.by_gender}
+        for i, record in enumerate(self.students):
+            if record.present:
+                self.present_bits |= 1 << i
+            self.gender_bits[record.gender] |= 1 << i
+        self.layout = next(_layouts)
+
+    def _index(self, record: StudentRecord, students: List[StudentRecord]) -> Optional[int]:
+        i = bisect.bisect_left(students, record.roll_number, key=_roll_number)
+        return i if i < len(students) and students[i] is record else None
+
+    def insert(self, record: StudentRecord):
+        for students in (self.students, self.by_gender.setdefault(record.gender, [])):
+            students.insert(bisect.bisect_left(students, record.roll_number, key=_roll_number), record)
+
+        i = self._index(record, self.students)
+        self.present_bits = _insert_bit(self.present_bits, i, record.present)
+        self.gender_bits.setdefault(record.gender, 0)
+        for gender, bits in self.gender_bits.items():
+            self.gender_bits[gender] = _insert_bit(bits, i, gender == record.gender)
+        self.layout = next(_layouts)
+
+    def discard(self, record: StudentRecord):
+        same_gender = self.by_gender.get(record.gender, [])
+        j = self._index(record, same_gender)
+        if j is not None:
+            del same_gender[j]
+
+        i = self._index(record, self.students)
+        if i is None:
+            return
+        del self.students[i]
+        self.present_bits = _delete_bit(self.present_bits, i)
+        for gender, bits in self.gender_bits.items():
+            self.gender_bits[gender] = _delete_bit(bits, i)
+        self.layout = next(_layouts)
+
+    def mark(self, record: StudentRecord, present: bool):
+        record.present = present
+        i = self._index(record, self.students)
+        if i is not None:
+            if present:
+                self.present_bits |= 1 << i
+            else:
+                self.present_bits &= ~(1 << i)
+
+    # ---------------- attendance ---------------- #
+
+    def _mask(self, gender: Optional[str]) -> int:
+        if gender is None:
+            return (1 << len(self.students)) - 1
+        return self.gender_bits.get(gender, 0)
+
+    def students_at(self, bits: int) -> List[StudentRecord]:
+        """Students whose bits are set, in roll number order."""
+        # bit i is character i of the reversed binary string
+        digits = bin(bits)[:1:-1]
+        records = []
+        i = digits.find("1")
+        while i >= 0:
+            records.append(self.students[i])
+            i = digits.find("1", i + 1)
+        return records
+
+    def present_count(self, gender: Optional[str] = None) -> int:
+        return (self.present_bits & self._mask(gender)).bit_count()
+
+    # Lists are filtered from the records: decoding a dense bitset costs
+    # more than one attribute read per student (benchmarks/attendance_bits.py)
+    def present_students(self, gender: Optional[str] = None) -> List[StudentRecord]:
+        students = self.students if gender is None else self.by_gender.get(gender, [])
+        return [s for s in students if s.present]
+
+    def absent_students(self, gender: Optional[str] = None) -> List[StudentRecord]:
+        students = self.students if gender is None else self.by_gender.get(gender, [])
+        return [s for s in students if not s.present]
+
+
+class RosterStore:
+    def __init__(self):
+        self.stale = True
+        self._lock = asyncio.Lock()
+        self._classes: Dict[object, ClassRoster] = {}
+        self._students: Dict[object, StudentRecord] = {}
+
+    def __len__(self):
+        return len(self._students)
+
+    # ---------------- maintenance ---------------- #
+
+    def _add(self, values):
+        record = StudentRecord(*(values[column] for column in STUDENT_COLUMNS))
+        self._students[record.id] = record
+        self._classes.setdefault(record.class_id, ClassRoster()).insert(record)
+
+    def _remove(self, student_id):
+        record = self._students.pop(student_id, None)
+        if record is not None:
+            self._classes[record.class_id].discard(record)
+
+    def apply(self, changes: Optional[dict]):
+        """on_rows_changed callback."""
+        if self.stale:
+            return
+        if changes is None:
+            self.stale = True
+            return
+
+        for student_id, values in changes.items():
+            if values is None:
+                self._remove(student_id)
+                continue
+            if any(column not in values for column in STUDENT_COLUMNS):
+                self.stale = True  # the session never loaded the row: reload
+                return
+            record = self._students.get(student_id)
+            if record is not None and all(
+                getattr(record, column) == values[column]
+                for column in STUDENT_COLUMNS if column != "present"
+            ):
+                # A mark: every list sees the record, the bitset flips one bit
+                self._classes[record.class_id].mark(record, values["present"])
+            else:
+                self._remove(student_id)
+                self._add(values)
+
+    async def load(self, db: AsyncSession):
+        versions = table_versions(("students",))
+        db.info["use_primary"] = True
+        result = await db.execute(
+            select(*(getattr(Student, column) for column in STUDENT_COLUMNS))
+            .order_by(Student.class_id, Student.roll_number)
+        )
+
+        classes, students = {}, {}
+        for row in result:
+            record = StudentRecord(*row)
+            students[record.id] = record
+            roster = classes.get(record.class_id)
+            if roster is None:
+                roster = classes[record.class_id] = ClassRoster()
+            # Rows arrive in roll number order: append instead of insert
+            roster.students.append(record)
+            roster.by_gender.setdefault(record.gender, []).append(record)
+
+        for roster in classes.values():
+            roster.rebuild_bits()
+        self._classes, self._students = classes, students
+        # Rows written while loading may be missing: load again next time
+        self.stale = table_versions(("students",)) != versions
+
+    async def ready(self, db: AsyncSession):
+        if self.stale:
+            async with self._lock:
+                if self.stale:
+                    await self.load(db)
+
+    def copy(self) -> "RosterStore":
+        """
+        A detached copy with its own records. Nothing registers it with
+        on_rows_changed, so later commits never reach it (attendance freeze).
+        """
+        store = RosterStore()
+        store._students = {
+            student_id: StudentRecord(*(getattr(record, column) for column in STUDENT_COLUMNS))
+            for student_id, record in self._students.items()
+        }
+        for class_id, roster in self._classes.items():
+            copied = store._classes[class_id] = ClassRoster()
+            copied.students = [store._students[record.id] for record in roster.students]
+            copied.by_gender = {
+                gender: [store._students[record.id] for record in students]
+                for gender, students in roster.by_gender.items()
+            }
+            copied.present_bits = roster.present_bits
+            copied.gender_bits = dict(roster.gender_bits)
+        store.stale = False
+        return store
+
+    # ---------------- queries ---------------- #
+
+    def students_of(
+        self,
+        class_id,
+        gender: Optional[str] = None,
+        present: Optional[bool] = None,
+        after_roll_number: Optional[str] = None,
+    ) -> List[StudentRecord]:
+        """A class's students in roll number order, optionally filtered."""
+        roster = self._classes.get(class_id)
+        if roster is None:
+            return []
+        if present is None:
+            students = roster.students if gender is None else roster.by_gender.get(gender, [])
+        elif present:
+            students = roster.present_students(gender)
+        else:
+            students = roster.absent_students(gender)
+        if after_roll_number is not None:
+            students = students[bisect.bisect_right(students, after_roll_number, key=_roll_number):]
+        return students
+
+    def get(self, student_id) -> Optional[StudentRecord]:
+        return self._students.get(student_id)
+
+    def class_roster(self, class_id) -> ClassRoster:
+        """The class's roster (an empty one for a class without students)."""
+        return self._classes.get(class_id) or ClassRoster()
+
+    def snapshot(self) -> Dict[object, Tuple[int, int]]:
+        """Every class's (layout, present bits): a few bytes per class, for changed_since."""
+        return {class_id: (roster.layout, roster.present_bits) for class_id, roster in self._classes.items()}
+
+    def changed_since(self, snapshot: Dict[object, Tuple[int, int]]) -> Tuple[Dict[object, List[StudentRecord]], Set]:
+        """
+        Students whose attendance flipped since `snapshot`, per class, and
+        the classes that gained or lost students since (their bits moved, so
+        they must be compared whole).
+        """
+        flipped, reshaped = {}, set(snapshot) - set(self._classes)
+        for class_id, roster in self._classes.items():
+            old = snapshot.get(class_id)
+            if old is None or old[0] != roster.layout:
+                reshaped.add(class_id)
+            elif old[1] != roster.present_bits:
+                flipped[class_id] = roster.students_at(old[1] ^ roster.present_bits)
+        return flipped, reshaped
+
+
+roster = RosterStore()
+on_rows_changed("students", roster.apply)
+
+
+# user_id -> (staff_classes version, class ids): saves a query per request
+_assigned_classes = {}
+
+
+async def assigned_class_ids(db: AsyncSession, user_id) -> tuple:
+    """The classes a staff member is assigned to, sorted."""
+    version = table_versions(("staff_classes",))
+    cached = _assigned_classes.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    result = await db.execute(select(staff_classes.c.class_id).where(staff_classes.c.user_id == user_id))
+    class_ids = tuple(sorted(result.scalars().all()))
+    _assigned_classes[user_id] = (version, class_ids)
+    return class_ids
+
+
+async def warm_assigned_classes(db: AsyncSession):
+    """Caches every staff member's assigned classes with one query."""
+    version = table_versions(("staff_classes",))
+    result = await db.execute(select(staff_classes.c.user_id, staff_classes.c.class_id))
+    by_user = {}
+    for user_id, class_id in result:
+        by_user.setdefault(user_id, []).append(class_id)
+    for user_id, class_ids in by_user.items():
+        _assigned_classes[user_id] = (version, tuple(sorted(class_ids)))
@@ -0,0 +1,288 @@
+"""
+In-memory trigram index for student and staff search (single worker).
+
+Each indexed row's fields (roll number, name) are lowercased and split
+into trigrams: those of the whole field, so any substring of 3+ characters
+can be looked up, and those of each word padded with spaces ("  r", " ra",
+...), which mark word starts and are what typo-tolerant matching compares.
+Queries are answered from the postings without touching the database:
+
+- 3+ characters: rows containing the query (what ILIKE '%q%' returned),
+  by intersecting the postings of its trigrams, smallest first;
+- 1-2 characters: rows with a word starting with the query, straight from
+  the word-start postings (a substring that short matches most rows);
+- nothing found and 4+ characters: typo-tolerant matches, rows sharing at
+  least SEARCH_FUZZY_MIN_SIMILARITY of the query's word trigrams.
+
+Matches are ranked exact field > word prefix > substring > typo (by
+similarity), then by the sort field; the rank key doubles as the
+pagination cursor. A large tier is walked in sort order and the walk stops
+once the page is full, so broad queries don't rank every match.
+
+Indexes are built at startup and follow commits row by row through
+on_rows_changed (app/helpers/data_changes.py); bulk statements mark them
+stale and the next search reloads them.
+"""
+import asyncio
+import bisect
+import math
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import SEARCH_FUZZY_BELOW, SEARCH_FUZZY_MIN_SIMILARITY
+from app.helpers.data_changes import on_rows_changed, table_versions
+from app.models import Student, User
+
+# Rank tiers, best first
+EXACT, WORD_PREFIX, SUBSTRING, FUZZY = range(4)
+
+# Tiers with fewer candidates than 1 / SPARSE of the index are sorted
+# rather than walked in sort order
+SPARSE = 8
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").casefold().split())
+
+
+def _grams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def word_trigrams(text: str) -> set:
+    grams = set()
+    for word in text.split():
+        grams |= _grams(f"  {word} ")
+    return grams
+
+
+def field_trigrams(text: str) -> set:
+    return _grams(f"  {text} ") | word_trigrams(text)
+
+
+class SearchIndex:
+    def __init__(self, model, fields: Sequence[str], sort_field: str):
+        self.model = model
+        self.table = model.__table__.name
+        self.fields = tuple(fields)
+        self.sort_field = sort_field
+        self.stale = True
+        self._lock = asyncio.Lock()
+        self._clear()
+
+    def _clear(self):
+        # Rows are numbered internally: int sets intersect much faster than UUID sets
+        self._doc_of = {}      # primary key -> doc number
+        self._keys = {}        # doc number -> primary key
+        self._blobs = {}       # doc number -> normalized values as "\n".join(" " + value)
+        self._entries = {}     # doc number -> (sort value, str(primary key), doc number)
+        self._order = []       # sorted (sort value, str(primary key), doc number)
+        self._exact = {}       # normalized field value -> doc numbers
+        self._postings = {}    # trigram -> doc numbers
+        self._next_doc = 0
+
+    def __len__(self):
+        return len(self._blobs)
+
+    # ---------------- maintenance ---------------- #
+
+    def add(self, key, values, _sorted: bool = True):
+        self.remove(key)
+        texts = tuple(normalize(values.get(field)) for field in self.fields)
+        if not any(texts):
+            return
+
+        doc = self._next_doc
+        self._next_doc += 1
+        self._doc_of[key] = doc
+        self._keys[doc] = key
+        self._blobs[doc] = "\n".join(f" {text}" for text in texts)
+        entry = self._entries[doc] = (values.get(self.sort_field) or "", str(key), doc)
+        if _sorted:
+            bisect.insort(self._order, entry)
+        else:
+            self._order.append(entry)
+
+        grams = set()
+        for text in texts:
+            grams |= field_trigrams(text)
+            self._exact.setdefault(text, set()).add(doc)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(doc)
+
+    def remove(self, key):
+        doc = self._doc_of.pop(key, None)
+        if doc is None:
+            return
+        del self._keys[doc]
+        del self._order[bisect.bisect_left(self._order, self._entries.pop(doc))]
+        for text in self._texts(self._blobs.pop(doc)):
+            _discard(self._exact, text, doc)
+            for gram in field_trigrams(text):
+                _discard(self._postings, gram, doc)
+
+    @staticmethod
+    def _texts(blob: str) -> tuple:
+        return tuple(part[1:] for part in blob.split("\n"))
+
+    def apply(self, changes: Optional[dict]):
+        """on_rows_changed callback."""
+        if self.stale:
+            return
+        if changes is None:
+            self.stale = True
+            return
+
+        for key, values in changes.items():
+            if values is None:
+                self.remove(key)
+                continue
+            if any(field not in values for field in self.fields + (self.sort_field,)):
+                self.stale = True  # the session never loaded the text: reload
+                return
+            doc = self._doc_of.get(key)
+            if (
+                doc is None
+                or self._texts(self._blobs[doc]) != tuple(normalize(values[field]) for field in self.fields)
+                or self._entries[doc][0] != (values[self.sort_field] or "")
+            ):
+                self.add(key, values)
+
+    async def load(self, db: AsyncSession):
+        versions = table_versions((self.table,))
+        db.info["use_primary"] = True  # a lagging replica would stay cached until the next write
+        columns = [getattr(self.model, name) for name in {"id", self.sort_field, *self.fields}]
+        result = await db.execute(select(*columns))
+
+        self._clear()
+        for row in result.mappings():
+            self.add(row["id"], row, _sorted=False)
+        self._order.sort()
+        # Rows written while loading may be missing: load again next time
+        self.stale = table_versions((self.table,)) != versions
+
+    async def ready(self, db: AsyncSession):
+        if self.stale:
+            async with self._lock:
+                if self.stale:
+                    await self.load(db)
+
+    # ---------------- queries ---------------- #
+
+    def _intersect(self, grams, within: Optional[set] = None) -> set:
+        postings = [self._postings.get(gram, set()) for gram in grams]
+        if within is not None:
+            postings.append(within)
+        postings.sort(key=len)
+        if len(postings) == 1:
+            return postings[0]
+        return postings[0].intersection(*postings[1:])
+
+    def _fuzzy_matches(self, q: str, exclude: set) -> dict:
+        """doc -> similarity (per mille) for rows sharing enough of the query's word trigrams."""
+        grams = word_trigrams(q)
+        needed = math.ceil(len(grams) * SEARCH_FUZZY_MIN_SIMILARITY)
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        # A row sharing `needed` trigrams shares at least one of the
+        # len - needed + 1 rarest: only those postings can produce candidates
+        candidates = set().union(*postings[:len(postings) - needed + 1]) - exclude
+
+        shared = Counter()
+        for docs in postings:
+            shared.update(docs & candidates)
+        return {doc: count * 1000 // len(grams) for doc, count in shared.items() if count >= needed}
+
+    def _in_order(self, candidates: set, accept, after: Optional[Tuple], wanted: int):
+        """Accepted candidates in sort order, after the (sort value, key) `after`."""
+        # Walking the sort order takes about wanted * len(order) / len(candidates)
+        # steps: sort the candidates instead when there are fewer of them
+        if len(candidates) ** 2 < wanted * len(self._order):
+            entries = sorted(self._entries[doc] for doc in candidates if accept(doc))
+            if after is not None:
+                entries = [entry for entry in entries if entry[:2] > after]
+            yield from entries
+            return
+
+        start = 0 if after is None else bisect.bisect_right(self._order, after + (math.inf,))
+        for i in range(start, len(self._order)):
+            entry = self._order[i]
+            if entry[2] in candidates and accept(entry[2]):
+                yield entry
+
+    def search(self, query: str, limit: int, after: Optional[Tuple] = None) -> Tuple[List[Tuple], int]:
+        """
+        (rank key, primary key) of the `limit` best matches ranked after
+        `after`, and the number of matches.
+        """
+        q = normalize(query)
+        if not q:
+            return [], 0
+
+        blobs = self._blobs
+        exact = self._exact.get(q, set())
+        if len(q) < 3:
+            # The word-start trigrams spell the whole query: nothing to verify
+            matches = word_starts = self._intersect(_word_start_grams(q))
+
+            def is_word_prefix(doc):
+                return True
+        else:
+            matches = {doc for doc in self._intersect(_grams(q)) if q in blobs[doc]}
+            word_starts = self._intersect(_word_start_grams(q), within=matches)
+            word = f" {q}"
+
+            def is_word_prefix(doc):
+                return doc in word_starts and word in blobs[doc]
+
+        tiers = [
+            (EXACT, exact, lambda doc: True),
+            (WORD_PREFIX, word_starts, lambda doc: doc not in exact and is_word_prefix(doc)),
+            (SUBSTRING, matches, lambda doc: doc not in exact and not is_word_prefix(doc)),
+        ]
+        total = len(matches)
+
+        page = []
+        for tier, candidates, accept in tiers:
+            if after is not None and tier < after[0]:
+                continue
+            start = after[2:] if after is not None and tier == after[0] else None
+            for sort_value, key_str, doc in self._in_order(candidates, accept, start, limit - len(page)):
+                page.append(((tier, -1000, sort_value, key_str), self._keys[doc]))
+                if len(page) == limit:
+                    return page, total
+
+        if len(matches) < SEARCH_FUZZY_BELOW and len(q) >= 4:
+            scores = self._fuzzy_matches(q, exclude=matches)
+            total += len(scores)
+            ranked = sorted((FUZZY, -score) + self._entries[doc] for doc, score in scores.items())
+            if after is not None:
+                ranked = [entry for entry in ranked if entry[:4] > after]
+            page += [(entry[:4], self._keys[entry[4]]) for entry in ranked[:limit - len(page)]]
+
+        return page, total
+
+
+def _word_start_grams(q: str) -> set:
+    """Trigrams every row with a word starting with q has."""
+    grams = {f"  {q[0]}"}
+    if len(q) >= 2:
+        grams.add(f" {q[:2]}")
+    return grams
+
+
+def _discard(index: dict, value, doc):
+    docs = index.get(value)
+    if docs is not None:
+        docs.discard(doc)
+        if not docs:
+            del index[value]
+
+
+student_search = SearchIndex(Student, ("roll_number", "name"), sort_field="roll_number")
+staff_search = SearchIndex(User, ("staff_roll_number", "staff_name"), sort_field="staff_roll_number")
+
+on_rows_changed("students", student_search.apply)
+on_rows_changed("users", staff_search.apply)
@@ -0,0 +1,125 @@
+"""
+Single-flight coalescing for expensive reads (single worker).
+
+At the top of each minute every dashboard asks for the same summary and
+report at once. A route opted in with @coalesced runs once for all the
+identical requests in flight: the first (the leader) computes, the others
+(followers) wait for its result, or its exception, and return it too.
+
+    @router.get("/summary")
+    @coalesced(scope=lambda kwargs: kwargs["current_user"].id)
+    async def attendance_summary(current_user=..., db=...):
+
+Requests are identical when they call the same route with the same query
+and path parameters in the same scope: whatever else the result depends
+on (the caller, for per-user routes; the negotiated encoding, for routes
+returning an encoded body), and the same data versions: `versions` is
+read when a request arrives, so a request that comes after a write never
+joins a computation that started before it (and answer with the old data
+under the ETag of the new). Dependencies (Depends) are not part of the
+key; they still run for every request, so authorization and ETags are
+unchanged.
+
+coalesced_requests_total{route, role} counts leaders and followers; the
+coalescing ratio is followers / (leaders + followers).
+"""
+import asyncio
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import params
+from starlette.requests import Request
+
+from app.helpers.metrics import Counter
+
+coalesced_requests_total = Counter(
+    "coalesced_requests_total",
+    "Requests to coalesced routes: leaders computed, followers shared a leader's result",
+    ("route", "role"),
+)
+
+# The leader was cancelled: its followers compute again
+_ABANDONED = object()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, route: str, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            shared = self._in_flight.get(key)
+            if shared is None:
+                break
+            coalesced_requests_total.inc(route=route, role="follower")
+            # Shielded: a follower going away must not cancel the leader's future
+            result = await asyncio.shield(shared)
+            if result is not _ABANDONED:
+                return result[0]
+
+        coalesced_requests_total.inc(route=route, role="leader")
+        shared = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            shared.set_result(_ABANDONED)
+            raise
+        except BaseException as exc:
+            shared.set_exception(exc)
+            # Followers retrieve it; mark it retrieved for when there are none
+            shared.exception()
+            raise
+        else:
+            shared.set_result((result,))
+            return result
+        finally:
+            del self._in_flight[key]
+
+    def __len__(self):
+        return len(self._in_flight)
+
+
+single_flight = SingleFlight()
+
+
+def _request_parameters(endpoint) -> tuple:
+    """The endpoint's parameters that come from the request itself (query, path)."""
+    names = []
+    for parameter in inspect.signature(endpoint).parameters.values():
+        if isinstance(parameter.default, params.Depends):
+            continue
+        if inspect.isclass(parameter.annotation) and issubclass(parameter.annotation, Request):
+            continue
+        names.append(parameter.name)
+    return tuple(names)
+
+
+def coalesced(
+    scope: Optional[Callable[[dict], Hashable]] = None,
+    route: Optional[str] = None,
+    versions: Optional[Callable[[], Hashable]] = None,
+):
+    """
+    Opts a route in to single-flight coalescing. `scope` gets the endpoint's
+    keyword arguments and returns what else identical requests must share;
+    `versions` returns the current versions of the data the route reads.
+    """
+    def decorate(endpoint):
+        label = route or endpoint.__name__
+        names = _request_parameters(endpoint)
+
+        # FastAPI reads the signature through functools.wraps
+        @functools.wraps(endpoint)
+        async def coalesced_endpoint(**kwargs):
+            key = (
+                label,
+                scope(kwargs) if scope else None,
+                tuple(kwargs.get(name) for name in names),
+                versions() if versions else None,
+            )
+            return await single_flight.do(label, key, lambda: endpoint(**kwargs))
+
+        return coalesced_endpoint
+
+    return decorate
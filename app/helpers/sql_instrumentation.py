@@ -0,0 +1,150 @@
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.config import APP_ENV, N_PLUS_ONE_THRESHOLD
+from app.helpers.request_context import route_label
+
+logger = logging.getLogger("app.sql")
+
+# Collapses expanded IN lists / VALUES tuples so "IN (?, ?)" and
+# "IN (?, ?, ?)" count as the same statement shape
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _WHITESPACE.sub(" ", _PARAM_LIST.sub("(?)", statement)).strip()
+
+
+class NPlusOneDetected(Exception):
+    def __init__(self, shape: str, count: int):
+        super().__init__(f"Statement ran {count} times in one request: {shape[:200]}")
+        self.shape = shape
+        self.count = count
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "total_time", "slowest_time", "slowest_statement", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+        self.shapes = {}
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    def most_repeated(self) -> int:
+        return max(self.shapes.values(), default=0)
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f'db;dur={self.total_time * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_time * 1000:.2f}, "
+            f"total;dur={total * 1000:.2f}"
+        )
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+# ------------------ SQLAlchemy hooks ------------------ #
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+
+    context._query_started = time.perf_counter()
+
+    shape = statement_shape(statement)
+    repeats = stats.shapes.get(shape, 0) + 1
+    stats.shapes[shape] = repeats
+
+    if APP_ENV == "development" and repeats > N_PLUS_ONE_THRESHOLD:
+        raise NPlusOneDetected(shape, repeats)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.record(statement, time.perf_counter() - context._query_started)
+
+
+def instrument_engine(engine) -> None:
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ------------------ Middleware ------------------ #
+class SQLInstrumentationMiddleware:
+    """
+    Collects per-request query count, DB time and the slowest statement,
+    sends them as a Server-Timing header and logs one JSON line per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            total = time.perf_counter() - started
+            logger.info(json.dumps({
+                "route": route_label(scope),
+                "status": status,
+                "duration_ms": round(total * 1000, 2),
+                "db_queries": stats.count,
+                "db_time_ms": round(stats.total_time * 1000, 2),
+                "db_slowest_ms": round(stats.slowest_time * 1000, 2),
+                "db_slowest_statement": (stats.slowest_statement or "")[:300],
+                "db_max_repeats": stats.most_repeated(),
+            }))
+
+
+async def n_plus_one_handler(request: Request, exc: NPlusOneDetected):
+    return JSONResponse(
+        status_code=500,
+        content={"detail": "N+1 query detected", "statement": exc.shape, "count": exc.count},
+    )
@@ -1,7 +1,29 @@
 from fastapi import FastAPI
-from app.database import async_engine as engine, Base
+import asyncio
+from app.database import async_engine as engine, all_engines, warm_up_pool, AsyncReadSessionLocal
+from app.migrations import verify_schema_version
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from app.helpers.sql_instrumentation import (
+    SQLInstrumentationMiddleware,
+    NPlusOneDetected,
+    instrument_engine,
+    n_plus_one_handler,
+)
+from app.helpers.metrics import MetricsMiddleware
+from app.helpers.idempotency import IdempotencyMiddleware
+from app.helpers.request_profiler import RequestProfilerMiddleware
+from app.helpers.compression import CompressionMiddleware
+from app.helpers.etags import ETagMiddleware, NotModified, not_modified_handler
+from app.config import REQUEST_PROFILER_ENABLED, AUTO_FREEZE_ATTENDANCE, PREWARM_LEAD_SECONDS
+from app.helpers.loop_monitor import monitor_event_loop
+from app.helpers.attendance_metrics import attendance_progress
+from app.helpers.reference_data import reference_data
+from app.helpers.search_index import staff_search, student_search
+from app.helpers.roster import roster
+from app.helpers.attendance_freeze import attendance_freeze, auto_freeze
+from app.helpers.attendance_time_checker import attendance_windows
+from app.helpers.prewarm import prewarm_before_windows
 
 from app.routes.admin_login import router as admin_login_router
 from app.routes.staff_login import router as staff_login_router
@@ -12,6 +34,7 @@ from app.routes.admin_program_type_listing import router as admin_program_type_r
 from app.routes.admin_students_listing import router as admin_students_listing_router
 from app.routes.staff_attendance_listing import router as staff_attendance_listing_router
 from app.routes.staff_attendance_marking import router as staff_attendance_marking_router
+from app.routes.staff_attendance_sync import router as staff_attendance_sync_router
 from app.routes.certificate_staff_listing import router as certificate_staff_router
 from app.routes.admin_staff_listing import router as admin_staff_listing_router
 from app.routes.admin_staff_deletion import router as admin_staff_deletion_router
@@ -20,15 +43,40 @@ from app.routes.admin_attendance_certificate_incharge_class_summary import route
 from app.routes.admin_student_deletion import router as admin_student_deleting_router
 from app.routes.admin_student_updation import router as admin_student_updation_router
 from app.routes.admin_staff_updation import router as admin_staff_updation_router
+from app.routes.admin_db_pool_stats import router as admin_db_pool_stats_router
+from app.routes.metrics import router as metrics_router
+from app.routes.admin_profiles import router as admin_profiles_router
+from app.routes.admin_attendance_freeze import router as admin_attendance_freeze_router
+from app.routes.admin_attendance_sessions import router as admin_attendance_sessions_router
+from app.routes.admin_attendance_log import router as admin_attendance_log_router
+from app.routes.admin_dashboard import router as admin_dashboard_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup code
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Startup code: schema is managed by `python migrate.py`, only check it here
+    async with engine.connect() as conn:
+        await verify_schema_version(conn)
+    for db_engine in all_engines():
+        await warm_up_pool(db_engine)
+    async with AsyncReadSessionLocal() as db:
+        await attendance_progress.load(db)
+        await reference_data.load(db)
+        await student_search.load(db)
+        await staff_search.load(db)
+        await roster.load(db)
+        await attendance_freeze.load(db)
+        await attendance_windows.load(db)
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    freezer = asyncio.create_task(auto_freeze()) if AUTO_FREEZE_ATTENDANCE else None
+    prewarmer = asyncio.create_task(prewarm_before_windows()) if PREWARM_LEAD_SECONDS > 0 else None
     yield
     # Shutdown code (if needed) can go here
-    await engine.dispose()
+    loop_monitor.cancel()
+    for task in (freezer, prewarmer):
+        if task:
+            task.cancel()
+    for db_engine in all_engines():
+        await db_engine.dispose()
 
 
 
@@ -45,6 +93,19 @@ app = FastAPI(
     description="ANJAC Convocation Attendance App"
 )
 
+for db_engine in all_engines():
+    instrument_engine(db_engine)
+app.add_middleware(SQLInstrumentationMiddleware)
+app.add_exception_handler(NPlusOneDetected, n_plus_one_handler)
+# Outside the SQL instrumentation: a replay runs no route and no query
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(MetricsMiddleware)
+if REQUEST_PROFILER_ENABLED:
+    app.add_middleware(RequestProfilerMiddleware)
+app.add_middleware(CompressionMiddleware)
+# Outside compression, so it sees the final Content-Encoding
+app.add_middleware(ETagMiddleware)
+app.add_exception_handler(NotModified, not_modified_handler)
 
 app.add_middleware(
     CORSMiddleware,
@@ -69,6 +130,7 @@ app.include_router(admin_program_type_router)
 app.include_router(admin_students_listing_router)
 app.include_router(staff_attendance_listing_router)
 app.include_router(staff_attendance_marking_router)
+app.include_router(staff_attendance_sync_router)
 app.include_router(certificate_staff_router)
 app.include_router(admin_staff_listing_router)
 app.include_router(admin_staff_deletion_router)
@@ -76,4 +138,11 @@ app.include_router(summary_router)
 app.include_router(admin_report_router)
 app.include_router(admin_student_deleting_router)
 app.include_router(admin_student_updation_router)
-app.include_router(admin_staff_updation_router)
\ No newline at end of file
+app.include_router(admin_staff_updation_router)
+app.include_router(admin_db_pool_stats_router)
+app.include_router(metrics_router)
+app.include_router(admin_profiles_router)
+app.include_router(admin_attendance_freeze_router)
+app.include_router(admin_attendance_sessions_router)
+app.include_router(admin_attendance_log_router)
+app.include_router(admin_dashboard_router)
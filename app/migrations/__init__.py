@@ -0,0 +1,83 @@
+"""
+Versioned schema migrations.
+
+Every migration module exposes a ``VERSION`` number and an ``upgrade(conn)``
+function which receives a *sync* connection (it is run through ``run_sync``).
+Migrations are applied in order by ``migrate.py``; the app itself only checks
+that the database is already at ``LATEST_VERSION`` when it boots.
+"""
+from sqlalchemy import select, func
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.models import SchemaVersion
+from app.migrations import (
+    v0001_baseline,
+    v0002_indexes,
+    v0003_attendance_freezes,
+    v0004_attendance_sessions,
+    v0005_attendance_events,
+    v0006_attendance_event_keys,
+)
+
+MIGRATIONS = [
+    v0001_baseline,
+    v0002_indexes,
+    v0003_attendance_freezes,
+    v0004_attendance_sessions,
+    v0005_attendance_events,
+    v0006_attendance_event_keys,
+]
+
+LATEST_VERSION = MIGRATIONS[-1].VERSION
+
+
+async def get_schema_version(conn: AsyncConnection) -> int:
+    """
+    Return the version the database is at (0 if it was never migrated).
+    """
+    try:
+        result = await conn.execute(select(func.max(SchemaVersion.version)))
+    except DBAPIError:
+        # schema_version table does not exist yet
+        await conn.rollback()
+        return 0
+    return result.scalar() or 0
+
+
+async def run_migrations(engine: AsyncEngine) -> list[int]:
+    """
+    Apply every pending migration, each in its own transaction.
+    Returns the list of versions that were applied.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(SchemaVersion.__table__.create, checkfirst=True)
+
+    async with engine.connect() as conn:
+        current = await get_schema_version(conn)
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.VERSION <= current:
+            continue
+
+        async with engine.begin() as conn:
+            await conn.run_sync(migration.upgrade)
+            await conn.execute(
+                SchemaVersion.__table__.insert().values(version=migration.VERSION)
+            )
+        applied.append(migration.VERSION)
+
+    return applied
+
+
+async def verify_schema_version(conn: AsyncConnection) -> None:
+    """
+    Fail fast at startup when the database is behind the code.
+    """
+    current = await get_schema_version(conn)
+    if current != LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {current}, expected {LATEST_VERSION}. "
+            "Run `python migrate.py` first."
+        )
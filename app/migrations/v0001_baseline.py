@@ -0,0 +1,26 @@
+"""
+Baseline: the tables that used to be created by ``create_all`` at startup.
+
+Existing databases already have them, so every table is created with
+``checkfirst`` and the migration is a no-op there.
+"""
+from app.models import Base
+
+VERSION = 1
+
+TABLES = [
+    "users",
+    "class_names",
+    "program_types",
+    "classes",
+    "students",
+    "staff_classes",
+]
+
+
+def upgrade(conn):
+    Base.metadata.create_all(
+        conn,
+        tables=[Base.metadata.tables[name] for name in TABLES],
+        checkfirst=True,
+    )
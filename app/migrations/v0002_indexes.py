@@ -0,0 +1,52 @@
+"""
+Indexes for the hot attendance queries and a (user_id, class_id) primary key
+on staff_classes so staff assignments can no longer be duplicated.
+"""
+from sqlalchemy import inspect, text
+
+from app.models import staff_classes
+
+VERSION = 2
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_students_class_gender_present "
+    "ON students (class_id, gender, present)",
+    "CREATE INDEX IF NOT EXISTS ix_students_class_roll "
+    "ON students (class_id, roll_number)",
+    "CREATE INDEX IF NOT EXISTS ix_users_assigned_class_id "
+    "ON users (assigned_class_id)",
+    "CREATE INDEX IF NOT EXISTS ix_staff_classes_class_id "
+    "ON staff_classes (class_id)",
+]
+
+
+def _rebuild_staff_classes(conn):
+    """
+    Neither SQLite nor a table full of duplicates lets us simply
+    ALTER TABLE ... ADD PRIMARY KEY, so copy the distinct rows into a new table.
+    """
+    uuid_type = staff_classes.c.user_id.type.compile(dialect=conn.dialect)
+
+    conn.execute(text(f"""
+        CREATE TABLE staff_classes_new (
+            user_id {uuid_type} NOT NULL REFERENCES users (id),
+            class_id {uuid_type} NOT NULL REFERENCES classes (id),
+            PRIMARY KEY (user_id, class_id)
+        )
+    """))
+    conn.execute(text("""
+        INSERT INTO staff_classes_new (user_id, class_id)
+        SELECT DISTINCT user_id, class_id FROM staff_classes
+        WHERE user_id IS NOT NULL AND class_id IS NOT NULL
+    """))
+    conn.execute(text("DROP TABLE staff_classes"))
+    conn.execute(text("ALTER TABLE staff_classes_new RENAME TO staff_classes"))
+
+
+def upgrade(conn):
+    pk = inspect(conn).get_pk_constraint("staff_classes")
+    if not pk.get("constrained_columns"):
+        _rebuild_staff_classes(conn)
+
+    for ddl in INDEXES:
+        conn.execute(text(ddl))
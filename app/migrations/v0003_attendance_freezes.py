@@ -0,0 +1,12 @@
+"""
+attendance_freezes: history of attendance freezes (see
+app/helpers/attendance_freeze.py). The open row keeps attendance frozen
+across restarts.
+"""
+from app.models import AttendanceFreeze
+
+VERSION = 3
+
+
+def upgrade(conn):
+    AttendanceFreeze.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,12 @@
+"""
+attendance_sessions: the configurable attendance windows (see
+app/helpers/attendance_time_checker.py). Left empty, the fixed daily window
+still applies.
+"""
+from app.models import AttendanceSession
+
+VERSION = 4
+
+
+def upgrade(conn):
+    AttendanceSession.__table__.create(conn, checkfirst=True)
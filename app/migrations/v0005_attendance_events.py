@@ -0,0 +1,24 @@
+"""
+attendance_events: the append-only attendance log (see
+app/helpers/attendance_log.py). Students already marked present get one
+event each, so the log starts out agreeing with students.present.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import literal, select
+
+from app.models import AttendanceEvent, Student
+
+VERSION = 5
+
+
+def upgrade(conn):
+    AttendanceEvent.__table__.create(conn, checkfirst=True)
+    conn.execute(
+        AttendanceEvent.__table__.insert().from_select(
+            ["student_id", "present", "marked_at"],
+            select(Student.id, Student.present, literal(datetime.now(timezone.utc), AttendanceEvent.marked_at.type))
+            .where(Student.present.is_(True))
+            .order_by(Student.id),
+        )
+    )
@@ -0,0 +1,19 @@
+"""
+attendance_events.client_key: the idempotency key an offline staff device
+sends with each queued mark (see app/routes/staff_attendance_sync.py),
+unique per staff member.
+"""
+from sqlalchemy import inspect, text
+
+VERSION = 6
+
+
+def upgrade(conn):
+    # Databases created after the column was added to the model already have it
+    columns = {column["name"] for column in inspect(conn).get_columns("attendance_events")}
+    if "client_key" not in columns:
+        conn.execute(text("ALTER TABLE attendance_events ADD COLUMN client_key VARCHAR"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_attendance_events_client_key "
+        "ON attendance_events (staff_id, client_key)"
+    ))
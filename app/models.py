@@ -1,6 +1,6 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, Enum, ForeignKey, Boolean, Table
+from sqlalchemy import Column, String, Enum, ForeignKey, Boolean, Table, Index, Integer, DateTime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -8,8 +8,10 @@ from app.database import Base
 staff_classes = Table(
     "staff_classes",
     Base.metadata,
-    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id")),
-    Column("class_id", UUID(as_uuid=True), ForeignKey("classes.id"))
+    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True),
+    Column("class_id", UUID(as_uuid=True), ForeignKey("classes.id"), primary_key=True),
+    # PK covers user -> classes lookups, this one covers class -> staff
+    Index("ix_staff_classes_class_id", "class_id"),
 )
 
 class UserRole(str, enum.Enum):
@@ -32,7 +34,7 @@ class User(Base):
 
     gender = Column(Enum("male", "female", name="staff_gender_enum"), nullable=False)
 
-    assigned_class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id"), nullable=True)
+    assigned_class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id"), nullable=True, index=True)
 
     assigned_classes = relationship(
         "Class",
@@ -96,3 +98,74 @@ class Student(Base):
     class_ref = relationship("Class", back_populates="students")
 
     present = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        # Staff listing / marking / summary filter by class, gender and present
+        Index("ix_students_class_gender_present", "class_id", "gender", "present"),
+        # Rosters are always returned ordered by roll number within a class
+        Index("ix_students_class_roll", "class_id", "roll_number"),
+    )
+
+
+class AttendanceSession(Base):
+    """
+    A window in which attendance can be marked (rehearsal, ceremony day 1,
+    day 2...), for every class or only one program type and/or department
+    so that windows can be staggered. Times are stored in UTC.
+    """
+    __tablename__ = "attendance_sessions"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+    starts_at = Column(DateTime(timezone=True), nullable=False)
+    ends_at = Column(DateTime(timezone=True), nullable=False)
+    # NULL: every program type / department
+    program_type_id = Column(UUID(as_uuid=True), ForeignKey("program_types.id"), nullable=True)
+    department = Column(String, nullable=True)
+
+
+class AttendanceEvent(Base):
+    """
+    Append-only log of attendance marks; students.present is the current
+    state projected from it. No foreign keys, so the history outlives
+    deleted students and sessions.
+    """
+    __tablename__ = "attendance_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    student_id = Column(UUID(as_uuid=True), nullable=False)
+    # NULL: marked outside any configured attendance session
+    session_id = Column(Integer, nullable=True)
+    # NULL: no staff member (migrated state)
+    staff_id = Column(UUID(as_uuid=True), nullable=True)
+    present = Column(Boolean, nullable=False)
+    marked_at = Column(DateTime(timezone=True), nullable=False)
+    # The offline device's idempotency key (staff_attendance_sync.py)
+    client_key = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_attendance_events_student_id", "student_id", "id"),
+        Index("ix_attendance_events_session_id", "session_id", "student_id"),
+        Index("ux_attendance_events_client_key", "staff_id", "client_key", unique=True),
+    )
+
+
+class AttendanceFreeze(Base):
+    """
+    One row per freeze of the attendance; the open one (unfrozen_at NULL)
+    means marks are locked and reads come from the frozen snapshot.
+    """
+    __tablename__ = "attendance_freezes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    frozen_at = Column(DateTime(timezone=True), nullable=False)
+    # NULL when the scheduler froze it
+    frozen_by = Column(UUID(as_uuid=True), nullable=True)
+    unfrozen_at = Column(DateTime(timezone=True), nullable=True)
+    unfrozen_by = Column(UUID(as_uuid=True), nullable=True)
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
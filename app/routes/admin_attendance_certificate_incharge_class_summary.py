@@ -1,12 +1,15 @@
-from fastapi import Depends,APIRouter,HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from fastapi import Depends,APIRouter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import User,UserRole,Student,Class
-from app.database import get_db
+from app.models import User,UserRole
+from app.database import get_read_db
 from app.schemas.class_summary import ClassSummaryResponse,ClassSummaryItem
 from app.auth.dependencies import get_current_user
+from app.helpers.data_changes import table_versions
+from app.helpers.etags import data_etag
+from app.helpers.attendance_freeze import attendance_freeze, attendance_view
+from app.helpers.roster import assigned_class_ids
+from app.helpers.single_flight import coalesced
 
 
 router=APIRouter(
@@ -14,79 +17,54 @@ router=APIRouter(
     tags=["Class Summary"]
 )
 
+SUMMARY_TABLES = ("users", "staff_classes", "classes", "class_names")
 
-@router.get("/summary", response_model=ClassSummaryResponse)
+
+def summary_versions():
+    # Every student write, not only the caller's classes': a coarser key
+    # only means fewer requests share a computation
+    snapshot = attendance_freeze.snapshot
+    return table_versions(SUMMARY_TABLES + ("students",)), snapshot.token if snapshot else None
+
+
+@router.get(
+    "/summary",
+    response_model=ClassSummaryResponse,
+    dependencies=[data_etag(*SUMMARY_TABLES, per_user=True, students_of="assigned", frozen=True)],
+)
+# Every admin gets the same summary; other staff their own classes'
+@coalesced(scope=lambda kwargs: "admin" if kwargs["current_user"].role == UserRole.admin
+           else kwargs["current_user"].id, versions=summary_versions)
 async def attendance_summary(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    # --- 1. Fetch current user with assigned classes ---
-    user_result = await db.execute(
-        select(User)
-        .options(selectinload(User.assigned_classes))
-        .where(User.id == current_user.id)
-    )
-    user = user_result.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # --- 2. Determine accessible classes ---
+    # --- 1. Admins see every class, others their assigned classes ---
+    ref, roster = await attendance_view(db)
     if current_user.role == UserRole.admin:
-        class_result = await db.execute(select(Class))
-        classes_list = class_result.scalars().all()
-        accessible_class_ids = {c.id for c in classes_list}
+        classes = list(ref.classes.values())
     else:
-        classes_list = user.assigned_classes
-        accessible_class_ids = {c.id for c in classes_list}
-
-    if not accessible_class_ids:
-        return ClassSummaryResponse(role=current_user.role, summary=[])
-
-    # --- 3. INIT summary for all classes ---
-    summary_dict = {
-        str(cls.id): {
-            "class_id": str(cls.id),
-            "class_name": "",
-            "total_students": 0,
-            "present_count": 0,
-            "absent_count": 0,
-        }
-        for cls in classes_list
-    }
-
-    # --- 4. Fetch students ---
-    student_result = await db.execute(
-        select(Student).where(Student.class_id.in_(accessible_class_ids))
-    )
-    students = student_result.scalars().all()
-
-    # Count students
-    for student in students:
-        cid = str(student.class_id)
-        summary_dict[cid]["total_students"] += 1
-        if student.present:
-            summary_dict[cid]["present_count"] += 1
-        else:
-            summary_dict[cid]["absent_count"] += 1
-
-    # --- 5. Load class names ---
-    class_details = await db.execute(
-        select(Class)
-        .options(selectinload(Class.class_name_ref))
-        .where(Class.id.in_(accessible_class_ids))
-    )
-    classes = class_details.scalars().all()
+        assigned = await assigned_class_ids(db, current_user.id)
+        classes = [ref.classes[class_id] for class_id in assigned if class_id in ref.classes]
+    classes.sort(key=lambda cls: cls.class_name or "")
 
+    # --- 2. Counts are popcounts of the roster's attendance bitsets ---
+    final_summary = []
     for cls in classes:
-        summary_dict[str(cls.id)]["class_name"] = cls.class_name_ref.name
-
-    # Convert dict → Pydantic models
-    final_summary = [
-        ClassSummaryItem(**item) for item in summary_dict.values()
-    ]
+        class_roster = roster.class_roster(cls.id)
+        total = len(class_roster.students)
+        present = class_roster.present_count()
+        final_summary.append(
+            ClassSummaryItem(
+                class_id=str(cls.id),
+                class_name=cls.class_name,
+                total_students=total,
+                present_count=present,
+                absent_count=total - present,
+            )
+        )
 
     return ClassSummaryResponse(
         role=current_user.role.value,
         summary=final_summary
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import is_admin
+from app.config import AUTO_FREEZE_ATTENDANCE
+from app.database import get_db, get_read_db
+from app.models import User
+from app.schemas.attendance_freeze import AttendanceFreezeStatus
+from app.helpers.attendance_freeze import attendance_freeze, attendance_view
+from app.helpers.attendance_reports import CSV_HEADERS, EXPORT_CACHE_KEY, REPORT_TABLES, attendance_csv
+from app.helpers.data_changes import table_versions
+from app.helpers.etags import data_etag
+from app.helpers.response_cache import response_cache
+
+router = APIRouter(
+    prefix="/admin/attendance",
+    tags=["Admin Attendance Freeze"],
+    dependencies=[Depends(is_admin)]
+)
+
+
+def freeze_status() -> dict:
+    snapshot = attendance_freeze.snapshot
+    return {
+        "frozen": attendance_freeze.locked,
+        "frozen_at": snapshot.frozen_at if snapshot else None,
+        "frozen_by": str(snapshot.frozen_by) if snapshot and snapshot.frozen_by else None,
+        "auto_freeze": AUTO_FREEZE_ATTENDANCE,
+    }
+
+
+@router.get("/freeze", response_model=AttendanceFreezeStatus)
+async def get_freeze_status():
+    return freeze_status()
+
+
+@router.post("/freeze", response_model=AttendanceFreezeStatus)
+async def freeze_attendance(
+    current_user: User = Depends(is_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Locks attendance marks and serves attendance reads from a snapshot taken now."""
+    if attendance_freeze.locked:
+        raise HTTPException(status_code=409, detail="Attendance is already frozen")
+    await attendance_freeze.freeze(db, current_user.id)
+    return freeze_status()
+
+
+@router.post("/unfreeze", response_model=AttendanceFreezeStatus)
+async def unfreeze_attendance(
+    current_user: User = Depends(is_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Reopens marking and drops the snapshot. Clients may still reuse frozen
+    responses for up to FROZEN_CACHE_MAX_AGE.
+    """
+    if not await attendance_freeze.unfreeze(db, current_user.id):
+        raise HTTPException(status_code=409, detail="Attendance is not frozen")
+    return freeze_status()
+
+
+@router.get("/export.csv", dependencies=[data_etag(*REPORT_TABLES, frozen=True)])
+async def export_attendance(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Every student's attendance as CSV."""
+    snapshot = attendance_freeze.snapshot
+    if snapshot is not None and snapshot.export is not None:
+        return await snapshot.export.response(request)
+
+    cached = response_cache.get(EXPORT_CACHE_KEY)
+    if cached:
+        return await cached.response(request)
+    db.info["use_primary"] = True  # versions below count the primary's commits
+    versions = table_versions(REPORT_TABLES)
+    ref, roster = await attendance_view(db)
+    export = response_cache.put(
+        EXPORT_CACHE_KEY, attendance_csv(ref, roster), "text/csv; charset=utf-8",
+        REPORT_TABLES, versions, headers=CSV_HEADERS,
+    )
+    return await export.response(request)
@@ -0,0 +1,94 @@
+import time
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import is_admin
+from app.database import get_db, get_read_db
+from app.schemas.attendance_log import AttendanceAsOfResponse, AttendanceEventListResponse
+from app.helpers.attendance_log import attendance_as_of, compact, events_since
+from app.helpers.attendance_time_checker import IST, attendance_windows
+from app.helpers.roster import roster
+
+router = APIRouter(
+    prefix="/admin/attendance",
+    tags=["Admin Attendance Log"],
+    dependencies=[Depends(is_admin)]
+)
+
+
+@router.get("/events", response_model=AttendanceEventListResponse)
+async def list_attendance_events(
+    after_id: int = Query(0, ge=0),
+    student_id: Optional[UUID] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Marks in log order after `after_id`: who changed since then."""
+    events, next_after_id = await events_since(
+        db, after_id, student_ids=[student_id] if student_id else None, limit=limit
+    )
+    return {
+        "events": [
+            {
+                "id": e.id,
+                "student_id": str(e.student_id),
+                "session_id": e.session_id,
+                "staff_id": str(e.staff_id) if e.staff_id else None,
+                "present": e.present,
+                "marked_at": e.marked_at,
+            }
+            for e in events
+        ],
+        "next_after_id": next_after_id,
+    }
+
+
+@router.get("/as-of", response_model=AttendanceAsOfResponse)
+async def attendance_at(
+    at: Optional[datetime] = Query(None, description="Times without an offset are read as IST; now when omitted"),
+    session_id: Optional[int] = Query(None, description="Only this session's marks"),
+    class_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Every marked student's attendance at a point in time, from the log."""
+    if at is not None and at.tzinfo is None:
+        at = IST.localize(at)
+    states = await attendance_as_of(db, at, session_id, any_session=session_id is None)
+
+    if class_id is not None:
+        await roster.ready(db)
+        members = {s.id for s in roster.students_of(class_id)}
+        states = {student_id: present for student_id, present in states.items() if student_id in members}
+
+    return {
+        "at": at,
+        "session_id": session_id,
+        "count": len(states),
+        "present_count": sum(states.values()),
+        "students": [
+            {"student_id": str(student_id), "present": present} for student_id, present in states.items()
+        ],
+    }
+
+
+@router.post("/compact")
+async def compact_attendance_log(
+    session_id: Optional[int] = Query(None, description="The session to compact; marks made outside sessions when omitted"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Drops every mark of an ended session but each student's last."""
+    schedule = await attendance_windows.get(db)
+    session = next((s for s in schedule.sessions if s.id == session_id), None)
+    if session is not None and session.ends_at > time.time():
+        raise HTTPException(status_code=400, detail="Session has not ended yet")
+
+    dropped = await compact(db, session_id)
+    return {
+        "message": "Attendance log compacted successfully",
+        "session_id": session_id,
+        "events_dropped": dropped,
+    }
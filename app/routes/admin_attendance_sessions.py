@@ -0,0 +1,89 @@
+import time
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import is_admin
+from app.database import get_db, get_read_db
+from app.models import AttendanceSession
+from app.schemas.attendance_sessions import AttendanceSessionCreate, AttendanceSessionListResponse
+from app.helpers.attendance_time_checker import IST, attendance_windows
+from app.helpers.reference_data import reference_data
+
+router = APIRouter(
+    prefix="/admin/attendance-sessions",
+    tags=["Admin Attendance Sessions"],
+    dependencies=[Depends(is_admin)]
+)
+
+
+@router.get("", response_model=AttendanceSessionListResponse)
+async def list_attendance_sessions(db: AsyncSession = Depends(get_read_db)):
+    """The configured attendance windows, in IST; none means the daily 12:05 PM - 1:15 PM window."""
+    schedule = await attendance_windows.get(db)
+    ref = await reference_data.get(db)
+    now = time.time()
+    sessions = [
+        {
+            "id": s.id,
+            "name": s.name,
+            "starts_at": datetime.fromtimestamp(s.starts_at, IST),
+            "ends_at": datetime.fromtimestamp(s.ends_at, IST),
+            "program_type": ref.program_types[s.program_type_id].type_name
+            if s.program_type_id in ref.program_types else None,
+            "department": s.department,
+            "open_now": s.starts_at <= now <= s.ends_at,
+        }
+        for s in schedule.sessions
+    ]
+    return {"count": len(sessions), "sessions": sessions}
+
+
+@router.post("")
+async def create_attendance_session(payload: AttendanceSessionCreate, db: AsyncSession = Depends(get_db)):
+    starts_at, ends_at = (
+        IST.localize(value) if value.tzinfo is None else value
+        for value in (payload.starts_at, payload.ends_at)
+    )
+    if ends_at <= starts_at:
+        raise HTTPException(status_code=400, detail="Session must end after it starts")
+
+    program_type_id = None
+    if payload.program_type:
+        program_type = (await reference_data.get(db)).program_types_by_name.get(payload.program_type)
+        if not program_type:
+            raise HTTPException(status_code=404, detail="Program type not found")
+        program_type_id = program_type.id
+
+    session = AttendanceSession(
+        name=payload.name,
+        starts_at=starts_at.astimezone(timezone.utc),
+        ends_at=ends_at.astimezone(timezone.utc),
+        program_type_id=program_type_id,
+        department=payload.department,
+    )
+    db.add(session)
+    await db.commit()
+
+    return {
+        "message": "Attendance session created successfully",
+        "session_id": session.id,
+    }
+
+
+@router.delete("/{session_id}")
+async def delete_attendance_session(session_id: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(AttendanceSession).where(AttendanceSession.id == session_id))
+    session = result.scalars().first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Attendance session not found")
+
+    await db.delete(session)
+    await db.commit()
+
+    return {
+        "message": "Attendance session deleted successfully",
+        "session_id": session_id,
+    }
@@ -4,7 +4,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from typing import List
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from app.database import get_db
 from app.models import Class, ClassName, ProgramType,Student
@@ -81,48 +81,50 @@ async def bulk_create_classes(classes: List[ClassCreate], db: AsyncSession = Dep
     created_classes = []
     skipped = []
 
+    # Names, program types and existing classes for the whole list up front,
+    # so the query count doesn't grow with its length
+    names = {cls.class_name for cls in classes}
+    type_names = {cls.program_type for cls in classes}
+    result = await db.execute(select(ClassName).where(ClassName.name.in_(names)))
+    class_names = {obj.name: obj for obj in result.scalars()}
+    result = await db.execute(select(ProgramType).where(ProgramType.type_name.in_(type_names)))
+    program_types = {obj.type_name: obj for obj in result.scalars()}
+    result = await db.execute(
+        select(ClassName.name, ProgramType.type_name, Class.department, Class.section, Class.regular_or_self)
+        .select_from(Class)
+        .join(ClassName)
+        .join(ProgramType)
+        .where(ClassName.name.in_(names))
+    )
+    existing = {tuple(row) for row in result}
+
     for cls in classes:
         # Check duplicate
-        result = await db.execute(
-            select(Class)
-            .join(ClassName)
-            .join(ProgramType)
-            .where(
-                ClassName.name == cls.class_name,
-                ProgramType.type_name == cls.program_type,
-                Class.department == cls.department,
-                Class.section == cls.section,
-                Class.regular_or_self == cls.regular_or_self
-            )
-        )
-        existing_class = result.scalars().first()
-
-        if existing_class:
+        key = (cls.class_name, cls.program_type, cls.department, cls.section, cls.regular_or_self)
+        if key in existing:
             skipped.append({
                 "class_name": cls.class_name,
                 "program_type": cls.program_type,
                 "reason": "Duplicate class"
             })
             continue
+        existing.add(key)
 
         # ClassName
-        result = await db.execute(select(ClassName).where(ClassName.name == cls.class_name))
-        class_name_obj = result.scalars().first()
+        class_name_obj = class_names.get(cls.class_name)
         if not class_name_obj:
-            class_name_obj = ClassName(name=cls.class_name)
+            class_name_obj = class_names[cls.class_name] = ClassName(id=uuid4(), name=cls.class_name)
             db.add(class_name_obj)
-            await db.flush()
 
         # ProgramType
-        result = await db.execute(select(ProgramType).where(ProgramType.type_name == cls.program_type))
-        program_type_obj = result.scalars().first()
+        program_type_obj = program_types.get(cls.program_type)
         if not program_type_obj:
-            program_type_obj = ProgramType(type_name=cls.program_type)
+            program_type_obj = program_types[cls.program_type] = ProgramType(id=uuid4(), type_name=cls.program_type)
             db.add(program_type_obj)
-            await db.flush()
 
         # Create
         new_class = Class(
+            id=uuid4(),
             class_name_id=class_name_obj.id,
             program_type_id=program_type_obj.id,
             department=cls.department,
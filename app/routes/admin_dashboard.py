@@ -0,0 +1,117 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.auth.dependencies import is_admin
+from app.models import User, UserRole, staff_classes
+from app.schemas.dashboard import DashboardResponse
+from app.helpers.attendance_freeze import attendance_freeze, attendance_view
+from app.helpers.etags import data_etag
+from app.helpers.response_cache import cached_json
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin Dashboard"],
+    dependencies=[Depends(is_admin)]
+)
+
+# The dashboard is cached until one of these tables is written
+DASHBOARD_TABLES = ("classes", "class_names", "program_types", "students", "users", "staff_classes")
+
+
+# ---------------------------------------------------
+# Everything the admin dashboard shows, in one response
+# ---------------------------------------------------
+@router.get("/dashboard", response_model=DashboardResponse,
+            dependencies=[data_etag(*DASHBOARD_TABLES, frozen=True)])
+async def admin_dashboard(request: Request, db: AsyncSession = Depends(get_read_db)):
+    snapshot = attendance_freeze.snapshot
+
+    async def build():
+        # Classes and attendance from the in-process caches (or the frozen
+        # snapshot); staff assignments are the one query
+        ref, roster = await attendance_view(db)
+        result = await db.execute(
+            select(User.id, User.role, staff_classes.c.class_id)
+            .outerjoin(staff_classes, staff_classes.c.user_id == User.id)
+            .where(User.role != UserRole.admin)
+        )
+
+        staff_roles, assigned, staff_per_class = {}, set(), {}
+        for user_id, role, class_id in result:
+            staff_roles[user_id] = role.value
+            if class_id is not None:
+                assigned.add(user_id)
+                per_role = staff_per_class.setdefault(class_id, {})
+                per_role[role.value] = per_role.get(role.value, 0) + 1
+
+        by_role = {}
+        for role in staff_roles.values():
+            by_role[role] = by_role.get(role, 0) + 1
+
+        classes, program_types = [], {}
+        for cls in sorted(ref.classes.values(), key=lambda cls: cls.class_name or ""):
+            class_roster = roster.class_roster(cls.id)
+            total = len(class_roster.students)
+            present = class_roster.present_count()
+            classes.append({
+                "class_id": str(cls.id),
+                "class_name": cls.class_name,
+                "program_type": cls.program_type,
+                "department": cls.department,
+                "section": cls.section,
+                "regular_or_self": cls.regular_or_self,
+                "total_students": total,
+                "present_count": present,
+                "absent_count": total - present,
+                "staff_counts": staff_per_class.get(cls.id, {}),
+            })
+
+            rollup = program_types.get(cls.program_type_id)
+            if rollup is None:
+                rollup = program_types[cls.program_type_id] = {
+                    "program_type_id": str(cls.program_type_id),
+                    "program_type": cls.program_type,
+                    "classes_count": 0,
+                    "total_students": 0,
+                    "present_count": 0,
+                    "absent_count": 0,
+                }
+            rollup["classes_count"] += 1
+            rollup["total_students"] += total
+            rollup["present_count"] += present
+            rollup["absent_count"] += total - present
+
+        # Program types without classes are listed too
+        for pt in ref.program_types.values():
+            program_types.setdefault(pt.id, {
+                "program_type_id": str(pt.id),
+                "program_type": pt.type_name,
+                "classes_count": 0,
+                "total_students": 0,
+                "present_count": 0,
+                "absent_count": 0,
+            })
+
+        students = sum(c["total_students"] for c in classes)
+        present = sum(c["present_count"] for c in classes)
+        return DashboardResponse(
+            frozen=snapshot is not None,
+            totals={
+                "classes": len(classes),
+                "students": students,
+                "present_count": present,
+                "absent_count": students - present,
+            },
+            program_types=sorted(program_types.values(), key=lambda pt: pt["program_type"] or ""),
+            classes=classes,
+            staff={
+                "total_staff": len(staff_roles),
+                "by_role": by_role,
+                "unassigned_staff": len(staff_roles) - len(assigned),
+            },
+        ).model_dump()
+
+    key = "dashboard" if snapshot is None else f"dashboard:{snapshot.token}"
+    return await cached_json(request, db, key, DASHBOARD_TABLES, build)
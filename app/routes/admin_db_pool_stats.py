@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from app.auth.dependencies import is_admin
+from app.helpers.pool_stats import pool_snapshot, labelled_engines
+
+router = APIRouter(
+    prefix="/admin/db",
+    tags=["Admin Database"],
+    dependencies=[Depends(is_admin)]
+)
+
+
+@router.get("/pool-stats")
+async def get_pool_stats():
+    """
+    Connection pool usage: checked out / overflow connections and how long
+    requests waited for a connection.
+    """
+    return {
+        label: pool_snapshot(engine)
+        for label, engine in labelled_engines().items()
+    }
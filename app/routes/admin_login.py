@@ -5,7 +5,7 @@ from sqlalchemy import select
 from datetime import timedelta
 import uuid
 
-from app.database import get_db
+from app.database import get_primary_read_db
 from app.models import User, UserRole
 from app.auth.security import verify_password
 from app.auth.jwt import create_access_token
@@ -17,7 +17,7 @@ router = APIRouter(
 @router.post("/login")
 async def admin_login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """
     Admin login using username + password.
@@ -0,0 +1,38 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from app.auth.dependencies import is_admin
+from app.config import PROFILE_DIR
+from app.helpers.request_profiler import recent_profiles
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["Admin Profiling"],
+    dependencies=[Depends(is_admin)]
+)
+
+
+@router.get("")
+async def list_profiles():
+    """
+    Latest request profiles (newest first) with their time breakdown.
+    Profile a request by sending it with an "X-Profile: sample" or
+    "X-Profile: cprofile" header.
+    """
+    return {"profiles": list(reversed(recent_profiles))}
+
+
+@router.get("/{profile_id}")
+async def download_profile(profile_id: str):
+    """
+    Folded stacks (.folded) for flamegraph.pl / speedscope, or cProfile
+    stats (.prof) for snakeviz.
+    """
+    profile = next((p for p in recent_profiles if p["id"] == profile_id), None)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    media_type = "text/plain" if profile["file"].endswith(".folded") else "application/octet-stream"
+    return FileResponse(os.path.join(PROFILE_DIR, profile["file"]), media_type=media_type, filename=profile["file"])
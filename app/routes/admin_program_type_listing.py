@@ -1,13 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from uuid import UUID
-from sqlalchemy.orm import selectinload
 
-from app.database import get_db
-from app.models import ProgramType,Class
+from app.database import get_read_db
 from app.auth.dependencies import is_admin  # your admin dependency
 from app.schemas.class_schemas import ClassItem,ClassListResponse
+from app.helpers.response_cache import cached_json
+from app.helpers.etags import data_etag
+from app.helpers.reference_data import ProgramTypeRecord, ReferenceSnapshot, reference_data
 
 from app.schemas.program_types import (
     ProgramTypeListResponse,
@@ -22,58 +22,13 @@ router = APIRouter(
     dependencies=[Depends(is_admin)]
 )
 
-
-# ---------------------------------------------------
-# 1. List Program Types
-# ---------------------------------------------------
-@router.get("/list-program-types", response_model=ProgramTypeListResponse)
-async def list_program_types(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(ProgramType))
-    program_types = result.scalars().all()
-
-    return ProgramTypeListResponse(
-        count=len(program_types),
-        program_types=[
-            ProgramTypeItem(
-                id=str(pt.id),
-                type_name=pt.type_name
-            )
-            for pt in program_types
-        ]
-    )
+# Responses below are cached until one of these tables is written
+PROGRAM_TYPE_TABLES = ("program_types",)
+CLASS_LIST_TABLES = ("classes", "class_names", "program_types")
 
 
-# ---------------------------------------------------
-# 2. Get Classes by Program Type Name
-# ---------------------------------------------------
-@router.get("/get-classes-by-program-type-name/{program_type_name}",
-            response_model=ClassListByProgramTypeResponse)
-async def get_classes_by_program_type_name(
-    program_type_name: str,
-    db: AsyncSession = Depends(get_db)
-):
-
-    result = await db.execute(
-        select(ProgramType).where(ProgramType.type_name == program_type_name)
-    )
-    program_type = result.scalars().first()
-
-    if not program_type:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Program type '{program_type_name}' not found"
-        )
-
-    result = await db.execute(
-        select(Class)
-        .options(
-            selectinload(Class.class_name_ref),
-            selectinload(Class.program_type_ref),
-        )
-        .where(Class.program_type_id == program_type.id)
-    )
-
-    classes = result.scalars().all()
+def _classes_of_program_type(ref: ReferenceSnapshot, program_type: ProgramTypeRecord) -> dict:
+    classes = ref.classes_of_program_type(program_type.id)
 
     return ClassListByProgramTypeResponse(
         program_type=program_type.type_name,
@@ -81,25 +36,76 @@ async def get_classes_by_program_type_name(
         classes=[
             ClassItem(
                 id=str(c.id),
-                class_name=c.class_name_ref.name,
-                program_type=c.program_type_ref.type_name,
+                class_name=c.class_name,
+                program_type=c.program_type,
                 department=c.department,
                 section=c.section,
                 regular_or_self=c.regular_or_self,
             )
             for c in classes
         ]
-    )
+    ).model_dump()
+
+
+# ---------------------------------------------------
+# 1. List Program Types
+# ---------------------------------------------------
+@router.get("/list-program-types", response_model=ProgramTypeListResponse,
+            dependencies=[data_etag(*PROGRAM_TYPE_TABLES)])
+async def list_program_types(request: Request, db: AsyncSession = Depends(get_read_db)):
+    async def build():
+        program_types = (await reference_data.get(db)).program_types.values()
+
+        return ProgramTypeListResponse(
+            count=len(program_types),
+            program_types=[
+                ProgramTypeItem(
+                    id=str(pt.id),
+                    type_name=pt.type_name
+                )
+                for pt in program_types
+            ]
+        ).model_dump()
+
+    return await cached_json(request, db, "program-types", PROGRAM_TYPE_TABLES, build)
+
+
+# ---------------------------------------------------
+# 2. Get Classes by Program Type Name
+# ---------------------------------------------------
+@router.get("/get-classes-by-program-type-name/{program_type_name}",
+            response_model=ClassListByProgramTypeResponse,
+            dependencies=[data_etag(*CLASS_LIST_TABLES)])
+async def get_classes_by_program_type_name(
+    program_type_name: str,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
+    async def build():
+        ref = await reference_data.get(db)
+        program_type = ref.program_types_by_name.get(program_type_name)
+
+        if not program_type:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Program type '{program_type_name}' not found"
+            )
+
+        return _classes_of_program_type(ref, program_type)
+
+    return await cached_json(request, db, f"classes:type-name:{program_type_name}", CLASS_LIST_TABLES, build)
 
 
 # ---------------------------------------------------
 # 3. Get Classes by Program Type ID
 # ---------------------------------------------------
 @router.get("/get-classes-by-program-type-id/{program_type_id}",
-            response_model=ClassListByProgramTypeResponse)
+            response_model=ClassListByProgramTypeResponse,
+            dependencies=[data_etag(*CLASS_LIST_TABLES)])
 async def get_classes_by_program_type_id(
     program_type_id: str,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
 
     try:
@@ -107,68 +113,39 @@ async def get_classes_by_program_type_id(
     except:
         raise HTTPException(status_code=400, detail="Invalid program_type_id")
 
-    result = await db.execute(
-        select(ProgramType).where(ProgramType.id == program_type_uuid)
-    )
-    program_type = result.scalars().first()
+    async def build():
+        ref = await reference_data.get(db)
+        program_type = ref.program_types.get(program_type_uuid)
 
-    if not program_type:
-        raise HTTPException(status_code=404, detail="Program type not found")
+        if not program_type:
+            raise HTTPException(status_code=404, detail="Program type not found")
 
-    result = await db.execute(
-        select(Class)
-        .options(
-            selectinload(Class.class_name_ref),
-            selectinload(Class.program_type_ref),
-        )
-        .where(Class.program_type_id == program_type_uuid)
-    )
+        return _classes_of_program_type(ref, program_type)
 
-    classes = result.scalars().all()
-
-    return ClassListByProgramTypeResponse(
-        program_type=program_type.type_name,
-        count=len(classes),
-        classes=[
-            ClassItem(
-                id=str(c.id),
-                class_name=c.class_name_ref.name,
-                program_type=c.program_type_ref.type_name,
-                department=c.department,
-                section=c.section,
-                regular_or_self=c.regular_or_self,
-            )
-            for c in classes
-        ]
-    )
+    return await cached_json(request, db, f"classes:type-id:{program_type_uuid}", CLASS_LIST_TABLES, build)
 
 
 
-@router.get("/list-classes", response_model=ClassListResponse)
-async def list_all_classes(db: AsyncSession = Depends(get_db)):
+@router.get("/list-classes", response_model=ClassListResponse, dependencies=[data_etag(*CLASS_LIST_TABLES)])
+async def list_all_classes(request: Request, db: AsyncSession = Depends(get_read_db)):
     """
-    Fetch all classes from the database
+    Fetch all classes from the reference data cache
     """
 
-    result = await db.execute(
-        select(Class)
-        .options(
-            selectinload(Class.class_name_ref),
-            selectinload(Class.program_type_ref)
-        )
-    )
-
-    classes = result.scalars().all()
-
-    class_list = []
-    for c in classes:
-        class_list.append({
-            "id": str(c.id),
-            "class_name": c.class_name_ref.name if c.class_name_ref else "",
-            "program_type": c.program_type_ref.type_name if c.program_type_ref else "",
-            "department": c.department or "",
-            "section": c.section or "",
-            "regular_or_self": c.regular_or_self or ""
-        })
-
-    return ClassListResponse(count=len(class_list), classes=class_list)
\ No newline at end of file
+    async def build():
+        classes = (await reference_data.get(db)).classes.values()
+
+        class_list = []
+        for c in classes:
+            class_list.append({
+                "id": str(c.id),
+                "class_name": c.class_name or "",
+                "program_type": c.program_type or "",
+                "department": c.department or "",
+                "section": c.section or "",
+                "regular_or_self": c.regular_or_self or ""
+            })
+
+        return ClassListResponse(count=len(class_list), classes=class_list).model_dump()
+
+    return await cached_json(request, db, "classes:all", CLASS_LIST_TABLES, build)
\ No newline at end of file
@@ -6,7 +6,7 @@ from sqlalchemy.exc import IntegrityError
 
 from app.database import get_db
 from app.models import User
-from app.helpers.class_finder_for_staffs_creation import get_classes_from_request
+from app.helpers.class_finder_for_staffs_creation import ClassLookup, get_classes_from_request
 from app.schemas.staff_schemas import StaffCreate,StaffUpdate
 from app.auth.dependencies import is_admin
 
@@ -55,15 +55,26 @@ async def create_staff(staff_data: StaffCreate, db: AsyncSession = Depends(get_d
 async def bulk_create_staff(staff_list: List[StaffCreate], db: AsyncSession = Depends(get_db)):
     created_staffs = []
 
+    # Taken roll numbers and every class the list assigns, each in one query
+    result = await db.execute(
+        select(User.staff_roll_number)
+        .where(User.staff_roll_number.in_({staff_data.staff_roll_number for staff_data in staff_list}))
+    )
+    taken = set(result.scalars())
+    classes = await ClassLookup.load(
+        db,
+        ids=[class_id for staff_data in staff_list for class_id in staff_data.assigned_class_ids or ()],
+        names=[name for staff_data in staff_list for name in staff_data.assigned_class_names or ()],
+    )
+
     for staff_data in staff_list:
         # Skip duplicates
-        result = await db.execute(select(User).where(User.staff_roll_number == staff_data.staff_roll_number))
-        existing_user = result.scalars().first()
-        if existing_user:
+        if staff_data.staff_roll_number in taken:
             continue
+        taken.add(staff_data.staff_roll_number)
 
-        assigned_classes = await get_classes_from_request(
-            db, ids=staff_data.assigned_class_ids, names=staff_data.assigned_class_names
+        assigned_classes = classes.resolve(
+            ids=staff_data.assigned_class_ids, names=staff_data.assigned_class_names
         )
 
         new_staff = User(
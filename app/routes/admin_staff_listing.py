@@ -1,179 +1,216 @@
 from fastapi import APIRouter, Depends,Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select,or_
+from sqlalchemy import select
 from typing import List,Optional
-from sqlalchemy.orm import joinedload
+from uuid import UUID
 
 import enum
-from app.database import get_db
-from app.models import User,Class,ProgramType
+from app.database import get_read_db
+from app.models import User,staff_classes
 from app.auth.dependencies import is_admin
-from app.schemas.staff_schemas import StaffRead,StaffListResponse,StaffRead2,AssignedClassRead
+from app.schemas.staff_schemas import StaffRead,StaffListResponse,StaffListResponse2
+from app.helpers.fast_json import trusted_json
+from app.helpers.etags import data_etag
+from app.helpers.reference_data import ReferenceSnapshot, reference_data
+from app.helpers.pagination import PageParams, count_rows
+from app.helpers.search_index import staff_search
 
 router=APIRouter(
     prefix="/admin",
     tags=["Admin Staffs Listing"]
 )
 
+# Staff listings show each staff member's assigned classes
+STAFF_TABLES = ("users", "staff_classes", "classes", "class_names", "program_types")
 
 
-@router.get("/staff/search", dependencies=[Depends(is_admin)])
+# One row per (staff, assigned class), only the columns we send back
+_STAFF_WITH_CLASS_IDS = (
+    select(
+        User.id,
+        User.staff_name,
+        User.staff_roll_number,
+        User.role,
+        User.gender,
+        staff_classes.c.class_id,
+    )
+    .outerjoin(staff_classes, staff_classes.c.user_id == User.id)
+)
+
+
+async def _staff_with_classes(db: AsyncSession, ref: ReferenceSnapshot, page: PageParams, *conditions):
+    """
+    One page of staff matching the conditions, in id order: a list of
+    (staff row, assigned classes), the next page's cursor and (on request)
+    the total. One row per assignment from the DB, class details from the
+    reference data.
+    """
+    staff_ids = select(User.id).where(*conditions)
+    total = await count_rows(db, staff_ids) if page.include_total else None
+
+    after = page.after_key(UUID)
+    if after:
+        staff_ids = staff_ids.where(User.id > after[0])
+    staff_ids = staff_ids.order_by(User.id).limit(page.limit + 1).subquery()
+
+    result = await db.execute(
+        _STAFF_WITH_CLASS_IDS
+        .join(staff_ids, staff_ids.c.id == User.id)
+        .order_by(User.id)
+    )
+
+    staffs = _group_classes(ref, result)
+    staffs, next_cursor = page.split(list(staffs.values()), lambda staff: (staff[0].id,))
+    return staffs, next_cursor, total
+
+
+def _group_classes(ref: ReferenceSnapshot, result) -> dict:
+    """staff id -> (staff row, assigned classes) from one row per assignment."""
+    staffs = {}
+    for row in result:
+        staff = staffs.get(row.id)
+        if staff is None:
+            staff = staffs[row.id] = (row, [])
+        cls = ref.classes.get(row.class_id)
+        if cls is not None:
+            staff[1].append(cls)
+    return staffs
+
+
+def _has_class_of_program_type(ref: ReferenceSnapshot, program_type: str):
+    """Staff with at least one class of this program type (all their classes are listed)."""
+    pt = ref.program_types_by_name.get(program_type)
+    class_ids = [c.id for c in ref.classes_of_program_type(pt.id)] if pt else []
+    return User.id.in_(
+        select(staff_classes.c.user_id).where(staff_classes.c.class_id.in_(class_ids))
+    )
+
+
+def _role(role):
+    return role.value if isinstance(role, enum.Enum) else role
+
+
+@router.get("/staff/search", dependencies=[Depends(is_admin), data_etag(*STAFF_TABLES)])
 async def search_staff(
     q: str,
-    db: AsyncSession = Depends(get_db)
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Search staff by name or roll number (with assigned class IDs & names)
+    Search staff by name or roll number (with assigned class IDs & names),
+    best matches first, from the in-memory trigram index
     """
-
-    query = (
-        select(User)
-        .options(
-            joinedload(User.assigned_classes)
-            .joinedload(Class.class_name_ref)
-        )
-        .where(
-            or_(
-                User.staff_name.ilike(f"%{q}%"),
-                User.staff_roll_number.ilike(f"%{q}%")
-            )
+    ref = await reference_data.get(db)
+    await staff_search.ready(db)
+    matches, total = staff_search.search(q, page.limit + 1, page.after_key(int, int, str, str))
+    matches, next_cursor = page.split(matches, lambda match: match[0])
+
+    found = {}
+    if matches:
+        result = await db.execute(
+            _STAFF_WITH_CLASS_IDS.where(User.id.in_([key for _, key in matches]))
         )
-    )
-
-    result = await db.execute(query)
-    staffs = result.scalars().unique().all()
+        found = _group_classes(ref, result)
+    staffs = [found[key] for _, key in matches if key in found]
 
     return {
         "count": len(staffs),
+        "next_cursor": next_cursor,
+        "total": total if page.include_total else None,
         "results": [
             {
                 "staff_id": str(staff.id),
                 "staff_name": staff.staff_name,
                 "staff_roll_number": staff.staff_roll_number,
-                "role": staff.role.value if isinstance(staff.role, enum.Enum) else staff.role,
+                "role": _role(staff.role),
                 "gender": staff.gender,
                 "assigned_classes": [
                     {
                         "id": str(c.id),
-                        "name": c.class_name_ref.name
+                        "name": c.class_name
                     }
-                    for c in staff.assigned_classes
-                    if c.class_name_ref
+                    for c in classes
                 ]
             }
-            for staff in staffs
+            for staff, classes in staffs
         ]
     }
 
-@router.get("/list-staffs", response_model=StaffListResponse, dependencies=[Depends(is_admin)])
+@router.get("/list-staffs", response_model=StaffListResponse,
+             dependencies=[Depends(is_admin), data_etag(*STAFF_TABLES)])
 async def list_all_staff(
     role: Optional[str] = Query(None),
     gender: Optional[str] = Query(None),
     program_type: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(User).options(
-        joinedload(User.assigned_classes)
-        .joinedload(Class.program_type_ref),
-        joinedload(User.assigned_classes)
-        .joinedload(Class.class_name_ref)
-    )
+    ref = await reference_data.get(db)
 
     # Apply filters at DB level
+    conditions = []
     if role:
-        query = query.where(User.role == role)
+        conditions.append(User.role == role)
     if gender:
-        query = query.where(User.gender == gender)
+        conditions.append(User.gender == gender)
     if program_type:
-        query = query.join(User.assigned_classes).join(Class.program_type_ref).where(
-            ProgramType.type_name == program_type
-        )
+        conditions.append(_has_class_of_program_type(ref, program_type))
 
-    result = await db.execute(query)
-    staff_list = result.scalars().unique().all()  # remove duplicates
+    staff_list, next_cursor, total = await _staff_with_classes(db, ref, page, *conditions)
 
     filtered_staff = []
 
-    for staff in staff_list:
+    for staff, classes in staff_list:
         filtered_staff.append(
             StaffRead(
                 id=str(staff.id),
                 staff_name=staff.staff_name,
                 staff_roll_number=staff.staff_roll_number,
-                role=staff.role.value if isinstance(staff.role, enum.Enum) else staff.role,
+                role=_role(staff.role),
                 gender=staff.gender,
-                assigned_classes=[c.class_name_ref.name for c in staff.assigned_classes if c.class_name_ref]
+                assigned_classes=[c.class_name for c in classes]
             )
         )
 
-    return {"count": len(filtered_staff), "staffs": filtered_staff}
+    return {"count": len(filtered_staff), "staffs": filtered_staff, "next_cursor": next_cursor, "total": total}
 
 @router.get(
     "/list-staffs-with-assighned_classes",
-    dependencies=[Depends(is_admin)]
+    response_model=StaffListResponse2,
+    dependencies=[Depends(is_admin), data_etag(*STAFF_TABLES)]
 )
 async def list_all_staff2(
     role: Optional[str] = Query(None),
     gender: Optional[str] = Query(None),
     program_type: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(User).options(
-        joinedload(User.assigned_classes)
-        .joinedload(Class.program_type_ref),
-        joinedload(User.assigned_classes)
-        .joinedload(Class.class_name_ref)
-    )
+    ref = await reference_data.get(db)
 
     # Filters
+    conditions = []
     if role:
-        query = query.where(User.role == role)
-
+        conditions.append(User.role == role)
     if gender:
-        query = query.where(User.gender == gender)
-
+        conditions.append(User.gender == gender)
     if program_type:
-        query = (
-            query
-            .join(User.assigned_classes)
-            .join(Class.program_type_ref)
-            .where(ProgramType.type_name == program_type)
-        )
-
-    result = await db.execute(query)
-    staff_list = result.scalars().unique().all()
-
-    filtered_staff = []
-
-    for staff in staff_list:
-        # Fallbacks for None
-        name = staff.staff_name or ""
-        roll = staff.staff_roll_number or ""
-        gender_val = staff.gender or ""
-        role_val = staff.role.value if isinstance(staff.role, enum.Enum) else staff.role
-
-        # Assigned classes
-        assigned_classes = [
-            AssignedClassRead(
-                id=str(c.id),
-                name=c.class_name_ref.name if c.class_name_ref else ""
-            )
-            for c in staff.assigned_classes or []
-        ]
-
-        filtered_staff.append(
-            StaffRead2(
-                id=str(staff.id),
-                staff_name=name,
-                staff_roll_number=roll,
-                role=role_val,
-                gender=gender_val,
-                assigned_classes=assigned_classes
-            )
-        )
-
-    # Return as dict without wrapping in another Pydantic model
-    return {
-        "count": len(filtered_staff),
-        "staffs": filtered_staff
-    }
+        conditions.append(_has_class_of_program_type(ref, program_type))
+
+    staff_list, next_cursor, total = await _staff_with_classes(db, ref, page, *conditions)
+    staffs = [
+        {
+            "id": staff.id,
+            "staff_name": staff.staff_name or "",
+            "staff_roll_number": staff.staff_roll_number or "",
+            "role": _role(staff.role),
+            "gender": staff.gender or "",
+            "assigned_classes": [{"id": c.id, "name": c.class_name or ""} for c in classes],
+        }
+        for staff, classes in staff_list
+    ]
+
+    return trusted_json(
+        {"count": len(staffs), "staffs": staffs, "next_cursor": next_cursor, "total": total},
+        model=StaffListResponse2,
+    )
@@ -6,9 +6,10 @@ from sqlalchemy.future import select
 
 from app.database import get_db
 from app.auth.dependencies import is_admin
-from app.models import Student, Class
+from app.models import Student
 from app.schemas.student_schemas import StudentCreate, StudentBulkCreate
 from app.helpers.class_finder_for_students_creation import get_class_object
+from app.helpers.reference_data import reference_data
 
 router = APIRouter(
     prefix="/admin", 
@@ -30,8 +31,7 @@ async def create_student(payload: StudentCreate, db: AsyncSession = Depends(get_
     # Resolve class
     cls_obj = None
     if payload.class_id:
-        result = await db.execute(select(Class).where(Class.id == UUID(payload.class_id)))
-        cls_obj = result.scalars().first()
+        cls_obj = (await reference_data.get(db)).classes.get(UUID(payload.class_id))
 
     else:
         if not (payload.class_name and payload.program_type and payload.department and payload.section):
@@ -77,19 +77,26 @@ async def create_students_bulk(payload: StudentBulkCreate, db: AsyncSession = De
     created = []
     errors = []
 
+    # Roll numbers already taken, in one query for the whole list; classes
+    # come from the reference data
+    result = await db.execute(
+        select(Student.roll_number)
+        .where(Student.roll_number.in_({item.roll_number for item in payload.students}))
+    )
+    taken = set(result.scalars())
+    ref = await reference_data.get(db)
+
     for item in payload.students:
 
         # Check existing roll number
-        result = await db.execute(select(Student).where(Student.roll_number == item.roll_number))
-        if result.scalars().first():
+        if item.roll_number in taken:
             errors.append({"roll_number": item.roll_number, "error": "Roll number exists"})
             continue
 
         # Resolve class
         cls_obj = None
         if item.class_id:
-            result = await db.execute(select(Class).where(Class.id == UUID(item.class_id)))
-            cls_obj = result.scalars().first()
+            cls_obj = ref.classes.get(UUID(item.class_id))
         else:
             cls_obj = await get_class_object(
                 db,
@@ -112,6 +119,7 @@ async def create_students_bulk(payload: StudentBulkCreate, db: AsyncSession = De
         )
         db.add(new_stu)
         created.append(new_stu)
+        taken.add(item.roll_number)
 
     await db.commit()
 
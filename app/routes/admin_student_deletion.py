@@ -34,18 +34,28 @@ async def delete_student(student_id: str, db: AsyncSession = Depends(get_db)):
 async def delete_students_bulk(student_ids: list[str], db: AsyncSession = Depends(get_db)):
     deleted = []
     errors = []
-    
+
+    ids, invalid = {}, {}
     for sid in student_ids:
         try:
-            result = await db.execute(select(Student).where(Student.id == UUID(sid)))
-            student = result.scalars().first()
-            if student:
-                await db.delete(student)
-                deleted.append(sid)
-            else:
-                errors.append({"student_id": sid, "error": "Not found"})
+            ids[sid] = UUID(sid)
         except Exception as e:
-            errors.append({"student_id": sid, "error": str(e)})
+            invalid[sid] = str(e)
+
+    # The whole list in one query
+    result = await db.execute(select(Student).where(Student.id.in_(set(ids.values()))))
+    students = {student.id: student for student in result.scalars()}
+
+    for sid in student_ids:
+        if sid in invalid:
+            errors.append({"student_id": sid, "error": invalid[sid]})
+            continue
+        student = students.pop(ids[sid], None)
+        if student:
+            await db.delete(student)
+            deleted.append(sid)
+        else:
+            errors.append({"student_id": sid, "error": "Not found"})
     
     await db.commit()
     
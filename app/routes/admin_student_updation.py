@@ -1,3 +1,5 @@
+from contextlib import nullcontext
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -5,8 +7,13 @@ from uuid import UUID
 
 from app.database import get_db
 from app.auth.dependencies import is_admin
-from app.models import Student, Class
+from app.models import Student, Class, User
 from app.schemas.student_schemas import StudentUpdate
+from app.helpers.attendance_freeze import attendance_freeze
+from app.helpers.attendance_log import attendance_log
+from app.helpers.attendance_metrics import attendance_progress
+from app.helpers.attendance_time_checker import attendance_windows
+from app.helpers.reference_data import reference_data
 
 router = APIRouter(
     prefix="/admin",
@@ -16,10 +23,30 @@ router = APIRouter(
 
 
 
+async def record_present(db: AsyncSession, student: Student, present: bool, admin: User):
+    """
+    Commits the student's other changes, then records the admin's
+    correction through the attendance log, as a staff member's mark is.
+    """
+    schedule = await attendance_windows.get(db)
+    ref = await reference_data.get(db)
+    student_id, session_id = student.id, schedule.session_at(student.class_id)
+    program_type_id = ref.classes[student.class_id].program_type_id
+
+    await db.commit()  # the log writes on the writer connection this session holds
+    try:
+        was_present = await attendance_log.record(student_id, present, admin.id, session_id)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    attendance_progress.record_mark(program_type_id, was_present, present)
+
+
 @router.patch("/student/update/by-id/{student_id}")
 async def update_student_by_id(
     student_id: UUID,
     payload: StudentUpdate,
+    current_user: User = Depends(is_admin),
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(
@@ -48,9 +75,6 @@ async def update_student_by_id(
     if payload.gender is not None:
         student.gender = payload.gender
 
-    if payload.present is not None:
-        student.present = payload.present
-
     if payload.class_id is not None:
         result = await db.execute(
             select(Class).where(Class.id == payload.class_id)
@@ -60,7 +84,12 @@ async def update_student_by_id(
             raise HTTPException(status_code=404, detail="Class not found")
         student.class_id = cls.id
 
-    await db.commit()
+    # Attendance is final while frozen
+    async with attendance_freeze.marking() if payload.present is not None else nullcontext():
+        if payload.present is not None:
+            await record_present(db, student, payload.present, current_user)
+        else:
+            await db.commit()
     await db.refresh(student)
 
     return {
@@ -73,6 +102,7 @@ async def update_student_by_id(
 async def update_student_by_roll(
     roll_number: str,
     payload: StudentUpdate,
+    current_user: User = Depends(is_admin),
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(
@@ -100,9 +130,6 @@ async def update_student_by_roll(
     if payload.gender is not None:
         student.gender = payload.gender
 
-    if payload.present is not None:
-        student.present = payload.present
-
     if payload.class_id is not None:
         result = await db.execute(
             select(Class).where(Class.id == payload.class_id)
@@ -112,7 +139,12 @@ async def update_student_by_roll(
             raise HTTPException(status_code=404, detail="Class not found")
         student.class_id = cls.id
 
-    await db.commit()
+    # Attendance is final while frozen
+    async with attendance_freeze.marking() if payload.present is not None else nullcontext():
+        if payload.present is not None:
+            await record_present(db, student, payload.present, current_user)
+        else:
+            await db.commit()
     await db.refresh(student)
 
     return {
@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import or_
 from sqlalchemy.future import select
 from app.auth.dependencies import is_admin
 from uuid import UUID
 
-from app.database import get_db
-from app.models import Class, Student
+from app.database import get_read_db
+from app.models import Student
 from app.schemas.student_schemas import StudentListByClassResponse,StudentListByClassResponse2
+from app.helpers.fast_json import trusted_json
+from app.helpers.etags import data_etag
+from app.helpers.pagination import PageParams
+from app.helpers.attendance_freeze import attendance_view
+from app.helpers.search_index import student_search
 
 
 router = APIRouter(
@@ -17,28 +21,32 @@ router = APIRouter(
 )
 
 
-@router.get("/student/search")
+@router.get("/student/search", dependencies=[data_etag("students")])
 async def search_students(
     q: str,
-    db: AsyncSession = Depends(get_db)
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Search students by name or roll number
-    (aligned with list-by-class & update APIs)
+    (aligned with list-by-class & update APIs), best matches first.
+    Prefix, substring and typo-tolerant matches come from the in-memory
+    trigram index; only the page's rows are read from the database.
     """
-    result = await db.execute(
-        select(Student).where(
-            or_(
-                Student.name.ilike(f"%{q}%"),
-                Student.roll_number.ilike(f"%{q}%")
-            )
-        )
-    )
+    await student_search.ready(db)
+    matches, total = student_search.search(q, page.limit + 1, page.after_key(int, int, str, str))
+    matches, next_cursor = page.split(matches, lambda match: match[0])
 
-    students = result.scalars().all()
+    found = {}
+    if matches:
+        result = await db.execute(select(Student).where(Student.id.in_([key for _, key in matches])))
+        found = {student.id: student for student in result.scalars()}
+    students = [found[key] for _, key in matches if key in found]
 
     return {
         "count": len(students),
+        "next_cursor": next_cursor,
+        "total": total if page.include_total else None,
         "results": [
             {
                 "student_id": str(student.id),
@@ -56,11 +64,13 @@ async def search_students(
 # ---------------------------------------------------------
 # List all students in a class (with optional ?present=bool)
 # ---------------------------------------------------------
-@router.get("/list-by-class/{class_id}",response_model=StudentListByClassResponse)
+@router.get("/list-by-class/{class_id}",response_model=StudentListByClassResponse,
+            dependencies=[data_etag("classes", students_of="path", frozen=True)])
 async def get_students_by_class(
     class_id: str,
     present: bool | None = Query(None),
-    db: AsyncSession = Depends(get_db)
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
 ):
 
     # Validate UUID format
@@ -70,32 +80,25 @@ async def get_students_by_class(
         raise HTTPException(status_code=400, detail="Invalid class_id format")
 
     # Confirm class exists
-    class_query = await db.execute(select(Class).where(Class.id == class_uuid))
-    class_obj = class_query.scalars().first()
-
-    if not class_obj:
+    ref, roster = await attendance_view(db)
+    if class_uuid not in ref.classes:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    # Build query
-    query = (
-        select(Student)
-        .where(Student.class_id == class_uuid)
-        .order_by(Student.roll_number.asc())
-    )
-
-    # Optional filter
-    if present is not None:
-        query = query.where(Student.present == present)
-
-    # Execute query (async-safe, no lazy loading)
-    result = await db.execute(query)
-    students = result.scalars().all()
+    # One page in roll number order, from the in-process roster
+    matching = roster.students_of(class_uuid, present=present)
+    after = page.after_key(str)
+    students = roster.students_of(class_uuid, present=present, after_roll_number=after[0]) if after else matching
+    students, next_cursor = page.split(students[:page.limit + 1], lambda s: (s.roll_number,))
 
-    # Response
+    # Response: total_students (and total, on request) counts the whole
+    # class, as it did before pagination; count this page
     return {
         "class_id": str(class_id),
-        "total_students": len(students),
+        "total_students": len(matching),
+        "count": len(students),
         "filtered_by_present": present,
+        "next_cursor": next_cursor,
+        "total": len(matching) if page.include_total else None,
         "students": [
             {
                 "student_id": str(s.id),
@@ -114,12 +117,14 @@ async def get_students_by_class(
 # ---------------------------------------------------------
 @router.get(
     "/list-by-class_with_assighned_classes/{class_id}",
-    response_model=StudentListByClassResponse2
+    response_model=StudentListByClassResponse2,
+    dependencies=[data_etag("classes", students_of="path", frozen=True)]
 )
 async def get_students_by_class2(
     class_id: str,
     present: bool | None = Query(None),
-    db: AsyncSession = Depends(get_db)
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
 ):
     # Validate UUID format
     try:
@@ -128,41 +133,35 @@ async def get_students_by_class2(
         raise HTTPException(status_code=400, detail="Invalid class_id format")
 
     # Confirm class exists
-    class_query = await db.execute(
-        select(Class).where(Class.id == class_uuid)
-    )
-    class_obj = class_query.scalars().first()
-
-    if not class_obj:
+    ref, roster = await attendance_view(db)
+    if class_uuid not in ref.classes:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    # Build query
-    query = (
-        select(Student)
-        .where(Student.class_id == class_uuid)
-        .order_by(Student.roll_number.asc())
+    matching = roster.students_of(class_uuid, present=present)
+    after = page.after_key(str)
+    rows = roster.students_of(class_uuid, present=present, after_roll_number=after[0]) if after else matching
+    rows, next_cursor = page.split(rows[:page.limit + 1], lambda s: (s.roll_number,))
+    students = [
+        {
+            "student_id": s.id,
+            "roll_number": s.roll_number,
+            "name": s.name,
+            "gender": s.gender,
+            "present": s.present,
+            "class_id": s.class_id  # 🔥 matches update API
+        }
+        for s in rows
+    ]
+
+    return trusted_json(
+        {
+            "class_id": class_uuid,
+            "total_students": len(matching),
+            "count": len(students),
+            "filtered_by_present": present,
+            "next_cursor": next_cursor,
+            "total": len(matching) if page.include_total else None,
+            "students": students,
+        },
+        model=StudentListByClassResponse2,
     )
-
-    # Optional filter
-    if present is not None:
-        query = query.where(Student.present == present)
-
-    result = await db.execute(query)
-    students = result.scalars().all()
-
-    return {
-        "class_id": str(class_obj.id),
-        "total_students": len(students),
-        "filtered_by_present": present,
-        "students": [
-            {
-                "student_id": str(s.id),
-                "roll_number": s.roll_number,
-                "name": s.name,
-                "gender": s.gender,
-                "present": s.present,
-                "class_id": str(s.class_id)  # 🔥 matches update API
-            }
-            for s in students
-        ]
-    }
@@ -1,44 +1,41 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from uuid import UUID
 
 from app.auth.dependencies import get_current_user
-from app.database import get_db
-from app.models import User, Class, UserRole
+from app.database import get_read_db
+from app.models import User, UserRole
 from app.schemas.certificate_staff_listing_students import StaffClassesResponse,ClassWithStudentsResponse
+from app.helpers.etags import data_etag
+from app.helpers.attendance_freeze import attendance_view
+from app.helpers.reference_data import reference_data
+from app.helpers.roster import assigned_class_ids
 
 router = APIRouter(
     prefix="/certificate-staff",
     tags=["Certificate Incharge Attendance Listing"]
 )
 
-@router.get("/list-classes",response_model=StaffClassesResponse)
+# The caller's assigned classes
+ASSIGNED_CLASS_TABLES = ("users", "staff_classes", "classes", "class_names", "program_types")
+
+@router.get("/list-classes",response_model=StaffClassesResponse,
+            dependencies=[data_etag(*ASSIGNED_CLASS_TABLES, per_user=True)])
 async def list_classes_for_certificate_incharge(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     # Allowed only for certificate incharge
     if (current_user.role != UserRole.certificate_incharge and not getattr(current_user,"can_access_both",False)):
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    # The caller's classes from the in-process caches
+    ref = await reference_data.get(db)
+    assigned = [ref.classes[class_id] for class_id in await assigned_class_ids(db, current_user.id)
+                if class_id in ref.classes]
 
-    result = await db.execute(
-        select(User)
-        .options(
-            selectinload(User.assigned_classes)
-            .selectinload(Class.class_name_ref)
-        )
-        .where(User.id == current_user.id)
-    )
-
-    staff = result.scalar_one_or_none()
-    if not staff:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    if not staff.assigned_classes:
+    if not assigned:
         return {
             "message": "No classes assigned",
             "classes": []
@@ -47,12 +44,12 @@ async def list_classes_for_certificate_incharge(
     classes = [
         {
             "class_id": str(c.id),
-            "class_name": c.class_name_ref.name,
+            "class_name": c.class_name,
             "department": c.department,
             "section": c.section,
             "regular_or_self": c.regular_or_self
         }
-        for c in staff.assigned_classes
+        for c in assigned
     ]
 
     return {
@@ -64,12 +61,13 @@ async def list_classes_for_certificate_incharge(
 
 
 
-@router.get("/class/{class_id}/students", response_model=ClassWithStudentsResponse)
+@router.get("/class/{class_id}/students", response_model=ClassWithStudentsResponse,
+            dependencies=[data_etag(*ASSIGNED_CLASS_TABLES, per_user=True, students_of="path", frozen=True)])
 async def get_students_by_class(
     class_id: str,
     present: Optional[bool] = None,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     # Allowed only for certificate incharge
     if (current_user.role != UserRole.certificate_incharge and not getattr(current_user,"can_access_both",False)):
@@ -81,40 +79,20 @@ async def get_students_by_class(
         raise HTTPException(status_code=400, detail="Invalid class ID format")
 
 
-    # Load class with students
-    result = await db.execute(
-        select(Class)
-        .options(
-            selectinload(Class.students),
-            selectinload(Class.class_name_ref)
-        )
-        .where(Class.id == class_uuid)
-
-    )
-    cls = result.scalar_one_or_none()
+    # Class, access check and students from the in-process caches
+    ref, roster = await attendance_view(db)
+    cls = ref.classes.get(class_uuid)
     if not cls:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    # Check staff actually has access to this class
-    result_staff = await db.execute(
-        select(User)
-        .options(selectinload(User.assigned_classes))
-        .where(User.id == current_user.id)
-    )
-    staff = result_staff.scalar_one()
-
-    if cls not in staff.assigned_classes:
+    if class_uuid not in await assigned_class_ids(db, current_user.id):
         raise HTTPException(status_code=403, detail="You are not incharge of this class")
 
-    # Apply present filter
-    if present is None:
-        filtered_students = cls.students
-    else:
-        filtered_students = [s for s in cls.students if s.present == present]
+    filtered_students = roster.students_of(class_uuid, present=present)
 
     return {
         "class_id": str(cls.id),
-        "class_name": cls.class_name_ref.name,
+        "class_name": cls.class_name,
         "department": cls.department,
         "section": cls.section,
         "regular_or_self": cls.regular_or_self,
@@ -0,0 +1,40 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import bearer_scheme, get_current_user
+from app.config import METRICS_TOKEN
+from app.database import get_read_db
+from app.helpers.attendance_metrics import attendance_progress
+from app.helpers.metrics import render_metrics
+from app.models import UserRole
+
+router = APIRouter(tags=["Monitoring"])
+
+
+async def can_scrape(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """The scrape token (METRICS_TOKEN) or an admin's access token."""
+    if METRICS_TOKEN and secrets.compare_digest(credentials.credentials.encode(), METRICS_TOKEN.encode()):
+        return
+    user = await get_current_user(credentials, db)
+    if user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False,
+            dependencies=[Depends(can_scrape)])
+async def metrics(db: AsyncSession = Depends(get_read_db)):
+    """
+    Prometheus scrape endpoint
+    """
+    await attendance_progress.refresh(db)
+    return PlainTextResponse(
+        render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,24 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional,List
+from typing import Optional
 
 from app.auth.dependencies import get_current_user
-from app.database import get_db
-from app.models import User, Class, UserRole
-from app.schemas.listing_for_attendance import AttendanceStaffResponse,ClassInfoWithStudents,StudentInfo
+from app.database import get_read_db
+from app.models import User, UserRole
+from app.schemas.listing_for_attendance import AttendanceStaffResponse
+from app.helpers.fast_json import trusted_json
+from app.helpers.etags import data_etag
+from app.helpers.attendance_freeze import attendance_view
+from app.helpers.roster import assigned_class_ids
 
 
 
 router = APIRouter(prefix="/attendance-staff", tags=["Attendance Incharge Attendance Listing"])
 
 
-@router.get("/list-students", response_model=AttendanceStaffResponse)
+@router.get(
+    "/list-students",
+    response_model=AttendanceStaffResponse,
+    dependencies=[data_etag("users", "staff_classes", "classes", "class_names",
+                            per_user=True, students_of="assigned", frozen=True)],
+)
 async def list_students_for_attendance_incharge(
     present: Optional[bool] = Query(None, description="Filter by attendance status: true=present, false=absent"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
 
     # Only attendance-incharge is allowed
@@ -26,64 +33,42 @@ async def list_students_for_attendance_incharge(
         not getattr(current_user,"can_access_both",False)):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Load user with assigned classes and their students + class_name_ref
-    result = await db.execute(
-        select(User)
-        .options(
-            selectinload(User.assigned_classes)
-            .selectinload(Class.students),        # load students
-            selectinload(User.assigned_classes)
-            .selectinload(Class.class_name_ref)   # load class name
-        )
-        .where(User.id == current_user.id)
-    )
-
-    staff = result.scalars().first()
-
-    if not staff:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    if not staff.assigned_classes:
-        return AttendanceStaffResponse(
-            staff_id=str(current_user.id),
-            staff_name=current_user.staff_name or "",
-            staff_gender=staff.gender,
-            assigned_classes_count=0,
-            classes=[]
-        )
+    # Assigned classes and their students come from the in-process caches;
+    # in steady state this route runs no query of its own
+    ref, roster = await attendance_view(db)
 
-    response_data: List[ClassInfoWithStudents] = []
+    classes = []
+    for class_id in await assigned_class_ids(db, current_user.id):
+        cls = ref.classes.get(class_id)
+        if cls is None:
+            continue
+        students = roster.students_of(class_id, gender=current_user.gender, present=present)
+        classes.append({
+            "class_id": cls.id,
+            "class_name": cls.class_name,
+            "department": cls.department,
+            "section": cls.section,
+            "regular_or_self": cls.regular_or_self,
+            "students_count": len(students),
+            "students": [
+                {
+                    "student_id": s.id,
+                    "roll_number": s.roll_number,
+                    "name": s.name,
+                    "gender": s.gender,
+                    "present": s.present,
+                }
+                for s in students
+            ],
+        })
 
-    for c in staff.assigned_classes:
-        # Filter students by staff gender and optional present/absent
-        filtered_students = [
-            StudentInfo(
-                student_id=str(s.id),
-                roll_number=s.roll_number,
-                name=s.name,
-                gender=s.gender,
-                present=s.present
-            )
-            for s in c.students
-            if s.gender == staff.gender and (present is None or s.present == present)
-        ]
-
-        response_data.append(
-            ClassInfoWithStudents(
-                class_id=str(c.id),
-                class_name=c.class_name_ref.name,
-                department=c.department,
-                section=c.section,
-                regular_or_self=c.regular_or_self,
-                students_count=len(filtered_students),
-                students=filtered_students
-            )
-        )
-
-    return AttendanceStaffResponse(
-        staff_id=str(current_user.id),
-        staff_name=staff.staff_name or "",
-        staff_gender=staff.gender,
-        assigned_classes_count=len(staff.assigned_classes),
-        classes=response_data
-    )
\ No newline at end of file
+    return trusted_json(
+        {
+            "staff_id": current_user.id,
+            "staff_name": current_user.staff_name or "",
+            "staff_gender": current_user.gender,
+            "assigned_classes_count": len(classes),
+            "classes": classes,
+        },
+        model=AttendanceStaffResponse,
+    )
@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.auth.dependencies import get_current_user
-from app.database import get_db
-from app.models import User, Student,UserRole
-from app.helpers.attendance_time_checker import check_attendance_time_limit
+from app.database import get_read_db, note_write
+from app.models import User
+from app.helpers.attendance_time_checker import attendance_windows, check_attendance_time_limit
+from app.helpers.marking_rules import check_marking_role, check_student_markable
 from app.schemas.attendance_marking import MarkAttendanceResponse
+from app.helpers.attendance_metrics import attendance_progress
+from app.helpers.attendance_freeze import attendance_freeze
+from app.helpers.attendance_log import attendance_log
+from app.helpers.reference_data import reference_data
+from app.helpers.roster import assigned_class_ids, roster
 
 router = APIRouter(prefix="/attendance-staff", tags=["Attendance Incharge Marking Attendances"])
 
@@ -21,16 +25,18 @@ async def mark_attendance(
     student_id: str,
     present: bool,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
+    # Only reads run on this session (the log does the writing): on the
+    # primary, never a lagging replica
+    db.info["use_primary"] = True
 
     # 1. Only attendance incharge allowed
-    if (current_user.role != UserRole.attendance_incharge and 
-        not getattr(current_user,"can_access_both",False)):
-        raise HTTPException(status_code=403, detail="Not authorized")
+    check_marking_role(current_user)
 
-    # 2. Time limit check
-    check_attendance_time_limit()
+    # 2. Time limit check: is any attendance window open (cached, no query)
+    schedule = await attendance_windows.get(db)
+    check_attendance_time_limit(schedule)
 
     # 3. Convert student_id into UUID bytes (SQLite BLOB)
     try:
@@ -38,48 +44,37 @@ async def mark_attendance(
     except:
         raise HTTPException(status_code=400, detail="Invalid student_id format")
 
-    # 4. Fetch student WITH CLASS using selectinload (prevents lazy loading)
-    result = await db.execute(
-        select(Student)
-        .options(selectinload(Student.class_ref))
-        .where(Student.id == student_uuid)
-    )
-    student = result.scalar_one_or_none()
-
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-
-    # 5. Fetch current_user WITH assigned_classes using selectinload
-    user_result = await db.execute(
-        select(User)
-        .options(selectinload(User.assigned_classes))
-        .where(User.id == current_user.id)
-    )
-    staff = user_result.scalar_one_or_none()
-
-    if not staff:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # 6. Check assigned class constraint
-    assigned_class_ids = {c.id for c in staff.assigned_classes}
-
-    if student.class_id not in assigned_class_ids:
-        raise HTTPException(
-            status_code=403,
-            detail="You are not assigned to this student's class"
+    # 4. Student, its class and whether this staff is assigned to it, from
+    #    the in-process caches; refused while attendance is frozen, and a
+    #    freeze waits for this mark to commit
+    async with attendance_freeze.marking():
+        ref = await reference_data.get(db)
+        await roster.ready(db)
+        student = roster.get(student_uuid)
+        cls = ref.classes.get(student.class_id) if student else None
+
+        if not cls:
+            raise HTTPException(status_code=404, detail="Student not found")
+
+        # 5. Assigned class, same gender and the class's own window
+        check_student_markable(
+            current_user, student, await assigned_class_ids(db, current_user.id), schedule
         )
 
-    # 7. Same gender restriction
-    if student.gender != staff.gender:
-        raise HTTPException(
-            status_code=403,
-            detail="You can mark attendance only for same-gender students"
-        )
+        # 6. Append the mark to the attendance log, committed with the
+        #    other marks of its batch; the roster follows the commit
+        await db.commit()  # hand the read connection back while waiting
+        try:
+            was_present = await attendance_log.record(
+                student.id, present, current_user.id, schedule.session_at(student.class_id)
+            )
+        except LookupError:
+            raise HTTPException(status_code=404, detail="Student not found")
+
+    # Let this staff member's next listing read their own mark
+    note_write(current_user.id)
 
-    # 8. Update attendance
-    student.present = present
-    await db.commit()
-    await db.refresh(student)
+    attendance_progress.record_mark(cls.program_type_id, was_present, present)
 
     return {
         "message": "Attendance updated successfully",
@@ -0,0 +1,146 @@
+"""
+Offline sync for attendance incharges.
+
+A staff device that loses its connection keeps marking and queues the
+marks, each with its own key and the time it was made. When it reconnects
+it uploads the queue and gets back, for every mark, whether it was applied,
+plus the current attendance of every student in its classes marked since
+its last sync (the cursor):
+
+    POST /attendance-staff/sync {"since": 1234, "marks": [{"key": ..., "student_id": ...,
+                                 "present": true, "marked_at": "2026-03-02T12:20:05+05:30"}]}
+
+Marks are checked like mark_attendance, against the class's window at the
+time they were made, and are only taken until ATTENDANCE_SYNC_GRACE_SECONDS
+after that window closed. Retrying an upload is safe: keys already logged come
+back as duplicates without reaching the writer. When a student was marked
+by someone else later than a queued mark was made, the later mark wins and
+the queued one comes back stale; the student's current state is in the
+delta either way.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import get_current_user
+from app.config import ATTENDANCE_SYNC_MAX_AGE_SECONDS
+from app.database import get_read_db, note_write
+from app.models import User
+from app.schemas.attendance_sync import AttendanceSyncRequest, AttendanceSyncResponse
+from app.helpers.attendance_freeze import attendance_freeze, attendance_view
+from app.helpers.attendance_log import (
+    DuplicateMark, StaleMark, attendance_log, logged_keys, students_changed_since,
+)
+from app.helpers.attendance_metrics import attendance_progress
+from app.helpers.attendance_time_checker import IST, attendance_windows, check_synced_in_time
+from app.helpers.marking_rules import check_marking_role, check_student_markable
+from app.helpers.reference_data import reference_data
+from app.helpers.roster import assigned_class_ids, roster
+
+router = APIRouter(prefix="/attendance-staff", tags=["Attendance Incharge Offline Sync"])
+
+
+@router.post("/sync", response_model=AttendanceSyncResponse)
+async def sync_attendance(
+    payload: AttendanceSyncRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Only reads run on this session (the log does the writing): on the
+    # primary, never a lagging replica
+    db.info["use_primary"] = True
+
+    check_marking_role(current_user)
+    class_ids = await assigned_class_ids(db, current_user.id)
+
+    results = []
+    if payload.marks:
+        # Retries: keys an earlier upload already logged, in one read
+        logged = await logged_keys(db, current_user.id, [mark.key for mark in payload.marks])
+
+        schedule = await attendance_windows.get(db)
+        ref = await reference_data.get(db)
+        await roster.ready(db)
+        now = datetime.now(timezone.utc)
+        oldest = now - timedelta(seconds=ATTENDANCE_SYNC_MAX_AGE_SECONDS)
+
+        accepted, seen = [], set()
+        for mark in payload.marks:
+            if mark.key in logged or mark.key in seen:
+                results.append({"key": mark.key, "status": "duplicate"})
+                continue
+            seen.add(mark.key)
+            # A device clock running ahead can't make a mark win over later ones
+            at = min(IST.localize(mark.marked_at) if mark.marked_at.tzinfo is None else mark.marked_at, now)
+            student = roster.get(mark.student_id)
+            cls = ref.classes.get(student.class_id) if student else None
+            try:
+                if not cls:
+                    raise HTTPException(status_code=404, detail="Student not found")
+                if at < oldest:
+                    raise HTTPException(status_code=400, detail="Mark is too old to sync")
+                check_student_markable(current_user, student, class_ids, schedule, at.timestamp())
+                check_synced_in_time(schedule, cls.id, at.timestamp(), now.timestamp())
+            except HTTPException as exc:
+                results.append({"key": mark.key, "status": "rejected", "detail": exc.detail})
+                continue
+            # Filled in once the log has the outcome
+            accepted.append((len(results), mark, cls, at))
+            results.append(None)
+
+        await db.commit()  # hand the read connection back while waiting
+
+        if accepted:
+            # Refused while attendance is frozen, like mark_attendance
+            async with attendance_freeze.marking():
+                # Queued in upload order, so a device's own marks keep theirs
+                outcomes = await asyncio.gather(*(
+                    attendance_log.record(
+                        mark.student_id, mark.present, current_user.id,
+                        schedule.session_at(cls.id, at.timestamp()), key=mark.key, marked_at=at,
+                    )
+                    for _, mark, cls, at in accepted
+                ), return_exceptions=True)
+
+            for (i, mark, cls, _), outcome in zip(accepted, outcomes):
+                if isinstance(outcome, DuplicateMark):
+                    results[i] = {"key": mark.key, "status": "duplicate"}
+                elif isinstance(outcome, StaleMark):
+                    results[i] = {"key": mark.key, "status": "stale"}
+                elif isinstance(outcome, LookupError):
+                    results[i] = {"key": mark.key, "status": "rejected", "detail": "Student not found"}
+                elif isinstance(outcome, BaseException):
+                    raise outcome
+                else:
+                    results[i] = {"key": mark.key, "status": "applied"}
+                    attendance_progress.record_mark(cls.program_type_id, outcome, mark.present)
+
+            # Let this staff member's next listing read their own marks
+            note_write(current_user.id)
+
+    # The delta: every student of the staff member's classes (same gender,
+    # as in their listing) marked since the cursor, as they are now
+    changed, cursor = await students_changed_since(db, payload.since)
+    ref, view = await attendance_view(db)
+    students = []
+    for class_id in class_ids:
+        if class_id not in ref.classes:
+            continue
+        for s in view.students_of(class_id, gender=current_user.gender):
+            if changed is None or s.id in changed:
+                students.append({
+                    "student_id": s.id,
+                    "class_id": class_id,
+                    "roll_number": s.roll_number,
+                    "name": s.name,
+                    "present": s.present,
+                })
+
+    return {
+        "cursor": cursor,
+        "full": changed is None,
+        "results": results,
+        "students": students,
+    }
@@ -4,7 +4,7 @@ from sqlalchemy import select,func
 from datetime import timedelta
 import uuid
 
-from app.database import get_db
+from app.database import get_primary_read_db
 from app.models import User, UserRole
 from app.routes import SPECIAL_BOTH_ROLE_IDS
 from app.auth.jwt import create_access_token
@@ -18,7 +18,7 @@ router = APIRouter(
 @router.post("/login")
 async def staff_login(
     staff_roll_number: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     stmt = select(User).where(
         func.lower(User.staff_roll_number) == staff_roll_number.lower()
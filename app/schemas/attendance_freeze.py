@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class AttendanceFreezeStatus(BaseModel):
+    frozen: bool
+    frozen_at: Optional[datetime] = None
+    frozen_by: Optional[str] = Field(None, description="Admin who froze it; null when the scheduler did")
+    auto_freeze: bool = Field(..., description="Whether attendance freezes when the marking window closes")
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class AttendanceEventItem(BaseModel):
+    id: int
+    student_id: str
+    session_id: Optional[int] = None
+    staff_id: Optional[str] = None
+    present: bool
+    marked_at: datetime
+
+
+class AttendanceEventListResponse(BaseModel):
+    events: List[AttendanceEventItem]
+    next_after_id: int = Field(..., description="Pass as after_id to continue")
+
+
+class StudentAttendanceState(BaseModel):
+    student_id: str
+    present: bool
+
+
+class AttendanceAsOfResponse(BaseModel):
+    at: Optional[datetime] = None
+    session_id: Optional[int] = None
+    count: int
+    present_count: int
+    students: List[StudentAttendanceState]
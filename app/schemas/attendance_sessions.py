@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class AttendanceSessionCreate(BaseModel):
+    name: str = Field(..., example="Ceremony day 1")
+    starts_at: datetime = Field(..., description="Times without an offset are read as IST")
+    ends_at: datetime
+    program_type: Optional[str] = Field(None, description="Only this program type (UG / PG); all when omitted")
+    department: Optional[str] = Field(None, description="Only this department; all when omitted")
+
+
+class AttendanceSessionItem(BaseModel):
+    id: int
+    name: str
+    starts_at: datetime
+    ends_at: datetime
+    program_type: Optional[str] = None
+    department: Optional[str] = None
+    open_now: bool
+
+
+class AttendanceSessionListResponse(BaseModel):
+    count: int
+    sessions: List[AttendanceSessionItem]
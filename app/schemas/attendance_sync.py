@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.config import ATTENDANCE_SYNC_MAX_MARKS
+
+
+class QueuedMark(BaseModel):
+    key: str = Field(..., min_length=1, max_length=64, description="Idempotency key, unique per staff member")
+    student_id: UUID
+    present: bool
+    marked_at: datetime = Field(..., description="When the mark was made on the device (IST without an offset)")
+
+
+class AttendanceSyncRequest(BaseModel):
+    since: Optional[int] = Field(None, ge=0, description="The cursor of the last sync; omit for a full listing")
+    marks: List[QueuedMark] = Field(default_factory=list, max_length=ATTENDANCE_SYNC_MAX_MARKS)
+
+
+class MarkOutcome(BaseModel):
+    key: str
+    # applied: logged now; duplicate: logged by an earlier upload;
+    # stale: a later mark of the student won; rejected: see detail
+    status: Literal["applied", "duplicate", "stale", "rejected"]
+    detail: Optional[str] = None
+
+
+class SyncedStudent(BaseModel):
+    student_id: UUID
+    class_id: UUID
+    roll_number: str
+    name: str
+    present: bool
+
+
+class AttendanceSyncResponse(BaseModel):
+    cursor: int = Field(..., description="Send as `since` next time")
+    full: bool = Field(..., description="Every student of the staff member's classes, not only the changed ones")
+    results: List[MarkOutcome]
+    students: List[SyncedStudent]
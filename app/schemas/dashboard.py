@@ -0,0 +1,46 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class DashboardTotals(BaseModel):
+    classes: int
+    students: int
+    present_count: int
+    absent_count: int
+
+
+class DashboardProgramType(BaseModel):
+    program_type_id: str
+    program_type: str
+    classes_count: int
+    total_students: int
+    present_count: int
+    absent_count: int
+
+
+class DashboardClass(BaseModel):
+    class_id: str
+    class_name: Optional[str] = None
+    program_type: Optional[str] = None
+    department: Optional[str] = None
+    section: Optional[str] = None
+    regular_or_self: Optional[str] = None
+    total_students: int
+    present_count: int
+    absent_count: int
+    staff_counts: Dict[str, int] = Field(..., description="Assigned staff by role")
+
+
+class DashboardStaff(BaseModel):
+    total_staff: int
+    by_role: Dict[str, int]
+    unassigned_staff: int
+
+
+class DashboardResponse(BaseModel):
+    frozen: bool = Field(..., description="Attendance is frozen: counts are the snapshot's")
+    totals: DashboardTotals
+    program_types: List[DashboardProgramType]
+    classes: List[DashboardClass]
+    staff: DashboardStaff
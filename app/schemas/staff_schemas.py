@@ -53,6 +53,15 @@ class StaffRead2(BaseModel):
 class StaffListResponse(BaseModel):
     count: int
     staffs: List[StaffRead]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class StaffListResponse2(BaseModel):
+    count: int
+    staffs: List[StaffRead2]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
 
 
 class StaffUpdate(BaseModel):
@@ -39,8 +39,11 @@ class StudentItem(BaseModel):
 class StudentListByClassResponse(BaseModel):
     class_id: str
     total_students: int
+    count: int  # students on this page
     filtered_by_present: Optional[bool] = None
     students: List[StudentItem]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
 
 
 class StudentItem2(BaseModel):
@@ -55,5 +58,8 @@ class StudentItem2(BaseModel):
 class StudentListByClassResponse2(BaseModel):
     class_id: str
     total_students: int
+    count: int  # students on this page
     filtered_by_present: Optional[bool] = None
-    students: List[StudentItem2]
\ No newline at end of file
+    students: List[StudentItem2]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,143 @@
+# benchmarks/attendance_bits.py
+"""
+Attendance counting: SQL aggregates and row-by-row loops vs the roster's
+per-class bitsets (app/helpers/roster.py), on a seeded college where
+about 60% of the students have been marked present.
+
+    python -m benchmarks.attendance_bits --classes 1000 --students-per-class 100
+
+Times the whole-college summary (present per class), a staff member's
+same-gender counts, one class's absent list and the diff between two
+snapshots taken around a burst of marks. "rows" is the same work done over
+the roster's records one by one, the cost without the bitsets. Decoding a
+dense bitset into a list loses to that loop, which is why the roster
+filters its lists from the records and keeps the bits for counts and diffs.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.loadtest import seed_database, use_throwaway_database
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+async def timed_sql(db, query, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = (await db.execute(query)).all()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def report(label, sql_s, rows_s, bits_s):
+    sql = f"{sql_s * 1000:9.2f}" if sql_s is not None else f"{'-':>9}"
+    print(f"{label:26} {sql} {rows_s * 1000:9.3f} {bits_s * 1000:9.3f} {rows_s / bits_s:7.1f}x")
+
+
+async def run(args):
+    from sqlalchemy import case, func, select, update
+    from app.database import AsyncSessionLocal
+    from app.helpers.roster import RosterStore
+    from app.models import Student
+
+    college = await seed_database(classes=args.classes, students_per_class=args.students_per_class)
+    rnd = random.Random(7)
+    present_ids = [sid for sid in college.student_ids if rnd.random() < 0.6]
+
+    async with AsyncSessionLocal() as db:
+        for start in range(0, len(present_ids), 5000):
+            await db.execute(
+                update(Student).where(Student.id.in_(present_ids[start:start + 5000])).values(present=True)
+            )
+        await db.commit()
+
+        store = RosterStore()
+        await store.load(db)
+        rosters = [store.class_roster(class_id) for class_id in college.class_ids]
+        print(f"{len(store)} students in {len(rosters)} classes, {len(present_ids)} present\n")
+        print(f"{'':26} {'SQL ms':>9} {'rows ms':>9} {'bits ms':>9} {'rows/bits':>8}")
+
+        # Whole-college summary: present students per class
+        present_count = func.coalesce(func.sum(case((Student.present.is_(True), 1), else_=0)), 0)
+        sql_s, sql_rows = await timed_sql(
+            db, select(Student.class_id, present_count).group_by(Student.class_id), args.repeat
+        )
+        rows_s, by_rows = timed(lambda: [sum(1 for s in r.students if s.present) for r in rosters], args.repeat)
+        bits_s, by_bits = timed(lambda: [r.present_count() for r in rosters], args.repeat)
+        assert by_rows == by_bits and sum(by_bits) == sum(count for _, count in sql_rows)
+        report("summary, every class", sql_s, rows_s, bits_s)
+
+        # An attendance incharge's view: same-gender present counts in a few classes
+        staff_classes = college.class_ids[:4]
+        sql_s, _ = await timed_sql(
+            db,
+            select(Student.class_id, present_count)
+            .where(Student.class_id.in_(staff_classes), Student.gender == "female")
+            .group_by(Student.class_id),
+            args.repeat,
+        )
+        staff_rosters = [store.class_roster(class_id) for class_id in staff_classes]
+        rows_s, by_rows = timed(
+            lambda: [sum(1 for s in r.students if s.present and s.gender == "female") for r in staff_rosters],
+            args.repeat,
+        )
+        bits_s, by_bits = timed(lambda: [r.present_count("female") for r in staff_rosters], args.repeat)
+        assert by_rows == by_bits
+        report("same gender, 4 classes", sql_s, rows_s, bits_s)
+
+        # One class's absent list
+        class_id = college.class_ids[len(rosters) // 2]
+        one = store.class_roster(class_id)
+        sql_s, _ = await timed_sql(
+            db,
+            select(Student.id).where(Student.class_id == class_id, Student.present.is_(False))
+            .order_by(Student.roll_number),
+            args.repeat,
+        )
+        rows_s, by_rows = timed(lambda: [s for s in one.students if not s.present], args.repeat)
+        everyone = (1 << len(one.students)) - 1
+        bits_s, by_bits = timed(lambda: one.students_at(~one.present_bits & everyone), args.repeat)
+        assert by_rows == by_bits
+        report("absent list, one class", sql_s, rows_s, bits_s)
+
+        # Diff around a burst of marks (applied as the commit hooks would)
+        snapshot = store.snapshot()
+        flags = {s.id: s.present for r in rosters for s in r.students}
+        for student_id in rnd.sample(college.student_ids, args.marks):
+            record = store._students[student_id]
+            store.class_roster(record.class_id).mark(record, not record.present)
+        rows_s, by_rows = timed(
+            lambda: [s for r in rosters for s in r.students if s.present != flags[s.id]], args.repeat
+        )
+        bits_s, (flipped, reshaped) = timed(lambda: store.changed_since(snapshot), args.repeat)
+        assert not reshaped and sorted(s.roll_number for s in by_rows) == sorted(
+            s.roll_number for students in flipped.values() for s in students
+        )
+        report(f"diff after {args.marks} marks", None, rows_s, bits_s)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, default=1000)
+    parser.add_argument("--students-per-class", type=int, default=100)
+    parser.add_argument("--marks", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_throwaway_database("convocation-attendance-bits-")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
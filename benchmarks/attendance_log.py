@@ -0,0 +1,105 @@
+# benchmarks/attendance_log.py
+"""
+Concurrent marks through the attendance log's group commit
+(app/helpers/attendance_log.py) vs one transaction per mark, on a seeded
+college in a SQLite file.
+
+    python -m benchmarks.attendance_log --markers 200 --rounds 5
+
+Each round, `markers` staff mark one student each at the same moment. Both
+sides write the same rows (the student's present flag and one event); the
+log writes every mark queued behind a commit in the next transaction
+instead of its own, so a burst costs a few commits, not one per mark.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+
+from benchmarks.loadtest import seed_database, use_throwaway_database
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def burst(mark, student_ids):
+    latencies = []
+
+    async def one(student_id):
+        started = time.perf_counter()
+        await mark(student_id)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(student_id) for student_id in student_ids))
+    return time.perf_counter() - started, latencies
+
+
+async def run(args):
+    from sqlalchemy import func, select
+    from app.database import AsyncSessionLocal
+    from app.helpers.attendance_log import AttendanceLog
+    from app.models import AttendanceEvent, Student
+
+    college = await seed_database(classes=args.classes, students_per_class=args.students_per_class)
+    rnd = random.Random(7)
+    log = AttendanceLog(args.batch_max)
+    commits = 0
+
+    async def per_mark(student_id):
+        nonlocal commits
+        async with AsyncSessionLocal() as db:
+            student = await db.get(Student, student_id)
+            student.present = not student.present
+            db.add(AttendanceEvent(
+                student_id=student_id, present=student.present, marked_at=datetime.now(timezone.utc),
+            ))
+            await db.commit()
+            commits += 1
+
+    write = log._write
+
+    async def counted_write(batch):
+        nonlocal commits
+        commits += 1
+        return await write(batch)
+
+    log._write = counted_write
+
+    async def grouped(student_id):
+        await log.record(student_id, rnd.random() < 0.5)
+
+    print(f"{args.markers} concurrent marks x {args.rounds} rounds\n")
+    print(f"{'':22} {'marks/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'commits':>8}")
+    for label, mark in (("one commit per mark", per_mark), ("group commit", grouped)):
+        commits, walls, latencies = 0, 0.0, []
+        for _ in range(args.rounds):
+            wall, times = await burst(mark, rnd.sample(college.student_ids, args.markers))
+            walls += wall
+            latencies += times
+        print(f"{label:22} {len(latencies) / walls:9.0f} {percentile(latencies, 50) * 1000:9.1f} "
+              f"{percentile(latencies, 95) * 1000:9.1f} {commits:8}")
+
+    async with AsyncSessionLocal() as db:
+        events = await db.scalar(select(func.count()).select_from(AttendanceEvent))
+    assert events == 2 * args.markers * args.rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, default=100)
+    parser.add_argument("--students-per-class", type=int, default=100)
+    parser.add_argument("--markers", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--batch-max", type=int, default=500)
+    args = parser.parse_args()
+
+    use_throwaway_database("convocation-attendance-log-")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
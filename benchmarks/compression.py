@@ -0,0 +1,97 @@
+# benchmarks/compression.py
+"""
+Bytes saved and CPU spent by response compression, per payload and level,
+and what a precompressed cache entry costs on a hit.
+
+Payloads are the real listing shapes (benchmarks/serialization.py) rendered
+by the fast JSON path.
+
+    python -m benchmarks.compression --rows 5000
+"""
+import argparse
+import asyncio
+import gzip
+import time
+import uuid
+
+from benchmarks.loadtest import use_throwaway_database
+from benchmarks.serialization import (
+    attendance_rows, new_attendance, new_staff2, new_students2, staff_rows, student_rows,
+)
+
+
+def class_list(classes):
+    return {
+        "count": classes,
+        "classes": [
+            {"id": str(uuid.uuid4()), "class_name": f"CLASS-{i:04d}", "program_type": "PG" if i % 4 == 0 else "UG",
+             "department": f"DEPT-{i % 12}", "section": "A", "regular_or_self": "Regular"}
+            for i in range(classes)
+        ],
+    }
+
+
+def cpu_ms(fn, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        result = fn()
+    return (time.process_time() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    use_throwaway_database("convocation-compression-")
+
+    from starlette.requests import Request
+    from app.config import BROTLI_QUALITY, GZIP_LEVEL
+    from app.helpers.compression import brotli
+    from app.helpers.fast_json import FastJSONResponse
+    from app.helpers.response_cache import ResponseCache
+
+    payloads = [
+        ("class list (300)", class_list(300)),
+        ("list_all_staff2", new_staff2(list(staff_rows(args.rows)))),
+        ("get_students_by_class2", new_students2(student_rows(args.rows, uuid.uuid4()))),
+        ("list_students_for_attendance", new_attendance(attendance_rows(args.rows))),
+    ]
+
+    codecs = [(f"gzip-{level}", lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0))
+              for level in sorted({1, GZIP_LEVEL, 9})]
+    if brotli is not None:
+        codecs += [(f"br-{quality}", lambda body, quality=quality: brotli.compress(body, quality=quality))
+                   for quality in sorted({1, BROTLI_QUALITY, 9})]
+    else:
+        print("brotli not installed: gzip only\n")
+
+    print(f"{'payload':30} {'codec':8} {'raw KiB':>9} {'sent KiB':>9} {'saved':>7} {'cpu ms':>8}")
+    for name, content in payloads:
+        body = FastJSONResponse(content).body
+        for codec, compress in codecs:
+            ms, compressed = cpu_ms(lambda: compress(body), args.repeat)
+            saved = 1 - len(compressed) / len(body)
+            print(f"{name:30} {codec:8} {len(body) / 1024:9.1f} {len(compressed) / 1024:9.1f} {saved:7.1%} {ms:8.2f}")
+
+    # Cache hit: the stored encoding is reused, nothing is compressed again
+    encoding = "br" if brotli is not None else "gzip"
+    request = Request({"type": "http", "method": "GET", "path": "/", "query_string": b"",
+                       "headers": [(b"accept-encoding", encoding.encode())]})
+    cache = ResponseCache(16)
+    body = FastJSONResponse(payloads[1][1]).body
+    entry = cache.put("staff", body, "application/json", (), ())
+
+    async def serve(n):
+        for _ in range(n):
+            await cache.get("staff").response(request)
+
+    first_ms, _ = cpu_ms(lambda: asyncio.run(serve(1)), 1)
+    hit_ms, _ = cpu_ms(lambda: asyncio.run(serve(100)), 1)
+    print(f"\ncached {payloads[1][0]} ({encoding}): first request {first_ms:.2f} ms, "
+          f"then {hit_ms / 100:.3f} ms per hit, {len(entry.encoded[encoding]) / 1024:.1f} KiB sent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+# benchmarks/loadtest.py
+"""
+Convocation-day load test.
+
+Seeds a throwaway SQLite database with a synthetic college, then drives the
+real FastAPI app (in-process, or through a uvicorn subprocess) with the
+ceremony traffic: a staff login storm, roster listing, bursts of
+mark-attendace, admin /class/summary polling and PDF downloads.
+
+    python -m benchmarks.loadtest --classes 40 --students-per-class 60 --duration 30
+    python -m benchmarks.loadtest --server uvicorn --output baselines/main.json
+    python -m benchmarks.loadtest --compare baselines/main.json
+
+Results (p50/p95/p99 and error rate per endpoint) are printed and can be saved
+as a JSON baseline; --compare exits non-zero when an endpoint's p95 regressed
+by more than --tolerance percent.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+
+ADMIN_USERNAME = "loadtest-admin"
+ADMIN_PASSWORD = "loadtest-password"
+
+
+# ------------------ Recording ------------------ #
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.started = time.perf_counter()
+
+    async def request(self, client, label, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            self.errors[label] += 1
+            self.latencies[label].append(time.perf_counter() - started)
+            return None
+        self.latencies[label].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        endpoints = {}
+        for label, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[label] = {
+                "requests": len(values),
+                "errors": self.errors[label],
+                "error_rate": round(self.errors[label] / len(values), 4),
+                "rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+            }
+        return endpoints
+
+
+# ------------------ Scenario ------------------ #
+async def login_storm(client, recorder, college, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    tokens = {}
+
+    async def login(staff_id):
+        async with semaphore:
+            response = await recorder.request(
+                client, "POST /staff/login", "POST", "/staff/login",
+                params={"staff_roll_number": college.roll_numbers[staff_id]},
+            )
+        if response is not None and response.status_code == 200:
+            tokens[staff_id] = response.json()["access_token"]
+
+    staff_ids = [s[0] for s in college.attendance_staff + college.certificate_staff]
+    await asyncio.gather(*(login(staff_id) for staff_id in staff_ids))
+    return tokens
+
+
+async def attendance_staff_loop(client, recorder, token, deadline, burst, rnd):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.monotonic() < deadline:
+        response = await recorder.request(
+            client, "GET /attendance-staff/list-students", "GET",
+            "/attendance-staff/list-students", headers=headers,
+        )
+        if response is None or response.status_code != 200:
+            await asyncio.sleep(0.5)
+            continue
+
+        students = [s for c in response.json()["classes"] for s in c["students"]]
+        if not students:
+            return
+
+        picks = rnd.sample(students, min(burst, len(students)))
+        await asyncio.gather(*(
+            recorder.request(
+                client, "PUT /attendance-staff/mark-attendace", "PUT",
+                "/attendance-staff/mark-attendace", headers=headers,
+                params={"student_id": s["student_id"], "present": "true" if rnd.random() < 0.9 else "false"},
+            )
+            for s in picks
+        ))
+        await asyncio.sleep(rnd.uniform(0.2, 1.0))
+
+
+async def admin_poller_loop(client, recorder, token, deadline, poll_interval, pdf_every, rnd):
+    headers = {"Authorization": f"Bearer {token}"}
+    iteration = 0
+    while time.monotonic() < deadline:
+        iteration += 1
+        await recorder.request(client, "GET /class/summary (admin)", "GET", "/class/summary", headers=headers)
+        if pdf_every and iteration % pdf_every == 0:
+            await recorder.request(
+                client, "GET /admin/reports/present-students/pdf", "GET",
+                "/admin/reports/present-students/pdf", headers=headers,
+            )
+        await asyncio.sleep(poll_interval * rnd.uniform(0.8, 1.2))
+
+
+async def certificate_staff_loop(client, recorder, token, deadline, poll_interval, rnd):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.monotonic() < deadline:
+        await recorder.request(client, "GET /class/summary (staff)", "GET", "/class/summary", headers=headers)
+        await recorder.request(
+            client, "GET /certificate-staff/list-classes", "GET",
+            "/certificate-staff/list-classes", headers=headers,
+        )
+        await asyncio.sleep(poll_interval * rnd.uniform(0.8, 1.2))
+
+
+async def run_scenario(client, college, args) -> dict:
+    rnd = random.Random(args.seed)
+    recorder = Recorder()
+
+    tokens = await login_storm(client, recorder, college, args.concurrency)
+
+    response = await recorder.request(
+        client, "POST /admin/login", "POST", "/admin/login",
+        data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+    )
+    admin_token = response.json()["access_token"]
+
+    deadline = time.monotonic() + args.duration
+    markers = [s[0] for s in college.attendance_staff if s[0] in tokens][:args.markers]
+    certificate = [s[0] for s in college.certificate_staff if s[0] in tokens][:args.certificate_pollers]
+
+    await asyncio.gather(
+        *(attendance_staff_loop(client, recorder, tokens[s], deadline, args.burst, random.Random(rnd.random()))
+          for s in markers),
+        *(admin_poller_loop(client, recorder, admin_token, deadline, args.poll_interval, args.pdf_every,
+                            random.Random(rnd.random()))
+          for _ in range(args.admin_pollers)),
+        *(certificate_staff_loop(client, recorder, tokens[s], deadline, args.poll_interval, random.Random(rnd.random()))
+          for s in certificate),
+    )
+    return recorder.summary()
+
+
+# ------------------ Setup ------------------ #
+def use_throwaway_database(prefix: str = "convocation-loadtest-") -> str:
+    """
+    Point the app at a fresh SQLite file. Must run before anything imports
+    app.database, which builds its engines from DATABASE_URL at import time.
+    """
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["ENFORCE_ATTENDANCE_WINDOW"] = "false"
+    os.environ.setdefault("SECRET_KEY", "loadtest-secret")
+    return workdir
+
+
+async def seed_database(classes, students_per_class, staff_per_class=2, female_ratio=0.5, seed=42):
+    # imported here: DATABASE_URL must be set before app.database is imported
+    from app.auth.security import get_password_hash
+    from app.database import async_engine, AsyncSessionLocal
+    from app.migrations import run_migrations
+    from app.models import User, UserRole
+    from benchmarks.seed import seed_college
+
+    await run_migrations(async_engine)
+    college = await seed_college(
+        AsyncSessionLocal,
+        classes=classes,
+        students_per_class=students_per_class,
+        staff_per_class=staff_per_class,
+        female_ratio=female_ratio,
+        seed=seed,
+    )
+    async with AsyncSessionLocal() as db:
+        db.add(User(
+            username=ADMIN_USERNAME,
+            password=get_password_hash(ADMIN_PASSWORD),
+            role=UserRole.admin,
+            gender="male",
+        ))
+        await db.commit()
+    await async_engine.dispose()
+    return college
+
+
+async def run_in_process(college, args):
+    import httpx
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            return await run_scenario(client, college, args)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_with_uvicorn(college, args):
+    import httpx
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            for _ in range(100):
+                try:
+                    if (await client.get("/")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+
+            return await run_scenario(client, college, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+# ------------------ Baselines ------------------ #
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> bool:
+    """
+    Print p95 / error-rate deltas per endpoint. Returns False on regression.
+    """
+    ok = True
+    print(f"\nCompared with {baseline['meta'].get('commit')}:")
+    for label, now in current["endpoints"].items():
+        before = baseline["endpoints"].get(label)
+        if not before:
+            print(f"  {label}: new endpoint")
+            continue
+        delta = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        regressed = delta > tolerance or now["error_rate"] > before["error_rate"]
+        ok = ok and not regressed
+        print(
+            f"  {'REGRESSION ' if regressed else ''}{label}: p95 {before['p95_ms']} -> {now['p95_ms']} ms "
+            f"({delta:+.1f}%), errors {before['error_rate']:.2%} -> {now['error_rate']:.2%}"
+        )
+    return ok
+
+
+def print_table(endpoints: dict):
+    print(f"\n{'endpoint':55} {'reqs':>6} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, row in endpoints.items():
+        print(
+            f"{label:55} {row['requests']:6} {row['error_rate'] * 100:6.2f} "
+            f"{row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, default=40)
+    parser.add_argument("--students-per-class", type=int, default=60)
+    parser.add_argument("--staff-per-class", type=int, default=2)
+    parser.add_argument("--female-ratio", type=float, default=0.5)
+    parser.add_argument("--server", choices=("in-process", "uvicorn"), default="in-process")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of mixed traffic")
+    parser.add_argument("--concurrency", type=int, default=50, help="parallel logins in the storm")
+    parser.add_argument("--markers", type=int, default=60, help="attendance staff marking at once")
+    parser.add_argument("--burst", type=int, default=5, help="marks fired together per staff round")
+    parser.add_argument("--admin-pollers", type=int, default=5)
+    parser.add_argument("--certificate-pollers", type=int, default=10)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--pdf-every", type=int, default=10, help="admin poll iterations per PDF download")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=20.0, help="allowed p95 regression in percent")
+    args = parser.parse_args()
+
+    use_throwaway_database()
+    college = asyncio.run(seed_database(
+        args.classes, args.students_per_class, args.staff_per_class, args.female_ratio, args.seed
+    ))
+    runner = run_in_process if args.server == "in-process" else run_with_uvicorn
+    endpoints = asyncio.run(runner(college, args))
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": int(time.time()),
+            "server": args.server,
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "endpoints": endpoints,
+    }
+
+    print_table(endpoints)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nSaved baseline to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(result, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
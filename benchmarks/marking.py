@@ -0,0 +1,19 @@
+# benchmarks/marking.py
+from sqlalchemy import select
+
+from app.models import User, Student
+
+
+async def simulate_mark(read_sessions, write_sessions, staff_id, student_id):
+    """
+    The database work of one mark-attendace call: the auth lookup on the read
+    pool, then load + flip + commit the student on the write pool.
+    """
+    async with read_sessions() as db:
+        await db.get(User, staff_id)
+
+    async with write_sessions() as db:
+        result = await db.execute(select(Student).where(Student.id == student_id))
+        student = result.scalar_one()
+        student.present = not student.present
+        await db.commit()
@@ -0,0 +1,274 @@
+# benchmarks/microbench.py
+"""
+Per-endpoint microbenchmarks with query-count budgets.
+
+Seeds a 10k-student SQLite database (100 classes x 100 students), then calls
+every router in app/routes in-process. For each endpoint it records wall time
+(mean / p95), peak traced memory of one call (tracemalloc) and the number of
+SQL statements, read from the Server-Timing header added by
+SQLInstrumentationMiddleware.
+
+Budgets count the statements the route itself runs; the auth lookup done by
+get_current_user is not included. Any endpoint over budget (or answering with
+an unexpected status) fails the run, so N+1 regressions show up here instead
+of on convocation day.
+
+    python -m benchmarks.microbench
+    python -m benchmarks.microbench --iterations 50 --only summary
+
+tests/test_query_budgets.py runs it with --report, which writes each
+endpoint's statements and status as JSON, and fails the suite on any
+endpoint over budget.
+"""
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from benchmarks.loadtest import use_throwaway_database, seed_database, ADMIN_USERNAME, ADMIN_PASSWORD, percentile
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+RESERVED_CLASSES = 25
+MAX_ITERATIONS = 2 * RESERVED_CLASSES - 1
+
+
+@dataclass
+class Case:
+    name: str
+    method: str
+    # (ctx, i) -> url
+    url: Callable
+    role: Optional[str]          # "admin", "staff", "certificate" or None
+    budget: int                  # route statements, auth lookup excluded
+    body: Optional[Callable] = None
+    form: Optional[Callable] = None
+
+
+def _classes(n, prefix):
+    return lambda ctx, i: [
+        {"class_name": f"{prefix}-{i}-{k}", "program_type": "UG", "department": "BENCH", "section": "A"}
+        for k in range(n)
+    ]
+
+
+def _student(ctx, i, k=0):
+    return {"roll_number": f"BENCH{i:04d}{k:03d}", "name": "Bench Student", "gender": "male",
+            "class_id": str(ctx.class_ids[0])}
+
+
+def _staff(ctx, i, k=0):
+    return {"staff_roll_number": f"BS{i:04d}{k:03d}", "role": "attendance_incharge", "gender": "male",
+            "assigned_class_ids": [str(ctx.class_ids[1])]}
+
+
+CASES = [
+    # --- logins (no auth lookup) ---
+    Case("admin_login", "POST", lambda ctx, i: "/admin/login", None, 1,
+         form=lambda ctx, i: {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}),
+    Case("staff_login", "POST", lambda ctx, i: f"/staff/login?staff_roll_number={ctx.staff_roll}", None, 1),
+
+    # --- marking ---
+    # the log's batch runs on its own task and isn't counted here; +1 on the caller's first
+    # request for the assigned classes
+    Case("mark_attendance", "PUT",
+         lambda ctx, i: f"/attendance-staff/mark-attendace?student_id={ctx.markable[i % len(ctx.markable)]}"
+                        f"&present={'true' if (i // len(ctx.markable)) % 2 == 0 else 'false'}",
+         "staff", 2),
+
+    # --- listings ---
+    # staff listings: +1 on the caller's first request, when data_etag looks up the assigned classes;
+    # students come from the in-process roster
+    Case("list_students_for_attendance_incharge", "GET", lambda ctx, i: "/attendance-staff/list-students", "staff", 1),
+    # counted from the roster's attendance bitsets
+    Case("attendance_summary_admin", "GET", lambda ctx, i: "/class/summary", "admin", 0),
+    Case("attendance_summary_staff", "GET", lambda ctx, i: "/class/summary", "certificate", 1),
+    Case("list_classes_for_certificate_incharge", "GET", lambda ctx, i: "/certificate-staff/list-classes", "certificate", 1),
+    Case("certificate_get_students_by_class", "GET",
+         lambda ctx, i: f"/certificate-staff/class/{ctx.certificate_class}/students", "certificate", 1),
+    # served from the reference data loaded at startup
+    Case("list_program_types", "GET", lambda ctx, i: "/admin/program-types/list-program-types", "admin", 0),
+    Case("get_classes_by_program_type_name", "GET",
+         lambda ctx, i: "/admin/program-types/get-classes-by-program-type-name/UG", "admin", 0),
+    Case("list_all_classes", "GET", lambda ctx, i: "/admin/program-types/list-classes", "admin", 0),
+    Case("list_all_staff", "GET", lambda ctx, i: "/admin/list-staffs", "admin", 1),
+    Case("list_all_staff2", "GET", lambda ctx, i: "/admin/list-staffs-with-assighned_classes", "admin", 1),
+    Case("search_staff", "GET", lambda ctx, i: "/admin/staff/search?q=Staff 1", "admin", 1),
+    Case("search_students", "GET", lambda ctx, i: "/student/student/search?q=R0001", "admin", 1),
+    # served from the roster
+    Case("get_students_by_class", "GET", lambda ctx, i: f"/student/list-by-class/{ctx.class_ids[2]}", "admin", 0),
+    Case("get_students_by_class2", "GET",
+         lambda ctx, i: f"/student/list-by-class_with_assighned_classes/{ctx.class_ids[2]}", "admin", 0),
+    Case("present_students_pdf", "GET", lambda ctx, i: "/admin/reports/present-students/pdf", "admin", 0),
+    # classes and attendance from the caches, the staff assignments in one query; cached until a write
+    Case("admin_dashboard", "GET", lambda ctx, i: "/admin/dashboard", "admin", 1),
+    Case("pool_stats", "GET", lambda ctx, i: "/admin/db/pool-stats", "admin", 0),
+    # +1 recounting the present students after a write
+    Case("metrics", "GET", lambda ctx, i: "/metrics", "admin", 1),
+
+    # --- class creation / update ---
+    Case("create_class", "POST", lambda ctx, i: "/admin/class/create", "admin", 5,
+         body=lambda ctx, i: _classes(1, "BENCH-ONE")(ctx, i)[0]),
+    # bulk routes look the whole list up at once: their budgets don't grow with it
+    Case("bulk_create_classes_x10", "POST", lambda ctx, i: "/admin/class/create-via-json", "admin", 5,
+         body=_classes(10, "BENCH-BULK")),
+    Case("update_class", "PATCH", lambda ctx, i: f"/admin/class/{ctx.class_ids[3]}", "admin", 2,
+         body=lambda ctx, i: {"department": f"DEPT-{i}"}),
+
+    # --- students ---
+    # 3 of these reload the reference data, which the class cases above invalidated
+    Case("create_student", "POST", lambda ctx, i: "/admin/student/create", "admin", 6,
+         body=lambda ctx, i: _student(ctx, i)),
+    # +3 when it has to reload the reference data itself
+    Case("create_students_bulk_x20", "POST", lambda ctx, i: "/admin/student/bulk-create", "admin", 5,
+         body=lambda ctx, i: {"students": [_student(ctx, i, k + 1) for k in range(20)]}),
+    Case("update_student_by_id", "PATCH", lambda ctx, i: f"/admin/student/update/by-id/{ctx.student_to_update}",
+         "admin", 3, body=lambda ctx, i: {"name": f"Renamed {i}"}),
+    Case("delete_student", "DELETE", lambda ctx, i: f"/admin/delete-student/{ctx.deletable_students[i]}", "admin", 2),
+    Case("delete_students_bulk_x10", "DELETE", lambda ctx, i: "/admin/bulk-delete-students", "admin", 2,
+         body=lambda ctx, i: [str(s) for s in ctx.deletable_students[100 + i * 10:100 + (i + 1) * 10]]),
+
+    # --- staff ---
+    Case("create_staff", "POST", lambda ctx, i: "/admin/staff/create", "admin", 5,
+         body=lambda ctx, i: _staff(ctx, i)),
+    Case("bulk_create_staff_x10", "POST", lambda ctx, i: "/admin/staff/bulk-create", "admin", 4,
+         body=lambda ctx, i: [_staff(ctx, i, k + 1) for k in range(10)]),
+    Case("update_staff_by_roll_number", "PATCH",
+         lambda ctx, i: f"/admin/staff/update/by-roll/{ctx.staff_to_update}", "admin", 3,
+         body=lambda ctx, i: {"staff_name": f"Renamed {i}"}),
+    Case("delete_staff", "DELETE", lambda ctx, i: f"/admin/delete-staff-by-id/{ctx.deletable_staff[i]}", "admin", 4),
+]
+
+
+class Context:
+    pass
+
+
+async def build_context(college, client):
+    from app.auth.jwt import create_access_token
+    from app.models import UserRole
+
+    ctx = Context()
+    ctx.class_ids = college.class_ids
+
+    staff_id, gender, staff_classes = college.attendance_staff[0]
+    ctx.staff_roll = college.roll_numbers[staff_id]
+    ctx.markable = [s for s, (c, g) in college.students.items() if c == staff_classes[0] and g == gender]
+
+    certificate_id, _, certificate_classes = college.certificate_staff[0]
+    ctx.certificate_class = certificate_classes[0]
+
+    # the tail of the college is reserved for the delete cases:
+    # 2 staff and 100 students per class, one target per iteration
+    reserved_classes = set(college.class_ids[-RESERVED_CLASSES:])
+    ctx.deletable_students = [s for s, (c, _) in college.students.items() if c in reserved_classes]
+    ctx.deletable_staff = [s for s, _, classes in college.attendance_staff if classes[0] in reserved_classes]
+    ctx.student_to_update = college.student_ids[500]
+    ctx.staff_to_update = college.roll_numbers[college.attendance_staff[10][0]]
+
+    response = await client.post("/admin/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    ctx.tokens = {
+        "admin": response.json()["access_token"],
+        "staff": create_access_token({"user_id": str(staff_id), "role": UserRole.attendance_incharge.value}),
+        "certificate": create_access_token({"user_id": str(certificate_id), "role": UserRole.certificate_incharge.value}),
+    }
+    return ctx
+
+
+async def call(client, ctx, case, i):
+    headers = {"Authorization": f"Bearer {ctx.tokens[case.role]}"} if case.role else {}
+    kwargs = {"headers": headers}
+    if case.body:
+        kwargs["json"] = case.body(ctx, i)
+    if case.form:
+        kwargs["data"] = case.form(ctx, i)
+
+    started = time.perf_counter()
+    response = await client.request(case.method, case.url(ctx, i), **kwargs)
+    elapsed = time.perf_counter() - started
+
+    match = _QUERIES.search(response.headers.get("server-timing", ""))
+    queries = int(match.group(1)) if match else 0
+    if case.role:
+        queries -= 1  # get_current_user
+    return response, elapsed, queries
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+
+    college = await seed_database(classes=100, students_per_class=100)
+    failures = []
+    rows = []
+    report = {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            ctx = await build_context(college, client)
+
+            for case in CASES:
+                if args.only and args.only not in case.name:
+                    continue
+
+                times, max_queries, status_error = [], 0, None
+                for i in range(args.iterations):
+                    response, elapsed, queries = await call(client, ctx, case, i)
+                    times.append(elapsed)
+                    max_queries = max(max_queries, queries)
+                    if response.status_code >= 400 and status_error is None:
+                        status_error = f"{response.status_code} {response.text[:120]}"
+
+                tracemalloc.start()
+                await call(client, ctx, case, args.iterations)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                times.sort()
+                over_budget = max_queries > case.budget
+                rows.append((case, statistics.mean(times), percentile(times, 95), peak, max_queries))
+                if over_budget:
+                    failures.append(f"{case.name}: {max_queries} statements > budget {case.budget}")
+                if status_error:
+                    failures.append(f"{case.name}: {status_error}")
+                report[case.name] = {"queries": max_queries, "budget": case.budget, "error": status_error}
+
+    print(f"\n{'endpoint':42} {'mean ms':>9} {'p95 ms':>9} {'peak KiB':>9} {'queries':>8} {'budget':>7}")
+    for case, mean, p95, peak, queries in rows:
+        flag = "  OVER" if queries > case.budget else ""
+        print(f"{case.name:42} {mean * 1000:9.2f} {p95 * 1000:9.2f} {peak / 1024:9.1f} {queries:8} {case.budget:7}{flag}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    parser.add_argument("--report", help="also write each endpoint's statements and status to this JSON file")
+    args = parser.parse_args()
+    if not 0 < args.iterations <= MAX_ITERATIONS:
+        parser.error(f"--iterations must be between 1 and {MAX_ITERATIONS}")
+
+    use_throwaway_database("convocation-microbench-")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/pool_settings_marking.py
+"""
+Marking throughput across connection pool settings.
+
+Point --url at a throwaway database (it is migrated and seeded), e.g.
+
+    python -m benchmarks.pool_settings_marking --url postgresql+asyncpg://u:p@localhost/bench
+
+Without --url a temporary SQLite file is used, which only shows the pool
+overhead since SQLite serializes writers anyway.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import create_engines, warm_up_pool
+from app.helpers.pool_stats import pool_snapshot
+from app.migrations import run_migrations
+from benchmarks.marking import simulate_mark
+from benchmarks.seed import seed_college
+
+
+async def run_setting(url, college, concurrency, marks, **pool):
+    engine, _ = create_engines(url, sqlite_profile=False, **pool)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await warm_up_pool(engine, pool.get("pool_size", 5))
+
+    staff_by_class = {classes[0]: staff_id for staff_id, _, classes in college.attendance_staff}
+    student_ids = itertools.cycle(college.student_ids)
+    queue = asyncio.Queue()
+    for _ in range(marks):
+        queue.put_nowait(next(student_ids))
+
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            student_id = queue.get_nowait()
+            class_id, _ = college.students[student_id]
+            try:
+                await simulate_mark(sessions, sessions, staff_by_class[class_id], student_id)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stats = pool_snapshot(engine)
+    await engine.dispose()
+
+    return {
+        **{k: v for k, v in pool.items()},
+        "marks_per_sec": round((marks - errors) / elapsed, 1),
+        "errors": errors,
+        "avg_wait_ms": stats.get("avg_wait_ms"),
+        "max_wait_ms": stats.get("max_wait_ms"),
+        "timeouts": stats.get("timeouts"),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--marks", type=int, default=2000)
+    parser.add_argument("--pool-sizes", default="2,5,10,20")
+    parser.add_argument("--max-overflows", default="0,10")
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    setup_engine, _ = create_engines(url, sqlite_profile=False)
+    await run_migrations(setup_engine)
+    college = await seed_college(
+        async_sessionmaker(setup_engine, class_=AsyncSession, expire_on_commit=False),
+        classes=20,
+        students_per_class=100,
+    )
+    await setup_engine.dispose()
+
+    for pool_size in map(int, args.pool_sizes.split(",")):
+        for max_overflow in map(int, args.max_overflows.split(",")):
+            print(await run_setting(
+                url, college, args.concurrency, args.marks,
+                pool_size=pool_size, max_overflow=max_overflow, pool_timeout=10,
+            ))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
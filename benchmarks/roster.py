@@ -0,0 +1,112 @@
+# benchmarks/roster.py
+"""
+Class rosters: ORM objects from the database vs the in-process roster
+(app/helpers/roster.py), on a seeded college.
+
+Prints the memory each holds for every student (the ORM figure is a
+session's identity map after loading them all, what a listing of the whole
+college used to keep alive) and the time to build one class's roster as
+the listing routes return it: the whole class, the attendance incharge's
+same-gender view and the present students.
+
+    python -m benchmarks.roster --classes 500 --students-per-class 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.loadtest import seed_database, use_throwaway_database
+
+
+def _as_dicts(students):
+    return [
+        {"student_id": s.id, "roll_number": s.roll_number, "name": s.name, "gender": s.gender, "present": s.present}
+        for s in students
+    ]
+
+
+async def time_orm(db, query, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = _as_dicts((await db.execute(query)).scalars().all())
+        timings.append(time.perf_counter() - started)
+        db.expunge_all()
+    return statistics.median(timings), len(rows)
+
+
+def time_roster(store, class_id, filters, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = _as_dicts(store.students_of(class_id, **filters))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(rows)
+
+
+async def traced(coroutine):
+    tracemalloc.start()
+    result = await coroutine
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+async def run(args):
+    from sqlalchemy import select
+    from app.database import AsyncSessionLocal
+    from app.helpers.roster import RosterStore
+    from app.models import Student
+
+    college = await seed_database(classes=args.classes, students_per_class=args.students_per_class)
+
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        store = RosterStore()
+        await store.load(db)
+        load_s = time.perf_counter() - started
+
+        traced_store = RosterStore()
+        _, store_bytes = await traced(traced_store.load(db))
+        del traced_store
+        students, orm_bytes = await traced(db.execute(select(Student)))
+        students = students.scalars().all()
+        count = len(students)
+        del students
+        db.expunge_all()
+
+        print(f"{count} students: roster loaded in {load_s * 1000:.0f} ms\n"
+              f"  ORM objects   {orm_bytes / 2**20:7.1f} MiB  ({orm_bytes / count:5.0f} B per student)\n"
+              f"  roster        {store_bytes / 2**20:7.1f} MiB  ({store_bytes / count:5.0f} B per student)\n")
+
+        class_id = college.class_ids[len(college.class_ids) // 2]
+        base = select(Student).where(Student.class_id == class_id).order_by(Student.roll_number)
+        cases = [
+            ("whole class", base, {}),
+            ("same gender", base.where(Student.gender == "female"), {"gender": "female"}),
+            ("present only", base.where(Student.present.is_(True)), {"present": True}),
+        ]
+
+        print(f"{'roster':14} {'ORM ms':>8} {'roster us':>10} {'speedup':>8} {'rows':>6}")
+        for label, query, filters in cases:
+            orm_s, orm_rows = await time_orm(db, query, args.repeat)
+            store_s, store_rows = time_roster(store, class_id, filters, args.repeat)
+            assert orm_rows == store_rows, (label, orm_rows, store_rows)
+            print(f"{label:14} {orm_s * 1000:8.2f} {store_s * 1e6:10.1f} {orm_s / store_s:7.0f}x {store_rows:6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, default=500)
+    parser.add_argument("--students-per-class", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    use_throwaway_database("convocation-roster-")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/search.py
+"""
+Student search: ILIKE '%q%' in the database vs the in-memory trigram index
+(app/helpers/search_index.py), on a seeded college.
+
+For each kind of query it times one page (limit 100) the way
+search_students used to fetch it (ILIKE on name and roll number, ordered
+by roll number) and the index lookup that replaced it, and prints the
+index's build time and memory. One- and two-character queries match word
+prefixes in the index, not any substring, so their counts differ.
+
+    python -m benchmarks.search --classes 500 --students-per-class 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.loadtest import seed_database, use_throwaway_database
+
+PAGE = 100
+
+
+def queries(students):
+    """(label, query) pairs built from real rows: (roll_number, name) tuples."""
+    roll, name = students[len(students) // 2]
+    return [
+        ("exact roll number", roll),
+        ("roll number prefix", roll[:-2]),
+        ("roll number middle", roll[2:6]),
+        ("name substring", name.split()[1]),
+        ("two characters", name[-2:]),
+        ("one character", "7"),
+        ("typo in name", name.replace("Student", "Studnet")),
+        ("no match", "zzzqqq"),
+    ]
+
+
+async def time_ilike(db, q, repeat):
+    from sqlalchemy import or_, select
+    from app.models import Student
+
+    query = (
+        select(Student)
+        .where(or_(Student.name.ilike(f"%{q}%"), Student.roll_number.ilike(f"%{q}%")))
+        .order_by(Student.roll_number)
+        .limit(PAGE + 1)
+    )
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = (await db.execute(query)).scalars().all()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(rows)
+
+
+def time_index(index, q, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        page, total = index.search(q, PAGE + 1)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(page), total
+
+
+async def run(args):
+    from sqlalchemy import select
+    from app.database import AsyncSessionLocal
+    from app.helpers.search_index import SearchIndex
+    from app.models import Student
+
+    await seed_database(classes=args.classes, students_per_class=args.students_per_class)
+
+    async with AsyncSessionLocal() as db:
+        students = (await db.execute(select(Student.roll_number, Student.name))).all()
+
+        index = SearchIndex(Student, ("roll_number", "name"), sort_field="roll_number")
+        started = time.perf_counter()
+        await index.load(db)
+        build_s = time.perf_counter() - started
+
+        # Traced separately: tracemalloc slows the build down several times
+        tracemalloc.start()
+        traced = SearchIndex(Student, ("roll_number", "name"), sort_field="roll_number")
+        await traced.load(db)
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del traced
+        print(f"{len(index)} students indexed in {build_s * 1000:.0f} ms, "
+              f"{size / 2**20:.1f} MiB kept ({peak / 2**20:.1f} MiB peak while building)\n")
+
+        print(f"{'query':22} {'q':>24} {'ILIKE ms':>9} {'index us':>9} {'speedup':>8} {'matches':>8}")
+        for label, q in queries(students):
+            ilike_s, ilike_rows = await time_ilike(db, q, args.repeat)
+            index_s, index_rows, total = time_index(index, q, args.repeat)
+            speedup = ilike_s / index_s if index_s else float("inf")
+            print(f"{label:22} {q!r:>24} {ilike_s * 1000:9.2f} {index_s * 1e6:9.1f} {speedup:7.0f}x {total:8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, default=500)
+    parser.add_argument("--students-per-class", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_throwaway_database("convocation-search-")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/seed.py
+"""
+Synthetic college generator used by the benchmarks.
+
+Everything is inserted through the app's own models, so the data matches
+what the admin creation routes would produce.
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+
+from sqlalchemy import insert
+
+from app.models import User, UserRole, ClassName, ProgramType, Class, Student, staff_classes
+
+
+@dataclass
+class SeededCollege:
+    class_ids: list = field(default_factory=list)
+    student_ids: list = field(default_factory=list)
+    # (staff_id, gender, [class_ids]) for every attendance incharge
+    attendance_staff: list = field(default_factory=list)
+    certificate_staff: list = field(default_factory=list)
+    # student_id -> (class_id, gender)
+    students: dict = field(default_factory=dict)
+    # staff_id -> staff_roll_number, for logging in through /staff/login
+    roll_numbers: dict = field(default_factory=dict)
+
+
+async def seed_college(
+    session_factory,
+    classes: int = 20,
+    students_per_class: int = 60,
+    staff_per_class: int = 2,
+    female_ratio: float = 0.5,
+    seed: int = 42,
+) -> SeededCollege:
+    """
+    Create `classes` classes split over UG/PG, `students_per_class` students in
+    each and `staff_per_class` attendance incharges per class (alternating
+    genders), plus one certificate incharge per class.
+    """
+    rnd = random.Random(seed)
+    college = SeededCollege()
+
+    async with session_factory() as db:
+        program_types = {name: ProgramType(type_name=name) for name in ("UG", "PG")}
+        db.add_all(program_types.values())
+        await db.flush()
+
+        class_rows, name_rows = [], []
+        for i in range(classes):
+            class_name = ClassName(id=uuid.uuid4(), name=f"CLASS-{i:04d}")
+            name_rows.append(class_name)
+            class_rows.append({
+                "id": uuid.uuid4(),
+                "class_name_id": class_name.id,
+                "program_type_id": program_types["PG" if i % 4 == 0 else "UG"].id,
+                "department": f"DEPT-{i % 10}",
+                "section": "A",
+                "regular_or_self": "Regular" if i % 2 else "Self",
+            })
+        db.add_all(name_rows)
+        await db.flush()
+        await db.execute(insert(Class), class_rows)
+        college.class_ids = [row["id"] for row in class_rows]
+
+        student_rows = []
+        for ci, class_id in enumerate(college.class_ids):
+            for si in range(students_per_class):
+                gender = "female" if rnd.random() < female_ratio else "male"
+                student_id = uuid.uuid4()
+                student_rows.append({
+                    "id": student_id,
+                    "roll_number": f"R{ci:04d}{si:04d}",
+                    "name": f"Student {ci}-{si} {rnd.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}",
+                    "gender": gender,
+                    "class_id": class_id,
+                    "present": False,
+                })
+                college.students[student_id] = (class_id, gender)
+        for start in range(0, len(student_rows), 5000):
+            await db.execute(insert(Student), student_rows[start:start + 5000])
+        college.student_ids = [row["id"] for row in student_rows]
+
+        staff_rows, assignment_rows = [], []
+        for ci, class_id in enumerate(college.class_ids):
+            for k in range(staff_per_class):
+                staff_id = uuid.uuid4()
+                gender = "female" if k % 2 else "male"
+                staff_rows.append({
+                    "id": staff_id,
+                    "staff_roll_number": f"TS{ci:04d}{k:02d}",
+                    "staff_name": f"Staff {ci}-{k}",
+                    "role": UserRole.attendance_incharge,
+                    "gender": gender,
+                })
+                assignment_rows.append({"user_id": staff_id, "class_id": class_id})
+                college.attendance_staff.append((staff_id, gender, [class_id]))
+                college.roll_numbers[staff_id] = staff_rows[-1]["staff_roll_number"]
+
+            staff_id = uuid.uuid4()
+            staff_rows.append({
+                "id": staff_id,
+                "staff_roll_number": f"CS{ci:04d}",
+                "staff_name": f"Certificate {ci}",
+                "role": UserRole.certificate_incharge,
+                "gender": "male",
+            })
+            assignment_rows.append({"user_id": staff_id, "class_id": class_id})
+            college.certificate_staff.append((staff_id, "male", [class_id]))
+            college.roll_numbers[staff_id] = staff_rows[-1]["staff_roll_number"]
+
+        await db.execute(insert(User), staff_rows)
+        await db.execute(insert(staff_classes), assignment_rows)
+        await db.commit()
+
+    return college
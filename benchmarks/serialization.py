@@ -0,0 +1,181 @@
+# benchmarks/serialization.py
+"""
+Serialization CPU for 5k-row listing responses, old path vs fast path.
+
+Old path: the route builds Pydantic models (or dicts) per row, FastAPI
+validates them against response_model and JSONResponse encodes with the
+stdlib json. Fast path: dicts built straight from projected rows, no
+re-validation, orjson (app/helpers/fast_json.py).
+
+No database is involved; rows are synthetic tuples shaped like the
+projected queries in the routes.
+
+    python -m benchmarks.serialization --rows 5000 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+from benchmarks.loadtest import use_throwaway_database
+
+
+def staff_rows(rows):
+    for i in range(rows):
+        staff_id = uuid.uuid4()
+        for k in range(2):
+            yield staff_id, f"Staff {i}", f"TS{i:06d}", "attendance_incharge", "male", uuid.uuid4(), f"CLASS-{i}-{k}"
+
+
+def student_rows(rows, class_id):
+    return [
+        (uuid.uuid4(), f"R{i:08d}", f"Student {i}", "female" if i % 2 else "male", bool(i % 3), class_id)
+        for i in range(rows)
+    ]
+
+
+def attendance_rows(rows, per_class=100):
+    rows_out = []
+    for c in range(rows // per_class):
+        class_id = uuid.uuid4()
+        for i in range(per_class):
+            rows_out.append((class_id, f"CLASS-{c}", "DEPT", "A", "Regular",
+                             uuid.uuid4(), f"R{c:04d}{i:04d}", f"Student {c}-{i}", "male", bool(i % 2)))
+    return rows_out
+
+
+# ---------------- Old path ---------------- #
+
+def old_staff2(rows):
+    from app.schemas.staff_schemas import StaffRead2, AssignedClassRead
+
+    grouped = {}
+    for staff_id, name, roll, role, gender, class_id, class_name in rows:
+        grouped.setdefault(staff_id, (name, roll, role, gender, []))[4].append((class_id, class_name))
+    staffs = [
+        StaffRead2(
+            id=str(staff_id), staff_name=name, staff_roll_number=roll, role=role, gender=gender,
+            assigned_classes=[AssignedClassRead(id=str(c), name=n) for c, n in classes],
+        )
+        for staff_id, (name, roll, role, gender, classes) in grouped.items()
+    ]
+    return {"count": len(staffs), "staffs": staffs}
+
+
+def old_students2(rows):
+    students = [
+        {"student_id": str(s), "roll_number": r, "name": n, "gender": g, "present": p, "class_id": str(c)}
+        for s, r, n, g, p, c in rows
+    ]
+    return {"class_id": str(rows[0][5]), "total_students": len(students), "filtered_by_present": None, "students": students}
+
+
+def old_attendance(rows):
+    from app.schemas.listing_for_attendance import AttendanceStaffResponse, ClassInfoWithStudents, StudentInfo
+
+    grouped = {}
+    for class_id, class_name, department, section, kind, s, r, n, g, p in rows:
+        grouped.setdefault(class_id, ((class_name, department, section, kind), []))[1].append(
+            StudentInfo(student_id=str(s), roll_number=r, name=n, gender=g, present=p)
+        )
+    classes = [
+        ClassInfoWithStudents(
+            class_id=str(class_id), class_name=info[0], department=info[1], section=info[2],
+            regular_or_self=info[3], students_count=len(students), students=students,
+        )
+        for class_id, (info, students) in grouped.items()
+    ]
+    return AttendanceStaffResponse(
+        staff_id=str(uuid.uuid4()), staff_name="Staff", staff_gender="male",
+        assigned_classes_count=len(classes), classes=classes,
+    )
+
+
+# ---------------- Fast path (same shaping as the routes) ---------------- #
+
+def new_staff2(rows):
+    staffs = {}
+    for staff_id, name, roll, role, gender, class_id, class_name in rows:
+        staff = staffs.get(staff_id)
+        if staff is None:
+            staff = staffs[staff_id] = {"id": staff_id, "staff_name": name, "staff_roll_number": roll,
+                                        "role": role, "gender": gender, "assigned_classes": []}
+        staff["assigned_classes"].append({"id": class_id, "name": class_name})
+    return {"count": len(staffs), "staffs": list(staffs.values())}
+
+
+def new_students2(rows):
+    students = [
+        {"student_id": s, "roll_number": r, "name": n, "gender": g, "present": p, "class_id": c}
+        for s, r, n, g, p, c in rows
+    ]
+    return {"class_id": rows[0][5], "total_students": len(students), "filtered_by_present": None, "students": students}
+
+
+def new_attendance(rows):
+    classes = {}
+    for class_id, class_name, department, section, kind, s, r, n, g, p in rows:
+        class_info = classes.get(class_id)
+        if class_info is None:
+            class_info = classes[class_id] = {"class_id": class_id, "class_name": class_name, "department": department,
+                                              "section": section, "regular_or_self": kind, "students_count": 0,
+                                              "students": []}
+        class_info["students"].append({"student_id": s, "roll_number": r, "name": n, "gender": g, "present": p})
+    for class_info in classes.values():
+        class_info["students_count"] = len(class_info["students"])
+    return {"staff_id": uuid.uuid4(), "staff_name": "Staff", "staff_gender": "male",
+            "assigned_classes_count": len(classes), "classes": list(classes.values())}
+
+
+def response_field(app, path):
+    return next(route.response_field for route in app.routes if getattr(route, "path", None) == path)
+
+
+def cpu_ms(fn, repeat):
+    fn()  # warm caches (TypeAdapters, schema cores)
+    started = time.process_time()
+    for _ in range(repeat):
+        body = fn()
+    return (time.process_time() - started) / repeat * 1000, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_throwaway_database("convocation-serialization-")
+    os.environ["APP_ENV"] = "production"
+
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from app.main import app
+    from app.helpers.fast_json import trusted_json
+
+    def old(build, rows, field):
+        # what FastAPI does with a response_model (field=None: jsonable_encoder only)
+        content = asyncio.run(serialize_response(field=field, response_content=build(rows)))
+        return JSONResponse(content).body
+
+    def new(build, rows):
+        return trusted_json(build(rows)).body
+
+    cases = [
+        ("list_all_staff2", list(staff_rows(args.rows)), old_staff2, new_staff2, None),
+        ("get_students_by_class2", student_rows(args.rows, uuid.uuid4()), old_students2, new_students2,
+         response_field(app, "/student/list-by-class_with_assighned_classes/{class_id}")),
+        ("list_students_for_attendance_incharge", attendance_rows(args.rows), old_attendance, new_attendance,
+         response_field(app, "/attendance-staff/list-students")),
+    ]
+
+    print(f"{'endpoint':40} {'old ms':>9} {'fast ms':>9} {'speedup':>8} {'bytes':>9}")
+    for name, rows, old_build, new_build, field in cases:
+        old_ms, old_size = cpu_ms(lambda: old(old_build, rows, field), args.repeat)
+        new_ms, new_size = cpu_ms(lambda: new(new_build, rows), args.repeat)
+        print(f"{name:40} {old_ms:9.2f} {new_ms:9.2f} {old_ms / new_ms:7.1f}x {new_size:9}")
+
+
+if __name__ == "__main__":
+    main()
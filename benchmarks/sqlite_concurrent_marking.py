@@ -0,0 +1,88 @@
+# benchmarks/sqlite_concurrent_marking.py
+"""
+Concurrent marking against a SQLite file, with and without the production
+profile from app/database.py.
+
+    python -m benchmarks.sqlite_concurrent_marking --markers 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import create_engines
+from app.migrations import run_migrations
+from benchmarks.marking import simulate_mark
+from benchmarks.seed import seed_college
+
+
+async def run(markers: int, rounds: int, sqlite_profile: bool) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    url = f"sqlite+aiosqlite:///{path}"
+
+    write_engine, read_engine = create_engines(url, sqlite_profile=sqlite_profile)
+    write_sessions = async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    read_sessions = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+    await run_migrations(write_engine)
+    college = await seed_college(write_sessions, classes=20, students_per_class=50)
+    staff_by_class = {classes[0]: (staff_id, gender) for staff_id, gender, classes in college.attendance_staff}
+
+    lock_errors = 0
+    other_errors = 0
+    latencies = []
+
+    async def mark(student_id):
+        nonlocal lock_errors, other_errors
+        class_id, _ = college.students[student_id]
+        staff_id, _ = staff_by_class[class_id]
+        started = time.perf_counter()
+        try:
+            await simulate_mark(read_sessions, write_sessions, staff_id, student_id)
+        except OperationalError as e:
+            if "locked" in str(e):
+                lock_errors += 1
+            else:
+                other_errors += 1
+            return
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for r in range(rounds):
+        batch = college.student_ids[r * markers:(r + 1) * markers]
+        await asyncio.gather(*(mark(sid) for sid in batch))
+    elapsed = time.perf_counter() - started
+
+    await write_engine.dispose()
+    if read_engine is not write_engine:
+        await read_engine.dispose()
+
+    latencies.sort()
+    return {
+        "profile": "production" if sqlite_profile else "default",
+        "marks": markers * rounds,
+        "lock_errors": lock_errors,
+        "other_errors": other_errors,
+        "marks_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2) if latencies else None,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--markers", type=int, default=200, help="concurrent markers per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    for profile in (False, True):
+        print(await run(args.markers, args.rounds, profile))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
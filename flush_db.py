@@ -2,6 +2,7 @@
 import asyncio
 from app.database import async_engine  # Your AsyncEngine
 from app.models import Base  # Your single models.py containing all tables
+from app.migrations import run_migrations
 from app.auth.security import get_password_hash  # Imported as requested
 
 
@@ -14,9 +15,9 @@ async def flush_db():
         print("⚠️ Dropping all tables...")
         await conn.run_sync(Base.metadata.drop_all)
         print("✅ All tables dropped.")
-        print("Creating tables again...")
-        await conn.run_sync(Base.metadata.create_all)
-        print("✅ Tables recreated.")
+    print("Creating tables again...")
+    await run_migrations(async_engine)
+    print("✅ Tables recreated.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+# migrate.py
+import asyncio
+import sys
+
+from sqlalchemy import text
+
+from app.database import async_engine
+from app.migrations import run_migrations, get_schema_version, LATEST_VERSION
+
+
+# Hot queries whose plans should show the indexes added in migration 0002
+EXPLAIN_QUERIES = {
+    "staff roster (class + gender + present)":
+        "SELECT id FROM students WHERE class_id = :cid AND gender = 'male' AND present = :p",
+    "class roster ordered by roll number":
+        "SELECT id FROM students WHERE class_id = :cid ORDER BY roll_number",
+    "staff of a class":
+        "SELECT user_id FROM staff_classes WHERE class_id = :cid",
+}
+
+
+async def migrate():
+    applied = await run_migrations(async_engine)
+    if applied:
+        print(f"✅ Applied migrations: {applied}")
+    else:
+        print(f"✅ Database already at version {LATEST_VERSION}")
+    await async_engine.dispose()
+
+
+async def query_plans(conn) -> dict:
+    """The plan of every hot query: label -> rows, each joined into one line."""
+    prefix = "EXPLAIN QUERY PLAN" if conn.dialect.name == "sqlite" else "EXPLAIN"
+    params = {"cid": "00000000000000000000000000000000", "p": True}
+    if conn.dialect.name != "sqlite":
+        params["cid"] = "00000000-0000-0000-0000-000000000000"
+
+    plans = {}
+    for label, sql in EXPLAIN_QUERIES.items():
+        result = await conn.execute(text(f"{prefix} {sql}"), params)
+        plans[label] = [" | ".join(str(col) for col in row) for row in result]
+    return plans
+
+
+async def explain():
+    """
+    Print the query plan of every hot query so index use can be checked
+    on both SQLite and Postgres.
+    """
+    async with async_engine.connect() as conn:
+        version = await get_schema_version(conn)
+        print(f"Schema version: {version}")
+
+        for label, plan in (await query_plans(conn)).items():
+            print(f"\n-- {label}")
+            for line in plan:
+                print("  ", line)
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    if "--explain" in sys.argv:
+        asyncio.run(explain())
+    else:
+        asyncio.run(migrate())
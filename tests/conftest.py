@@ -0,0 +1,107 @@
+"""
+Shared fixtures: one seeded throwaway database and the app served in-process.
+
+app.database builds its engines from the environment at import time, so the
+environment is set up here, before any test imports the app. Reads that the
+app sends to the replica go to a copy of the database that only catches up
+when a test calls sync_replica(): a body built from a lagging replica shows
+up as stale data instead of passing unnoticed.
+
+    python -m pytest -q
+"""
+import itertools
+import os
+import sqlite3
+import uuid
+
+import pytest
+
+from benchmarks.loadtest import ADMIN_PASSWORD, ADMIN_USERNAME, seed_database, use_throwaway_database
+
+WORKDIR = use_throwaway_database("convocation-tests-")
+PRIMARY_PATH = os.path.join(WORKDIR, "bench.db")
+REPLICA_PATH = os.path.join(WORKDIR, "replica.db")
+os.environ["REPLICA_DATABASE_URL"] = f"sqlite+aiosqlite:///{REPLICA_PATH}"
+# A user's reads after their own write would otherwise go to the primary
+# and hide where the route reads from
+os.environ["READ_YOUR_WRITES_SECONDS"] = "0"
+
+_serial = itertools.count(1)
+
+
+def _sync_replica():
+    primary = sqlite3.connect(PRIMARY_PATH)
+    replica = sqlite3.connect(REPLICA_PATH)
+    try:
+        primary.backup(replica)
+    finally:
+        replica.close()
+        primary.close()
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def sync_replica():
+    """Lets the replica catch up with every commit on the primary so far."""
+    return _sync_replica
+
+
+@pytest.fixture(scope="session")
+def unique():
+    """unique("R") -> "R00001", "R00002", ...: names no other test uses."""
+    return lambda prefix: f"{prefix}{next(_serial):05d}"
+
+
+@pytest.fixture(scope="session")
+async def college():
+    college = await seed_database(classes=6, students_per_class=12)
+    _sync_replica()
+    return college
+
+
+@pytest.fixture(scope="session")
+async def client(college):
+    import httpx
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+
+
+@pytest.fixture(scope="session")
+async def admin_headers(client):
+    response = await client.post("/admin/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def create_staff(client, admin_headers, unique):
+    """
+    create_staff(role, gender, class_ids) -> (headers, staff_id, roll_number)
+    for a new staff member made through the admin API. The replica is synced
+    so the routes' reads see the new user and their classes.
+    """
+    from app.auth.jwt import create_access_token
+
+    async def create(role="attendance_incharge", gender="male", class_ids=()):
+        roll_number = unique("T")
+        response = await client.post("/admin/staff/create", headers=admin_headers, json={
+            "staff_roll_number": roll_number,
+            "staff_name": f"Staff {roll_number}",
+            "role": role,
+            "gender": gender,
+            "assigned_class_ids": [str(class_id) for class_id in class_ids],
+        })
+        assert response.status_code == 200, response.text
+        staff_id = uuid.UUID(response.json()["staff_id"])
+        _sync_replica()
+        token = create_access_token({"user_id": str(staff_id), "role": role})
+        return {"Authorization": f"Bearer {token}"}, staff_id, roll_number
+
+    return create
@@ -0,0 +1,51 @@
+"""
+Offline sync: a queued mark is taken only shortly after the window it was
+made in closed, whatever time the device puts on it.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_marks_dated_into_a_long_closed_window_are_rejected(
+    client, college, admin_headers, create_staff, unique, monkeypatch
+):
+    import app.helpers.attendance_time_checker
+
+    monkeypatch.setattr(app.helpers.attendance_time_checker, "ENFORCE_ATTENDANCE_WINDOW", True)
+    class_id = college.class_ids[2]
+    student_id = next(sid for sid, (c, gender) in college.students.items() if c == class_id and gender == "male")
+    headers, _, _ = await create_staff(class_ids=[class_id])
+
+    now = datetime.now(timezone.utc)
+    windows = {
+        "closed long ago": (now - timedelta(hours=3), now - timedelta(hours=2)),
+        "just closed": (now - timedelta(minutes=20), now - timedelta(minutes=5)),
+    }
+    session_ids = []
+    try:
+        for name, (starts_at, ends_at) in windows.items():
+            response = await client.post("/admin/attendance-sessions", headers=admin_headers, json={
+                "name": unique(name), "starts_at": starts_at.isoformat(), "ends_at": ends_at.isoformat(),
+            })
+            assert response.status_code == 200, response.text
+            session_ids.append(response.json()["session_id"])
+
+        marks = {
+            unique("K"): (now - timedelta(hours=2, minutes=30), "rejected"),
+            unique("K"): (now - timedelta(minutes=10), "applied"),
+            unique("K"): (now - timedelta(hours=1), "rejected"),  # in no window at all
+        }
+        response = await client.post("/attendance-staff/sync", headers=headers, json={"marks": [
+            {"key": key, "student_id": str(student_id), "present": True, "marked_at": at.isoformat()}
+            for key, (at, _) in marks.items()
+        ]})
+        assert response.status_code == 200, response.text
+        results = {r["key"]: r for r in response.json()["results"]}
+        assert {key: results[key]["status"] for key in marks} == {key: status for key, (_, status) in marks.items()}
+        assert "closed too long ago" in results[next(iter(marks))]["detail"]
+    finally:
+        for session_id in session_ids:
+            await client.delete(f"/admin/attendance-sessions/{session_id}", headers=admin_headers)
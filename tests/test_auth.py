@@ -0,0 +1,56 @@
+"""
+Logins and tokens are checked against the primary: the replica is never
+synced here, so any lookup that went to it would see a stale user table.
+"""
+import uuid
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def create(client, admin_headers, unique, role="attendance_incharge"):
+    roll_number = unique("TA")
+    response = await client.post("/admin/staff/create", headers=admin_headers, json={
+        "staff_roll_number": roll_number, "staff_name": f"Staff {roll_number}",
+        "role": role, "gender": "male", "assigned_class_ids": [],
+    })
+    assert response.status_code == 200, response.text
+    return roll_number, uuid.UUID(response.json()["staff_id"])
+
+
+async def login(client, roll_number):
+    return await client.post("/staff/login", params={"staff_roll_number": roll_number})
+
+
+async def test_new_staff_log_in_at_once(client, admin_headers, unique):
+    roll_number, _ = await create(client, admin_headers, unique)
+    response = await login(client, roll_number)
+    assert response.status_code == 200, response.text
+
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Known, and refused for not being an admin
+    assert (await client.get("/metrics", headers=headers)).status_code == 403
+
+
+async def test_deleted_staff_tokens_stop_working(client, admin_headers, unique):
+    roll_number, staff_id = await create(client, admin_headers, unique)
+    headers = {"Authorization": f"Bearer {(await login(client, roll_number)).json()['access_token']}"}
+
+    response = await client.delete(f"/admin/delete-staff-by-id/{staff_id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert (await client.get("/metrics", headers=headers)).status_code in (401, 404)
+    assert (await login(client, roll_number)).status_code == 401
+
+
+async def test_role_changes_apply_at_once(client, admin_headers, unique):
+    from app.auth.jwt import create_access_token
+
+    roll_number, staff_id = await create(client, admin_headers, unique)
+    response = await client.patch(f"/admin/staff/update/by-roll/{roll_number}", headers=admin_headers,
+                                  json={"role": "admin"})
+    assert response.status_code == 200, response.text
+
+    # The token's role claim is old; the user's role is read from the primary
+    token = create_access_token({"user_id": str(staff_id), "role": "attendance_incharge"})
+    assert (await client.get("/metrics", headers={"Authorization": f"Bearer {token}"})).status_code == 200
@@ -0,0 +1,363 @@
+"""
+ETags of the listing routes across every mutating route (app/helpers/etags.py).
+
+Each test takes the ETag of every listing, runs one write, and checks that
+the listings built from what it wrote got a new ETag while the others still
+answer 304 to their old one. Listings are read after the write without
+syncing the replica, so a body read from there would come back stale.
+"""
+from datetime import datetime
+
+import pytest
+import pytz
+
+pytestmark = pytest.mark.anyio
+
+IST = pytz.timezone("Asia/Kolkata")
+
+STAFF_LISTINGS = {"staffs", "staffs_with_classes", "staff_search", "dashboard"}
+CLASS_LISTINGS = {"classes", "classes_by_type", "dashboard", "export"}
+# Built from none of users, staff_classes and classes
+STUDENT_LISTINGS = {"student_search"}
+
+
+@pytest.fixture(scope="module")
+async def setup(client, college, admin_headers, create_staff):
+    """Class A (with an attendance and a certificate incharge) and class B."""
+    class_a, class_b = college.class_ids[0], college.class_ids[1]
+    students_a = [sid for sid, (class_id, _) in college.students.items() if class_id == class_a]
+    gender = college.students[students_a[0]][1]
+    incharge_headers, _, _ = await create_staff("attendance_incharge", gender, [class_a])
+    certificate_headers, _, _ = await create_staff("certificate_incharge", gender, [class_a])
+
+    listings = {
+        "program_types": ("/admin/program-types/list-program-types", admin_headers),
+        "classes": ("/admin/program-types/list-classes", admin_headers),
+        "classes_by_type": ("/admin/program-types/get-classes-by-program-type-name/UG", admin_headers),
+        "staffs": ("/admin/list-staffs", admin_headers),
+        "staffs_with_classes": ("/admin/list-staffs-with-assighned_classes", admin_headers),
+        "staff_search": ("/admin/staff/search?q=Staff", admin_headers),
+        "roster_a": (f"/student/list-by-class/{class_a}", admin_headers),
+        "roster_b": (f"/student/list-by-class_with_assighned_classes/{class_b}", admin_headers),
+        "student_search": ("/student/student/search?q=Student", admin_headers),
+        "attendance_listing": ("/attendance-staff/list-students", incharge_headers),
+        "summary": ("/class/summary", incharge_headers),
+        "certificate_classes": ("/certificate-staff/list-classes", certificate_headers),
+        "certificate_roster": (f"/certificate-staff/class/{class_a}/students", certificate_headers),
+        "export": ("/admin/attendance/export.csv", admin_headers),
+        "dashboard": ("/admin/dashboard", admin_headers),
+    }
+    return {
+        "listings": listings,
+        "class_a": class_a,
+        "class_b": class_b,
+        "students_a": [sid for sid in students_a if college.students[sid][1] == gender],
+        "gender": gender,
+        "incharge_headers": incharge_headers,
+    }
+
+
+async def etags(client, listings):
+    """The ETag of every listing, each checked to answer 304 to itself."""
+    tags = {}
+    for name, (url, headers) in listings.items():
+        response = await client.get(url, headers=headers)
+        assert response.status_code == 200, (name, response.text)
+        etag = response.headers["etag"]
+        revalidated = await client.get(url, headers={**headers, "If-None-Match": etag})
+        assert revalidated.status_code == 304, name
+        tags[name] = etag
+    return tags
+
+
+async def changed_by(client, setup, write):
+    """Runs the write; returns its response and the listings whose ETag changed."""
+    listings = setup["listings"]
+    before = await etags(client, listings)
+    response = await write
+    assert response.status_code == 200, response.text
+    after = await etags(client, listings)
+    return response, {name for name in listings if after[name] != before[name]}
+
+
+async def create_class(client, admin_headers, unique):
+    name = unique("CLASS-T")
+    response = await client.post("/admin/class/create", headers=admin_headers, json={
+        "class_name": name, "program_type": "UG", "department": "DEPT-T", "section": "A",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["class_id"], name
+
+
+async def create_student(client, admin_headers, unique, class_id, gender="male"):
+    roll_number = unique("RT")
+    response = await client.post("/admin/student/create", headers=admin_headers, json={
+        "roll_number": roll_number, "name": f"Student {roll_number}", "gender": gender, "class_id": str(class_id),
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["student_id"], roll_number
+
+
+async def body(client, setup, name):
+    url, headers = setup["listings"][name]
+    response = await client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+# ------------------------------ Attendance ------------------------------ #
+
+async def test_mark_changes_only_that_class(client, setup):
+    student_id = setup["students_a"][0]
+    _, changed = await changed_by(client, setup, client.put(
+        f"/attendance-staff/mark-attendace?student_id={student_id}&present=true",
+        headers=setup["incharge_headers"],
+    ))
+    assert {"roster_a", "attendance_listing", "summary", "certificate_roster", "export", "dashboard"} <= changed
+    assert not changed & {"roster_b", "classes", "staffs", "program_types", "certificate_classes"}
+
+
+async def test_sync_changes_that_class(client, setup):
+    student_id = setup["students_a"][1]
+    response, changed = await changed_by(client, setup, client.post(
+        "/attendance-staff/sync", headers=setup["incharge_headers"], json={"marks": [{
+            "key": f"etag-{student_id}", "student_id": str(student_id), "present": True,
+            "marked_at": datetime.now(IST).replace(tzinfo=None).isoformat(),
+        }]},
+    ))
+    assert response.json()["results"][0]["status"] == "applied"
+    assert {"roster_a", "attendance_listing", "summary", "certificate_roster", "export", "dashboard"} <= changed
+    assert not changed & {"roster_b", "classes", "staffs"}
+
+
+async def test_freeze_and_unfreeze(client, setup, admin_headers):
+    _, changed = await changed_by(client, setup, client.post("/admin/attendance/freeze", headers=admin_headers))
+    assert {"roster_a", "attendance_listing", "summary", "export", "dashboard"} <= changed
+    assert not changed & {"classes", "staffs"}
+
+    _, changed = await changed_by(client, setup, client.post("/admin/attendance/unfreeze", headers=admin_headers))
+    assert {"roster_a", "attendance_listing", "summary", "export", "dashboard"} <= changed
+
+
+# ------------------------------- Classes -------------------------------- #
+
+async def test_class_create(client, setup, admin_headers, unique):
+    name = unique("CLASS-T")
+    _, changed = await changed_by(client, setup, client.post("/admin/class/create", headers=admin_headers, json={
+        "class_name": name, "program_type": "UG", "department": "DEPT-T", "section": "A",
+    }))
+    assert CLASS_LISTINGS <= changed
+    assert not changed & (STUDENT_LISTINGS | {"program_types"})
+    assert name in {c["class_name"] for c in (await body(client, setup, "classes"))["classes"]}
+
+
+async def test_class_create_via_json(client, setup, admin_headers, unique):
+    _, changed = await changed_by(client, setup, client.post("/admin/class/create-via-json", headers=admin_headers, json=[
+        {"class_name": unique("CLASS-T"), "program_type": "UG", "department": "DEPT-T", "section": "B"},
+    ]))
+    assert CLASS_LISTINGS <= changed
+
+
+async def test_class_create_with_new_program_type(client, setup, admin_headers, unique):
+    program_type = unique("PT")
+    _, changed = await changed_by(client, setup, client.post("/admin/class/create", headers=admin_headers, json={
+        "class_name": unique("CLASS-T"), "program_type": program_type, "department": "DEPT-T", "section": "A",
+    }))
+    assert {"program_types", "classes", "dashboard"} <= changed
+    assert program_type in {pt["type_name"] for pt in (await body(client, setup, "program_types"))["program_types"]}
+
+
+async def test_class_update(client, setup, admin_headers, unique):
+    class_id, _ = await create_class(client, admin_headers, unique)
+    _, changed = await changed_by(client, setup, client.patch(
+        f"/admin/class/{class_id}", headers=admin_headers, json={"section": "Z"},
+    ))
+    assert CLASS_LISTINGS <= changed
+    assert not changed & (STUDENT_LISTINGS | {"program_types"})
+
+
+async def test_class_update_of_an_assigned_class(client, setup, admin_headers):
+    _, changed = await changed_by(client, setup, client.patch(
+        f"/admin/class/{setup['class_a']}", headers=admin_headers, json={"department": "DEPT-RENAMED"},
+    ))
+    assert CLASS_LISTINGS | {"attendance_listing", "summary", "certificate_classes"} <= changed
+
+
+async def test_class_delete(client, setup, admin_headers, unique):
+    class_id, name = await create_class(client, admin_headers, unique)
+    await create_student(client, admin_headers, unique, class_id)
+    _, changed = await changed_by(client, setup, client.delete(f"/admin/delete-class/{class_id}", headers=admin_headers))
+    assert CLASS_LISTINGS | {"student_search"} <= changed
+    assert name not in {c["class_name"] for c in (await body(client, setup, "classes"))["classes"]}
+
+
+# ------------------------------- Students ------------------------------- #
+
+async def test_student_create(client, setup, admin_headers, unique):
+    roll_number = unique("RT")
+    _, changed = await changed_by(client, setup, client.post("/admin/student/create", headers=admin_headers, json={
+        "roll_number": roll_number, "name": f"Student {roll_number}", "gender": setup["gender"],
+        "class_id": str(setup["class_a"]),
+    }))
+    assert {"roster_a", "student_search", "attendance_listing", "certificate_roster", "export", "dashboard"} <= changed
+    assert not changed & {"roster_b", "classes", "staffs"}
+    assert roll_number in {s["roll_number"] for s in (await body(client, setup, "roster_a"))["students"]}
+
+
+async def test_student_bulk_create(client, setup, admin_headers, unique):
+    _, changed = await changed_by(client, setup, client.post("/admin/student/bulk-create", headers=admin_headers, json={
+        "students": [{"roll_number": unique("RT"), "name": "Student bulk", "gender": "male",
+                      "class_id": str(setup["class_b"])}],
+    }))
+    assert {"roster_b", "student_search", "export", "dashboard"} <= changed
+    assert not changed & {"roster_a", "attendance_listing", "classes", "staffs"}
+
+
+async def test_student_update_by_id(client, setup, admin_headers, unique):
+    student_id, _ = await create_student(client, admin_headers, unique, setup["class_b"])
+    _, changed = await changed_by(client, setup, client.patch(
+        f"/admin/student/update/by-id/{student_id}", headers=admin_headers, json={"name": "Student renamed"},
+    ))
+    assert {"roster_b", "student_search", "export"} <= changed
+    assert not changed & {"roster_a", "attendance_listing", "classes"}
+
+
+async def test_student_update_by_roll(client, setup, admin_headers, unique):
+    _, roll_number = await create_student(client, admin_headers, unique, setup["class_b"])
+    _, changed = await changed_by(client, setup, client.put(
+        f"/admin/student/update/by-roll/{roll_number}", headers=admin_headers, json={"present": True},
+    ))
+    assert {"roster_b", "student_search", "export", "dashboard"} <= changed
+    assert not changed & {"roster_a", "classes"}
+
+
+async def test_student_move_changes_both_classes(client, setup, admin_headers, unique):
+    _, roll_number = await create_student(client, admin_headers, unique, setup["class_b"], setup["gender"])
+    _, changed = await changed_by(client, setup, client.put(
+        f"/admin/student/update/by-roll/{roll_number}", headers=admin_headers,
+        json={"class_id": str(setup["class_a"])},
+    ))
+    assert {"roster_a", "roster_b", "attendance_listing", "certificate_roster"} <= changed
+
+
+async def test_student_delete(client, setup, admin_headers, unique):
+    student_id, roll_number = await create_student(client, admin_headers, unique, setup["class_a"])
+    _, changed = await changed_by(client, setup, client.delete(
+        f"/admin/delete-student/{student_id}", headers=admin_headers,
+    ))
+    assert {"roster_a", "student_search", "export", "dashboard"} <= changed
+    assert not changed & {"roster_b", "classes", "staffs"}
+    assert roll_number not in {s["roll_number"] for s in (await body(client, setup, "roster_a"))["students"]}
+
+
+async def test_student_bulk_delete(client, setup, admin_headers, unique):
+    student_id, _ = await create_student(client, admin_headers, unique, setup["class_b"])
+    _, changed = await changed_by(client, setup, client.request(
+        "DELETE", "/admin/bulk-delete-students", headers=admin_headers, json=[student_id],
+    ))
+    assert {"roster_b", "student_search", "export", "dashboard"} <= changed
+    assert not changed & {"roster_a", "classes"}
+
+
+# -------------------------------- Staff --------------------------------- #
+
+async def test_staff_create(client, setup, admin_headers, unique):
+    roll_number = unique("T")
+    _, changed = await changed_by(client, setup, client.post("/admin/staff/create", headers=admin_headers, json={
+        "staff_roll_number": roll_number, "staff_name": f"Staff {roll_number}", "role": "attendance_incharge",
+        "gender": "male", "assigned_class_ids": [str(setup["class_b"])],
+    }))
+    assert STAFF_LISTINGS <= changed
+    assert not changed & (CLASS_LISTINGS - {"dashboard"} | {"roster_a", "roster_b"} | STUDENT_LISTINGS)
+    assert roll_number in {s["staff_roll_number"] for s in (await body(client, setup, "staffs"))["staffs"]}
+
+
+async def test_staff_bulk_create(client, setup, admin_headers, unique):
+    roll_number = unique("T")
+    _, changed = await changed_by(client, setup, client.post("/admin/staff/bulk-create", headers=admin_headers, json=[
+        {"staff_roll_number": roll_number, "staff_name": f"Staff {roll_number}",
+         "role": "certificate_incharge", "gender": "female"},
+    ]))
+    assert STAFF_LISTINGS <= changed
+    assert roll_number in {s["staff_roll_number"] for s in (await body(client, setup, "staffs"))["staffs"]}
+
+
+async def test_staff_roll_number_update(client, setup, admin_headers, create_staff, unique):
+    _, _, roll_number = await create_staff()
+    new_roll_number = unique("T")
+    response, changed = await changed_by(client, setup, client.patch(
+        "/admin/update-staff_roll_no", headers=admin_headers, json=[{"old": roll_number, "new": new_roll_number}],
+    ))
+    assert response.json()["successes"] == [roll_number]
+    assert {"staffs", "staffs_with_classes", "staff_search"} <= changed
+    assert new_roll_number in {s["staff_roll_number"] for s in (await body(client, setup, "staffs"))["staffs"]}
+
+
+async def test_staff_update_by_roll(client, setup, admin_headers, create_staff):
+    _, _, roll_number = await create_staff()
+    _, changed = await changed_by(client, setup, client.patch(
+        f"/admin/staff/update/by-roll/{roll_number}", headers=admin_headers, json={"staff_name": "Staff renamed"},
+    ))
+    assert {"staffs", "staffs_with_classes", "staff_search"} <= changed
+    assert not changed & (CLASS_LISTINGS - {"dashboard"} | {"roster_a"})
+    staffs = (await body(client, setup, "staffs"))["staffs"]
+    assert "Staff renamed" in {s["staff_name"] for s in staffs if s["staff_roll_number"] == roll_number}
+
+
+async def test_staff_update_by_id(client, setup, admin_headers, create_staff):
+    _, staff_id, roll_number = await create_staff(class_ids=[setup["class_b"]])
+    _, changed = await changed_by(client, setup, client.put(
+        f"/admin/staff/update/by-id/{staff_id}", headers=admin_headers, json={"gender": "female"},
+    ))
+    assert {"staffs", "staffs_with_classes", "staff_search", "dashboard"} <= changed
+    assert not changed & (CLASS_LISTINGS - {"dashboard"} | {"roster_a", "roster_b"})
+    staffs = (await body(client, setup, "staffs"))["staffs"]
+    assert "female" in {s["gender"] for s in staffs if s["staff_roll_number"] == roll_number}
+
+
+async def test_staff_delete_by_id(client, setup, admin_headers, create_staff):
+    _, staff_id, roll_number = await create_staff()
+    _, changed = await changed_by(client, setup, client.delete(
+        f"/admin/delete-staff-by-id/{staff_id}", headers=admin_headers,
+    ))
+    assert STAFF_LISTINGS <= changed
+    assert roll_number not in {s["staff_roll_number"] for s in (await body(client, setup, "staffs"))["staffs"]}
+
+
+async def test_staff_delete_by_roll(client, setup, admin_headers, create_staff):
+    _, _, roll_number = await create_staff(class_ids=[setup["class_b"]])
+    _, changed = await changed_by(client, setup, client.delete(
+        f"/admin/delete-staff/{roll_number}", headers=admin_headers,
+    ))
+    assert STAFF_LISTINGS <= changed
+    assert not changed & (CLASS_LISTINGS - {"dashboard"} | {"roster_a", "roster_b"})
+
+
+async def test_delete_all_staff(client, setup, admin_headers, sync_replica):
+    """Last: it deletes every user, the admin included, who is put back after."""
+    from app.database import AsyncSessionLocal
+    from app.models import User, UserRole
+    from sqlalchemy import select
+
+    async with AsyncSessionLocal() as db:
+        admin = (await db.execute(select(User).where(User.role == UserRole.admin))).scalars().first()
+        restored = {column.key: getattr(admin, column.key) for column in User.__table__.columns}
+
+    # Only the admin's listings: everyone else is gone after the write
+    admin_listings = {
+        name: (url, headers) for name, (url, headers) in setup["listings"].items() if headers is admin_headers
+    }
+    before = await etags(client, admin_listings)
+    response = await client.delete("/admin/delete-all-staffs", headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    async with AsyncSessionLocal() as db:
+        db.add(User(**restored))
+        await db.commit()
+    sync_replica()
+
+    after = await etags(client, admin_listings)
+    changed = {name for name in admin_listings if after[name] != before[name]}
+    assert {"staffs", "staffs_with_classes", "staff_search", "dashboard"} <= changed
+    staffs = (await body(client, setup, "staffs"))["staffs"]
+    assert [staff["role"] for staff in staffs] == ["admin"]
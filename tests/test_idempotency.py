@@ -0,0 +1,77 @@
+"""
+Idempotency-Key: which responses a retry gets back, and what is dropped
+when the store is full.
+"""
+import pytest
+
+from app.helpers.idempotency import IdempotencyStore, idempotency_store
+
+pytestmark = pytest.mark.anyio
+
+
+def kept(store: IdempotencyStore, key: str, body: bytes = b"{}"):
+    entry = store.begin((None, key), key)
+    store.finish((None, key), entry, 200, [], body)
+    return entry
+
+
+async def test_running_requests_are_not_evicted():
+    store = IdempotencyStore(max_entries=2, ttl=60, max_bytes=1024)
+    running = store.begin((None, "running"), "running")
+    kept(store, "a")
+    kept(store, "b")
+
+    assert store.get((None, "running")) is running
+    assert store.get((None, "a")) is None
+    assert store.get((None, "b")) is not None
+
+
+async def test_refused_while_frozen_is_not_replayed(client, college, admin_headers, create_staff, unique):
+    class_id = college.class_ids[3]
+    student_id = next(sid for sid, (c, gender) in college.students.items() if c == class_id and gender == "male")
+    headers, _, _ = await create_staff(class_ids=[class_id])
+    headers = dict(headers, **{"Idempotency-Key": unique("idem")})
+
+    async def mark():
+        return await client.put("/attendance-staff/mark-attendace", headers=headers,
+                                params={"student_id": str(student_id), "present": "true"})
+
+    response = await client.post("/admin/attendance/freeze", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    try:
+        assert (await mark()).status_code == 409
+    finally:
+        response = await client.post("/admin/attendance/unfreeze", headers=admin_headers)
+        assert response.status_code == 200, response.text
+
+    response = await mark()
+    assert response.status_code == 200, response.text
+    assert "idempotent-replayed" not in response.headers
+    # ...and the mark that went through is what retries get from now on
+    assert (await mark()).headers.get("idempotent-replayed") == "true"
+
+
+async def test_kept_bodies_are_bounded_in_bytes(client, college, admin_headers, unique, monkeypatch):
+    url = f"/admin/student/update/by-id/{college.student_ids[2]}"
+
+    async def update(key=None):
+        headers = dict(admin_headers, **{"Idempotency-Key": key}) if key else admin_headers
+        response = await client.patch(url, headers=headers, json={"name": "Idempotent student"})
+        assert response.status_code == 200, response.text
+        return response
+
+    size = len((await update()).content)
+    monkeypatch.setattr(idempotency_store, "max_bytes", size * 5 // 2)
+
+    keys = [unique("idem") for _ in range(3)]
+    for key in keys:
+        await update(key)
+    # Room for two: the oldest is dropped and runs again
+    assert (await update(keys[2])).headers.get("idempotent-replayed") == "true"
+    assert "idempotent-replayed" not in (await update(keys[0])).headers
+
+    # Larger than the whole budget: never kept
+    monkeypatch.setattr(idempotency_store, "max_bytes", size - 1)
+    key = unique("idem")
+    await update(key)
+    assert "idempotent-replayed" not in (await update(key)).headers
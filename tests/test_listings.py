@@ -0,0 +1,30 @@
+"""
+Paginated class listings: total_students is the class's size, as it was
+before pagination, whatever page is asked for.
+"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+CLASS_LISTINGS = ("/student/list-by-class", "/student/list-by-class_with_assighned_classes")
+
+
+@pytest.mark.parametrize("listing", CLASS_LISTINGS)
+async def test_total_students_counts_the_class(client, college, admin_headers, listing):
+    class_id = college.class_ids[4]
+    size = sum(1 for c, _ in college.students.values() if c == class_id)
+
+    pages, after = [], None
+    while True:
+        params = {"limit": 5, **({"after": after} if after else {})}
+        response = await client.get(f"{listing}/{class_id}", headers=admin_headers, params=params)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["total_students"] == size
+        assert body["count"] == len(body["students"]) <= 5
+        pages.append(body["count"])
+        after = body["next_cursor"]
+        if not after:
+            break
+
+    assert sum(pages) == size and len(pages) > 1
@@ -0,0 +1,91 @@
+"""
+/metrics: who may scrape it, and the present-student gauge after writes
+that are not marks.
+"""
+import re
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def present_students(text: str, program_type: str) -> float:
+    match = re.search(rf'^attendance_present_students{{program_type="{program_type}"}} (\S+)$', text, re.M)
+    return float(match.group(1)) if match else 0.0
+
+
+async def test_metrics_needs_credentials(client):
+    response = await client.get("/metrics")
+    assert response.status_code in (401, 403)
+
+
+async def test_metrics_refuses_staff(client, create_staff):
+    headers, _, _ = await create_staff()
+    response = await client.get("/metrics", headers=headers)
+    assert response.status_code == 403
+
+
+async def test_metrics_for_admins(client, admin_headers):
+    response = await client.get("/metrics", headers=admin_headers)
+    assert response.status_code == 200
+    assert "attendance_present_students" in response.text
+
+
+async def test_metrics_scrape_token(client, monkeypatch):
+    import app.routes.metrics
+
+    monkeypatch.setattr(app.routes.metrics, "METRICS_TOKEN", "scrape-secret")
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    response = await client.get("/metrics", headers={"Authorization": "Bearer wrong-secret"})
+    assert response.status_code == 401
+
+
+async def test_present_count_follows_admin_writes(client, college, admin_headers, unique):
+    class_id = college.class_ids[1]  # UG
+
+    async def present():
+        response = await client.get("/metrics", headers=admin_headers)
+        return present_students(response.text, "UG")
+
+    before = await present()
+    roll_number = unique("RM")
+    response = await client.post("/admin/student/create", headers=admin_headers, json={
+        "roll_number": roll_number, "name": "Metrics student", "gender": "male", "class_id": str(class_id),
+    })
+    assert response.status_code == 200, response.text
+    student_id = response.json()["student_id"]
+
+    response = await client.put(f"/admin/student/update/by-roll/{roll_number}", headers=admin_headers,
+                                json={"present": True})
+    assert response.status_code == 200, response.text
+    assert await present() == before + 1
+
+    response = await client.delete(f"/admin/delete-student/{student_id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert await present() == before
+
+
+async def test_admin_correction_is_a_logged_mark(client, college, admin_headers, sync_replica):
+    from app.auth.jwt import decode_access_token
+
+    admin_id = decode_access_token(admin_headers["Authorization"].split()[1])["user_id"]
+    student_id = college.student_ids[0]
+
+    async def marks(present: str) -> float:
+        response = await client.get("/metrics", headers=admin_headers)
+        match = re.search(rf'^attendance_marks_total{{present="{present}"}} (\S+)$', response.text, re.M)
+        return float(match.group(1)) if match else 0.0
+
+    before = await marks("true")
+    response = await client.patch(f"/admin/student/update/by-id/{student_id}", headers=admin_headers,
+                                  json={"present": True})
+    assert response.status_code == 200, response.text
+    assert await marks("true") == before + 1
+
+    sync_replica()
+    response = await client.get("/admin/attendance/events", headers=admin_headers,
+                                params={"student_id": str(student_id), "limit": 1000})
+    assert response.status_code == 200, response.text
+    last = response.json()["events"][-1]
+    assert (last["staff_id"], last["present"]) == (admin_id, True)
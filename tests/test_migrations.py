@@ -0,0 +1,37 @@
+"""
+Plans of the hot queries in migrate.EXPLAIN_QUERIES on a migrated database:
+each must use the index migration 0002 added for it.
+"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+EXPECTED_INDEXES = {
+    "staff roster (class + gender + present)": "ix_students_class_gender_present",
+    "class roster ordered by roll number": "ix_students_class_roll",
+    "staff of a class": "ix_staff_classes_class_id",
+}
+
+
+@pytest.fixture(scope="module")
+async def plans(college):
+    from app.database import primary_read_engine
+    from migrate import query_plans
+
+    async with primary_read_engine.connect() as conn:
+        return await query_plans(conn)
+
+
+async def test_every_hot_query_has_an_expected_index(plans):
+    assert set(plans) == set(EXPECTED_INDEXES)
+
+
+@pytest.mark.parametrize("label", sorted(EXPECTED_INDEXES))
+async def test_hot_query_uses_its_index(plans, label):
+    plan = "\n".join(plans[label])
+    assert EXPECTED_INDEXES[label] in plan, plan
+
+
+async def test_roster_order_needs_no_sort(plans):
+    plan = "\n".join(plans["class roster ordered by roll number"])
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
@@ -0,0 +1,27 @@
+"""
+On-demand profiling: one request at a time, and the interpreter's switch
+interval is left as it was found.
+"""
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_one_profile_at_a_time(client, admin_headers):
+    from app.helpers import request_profiler
+
+    headers = dict(admin_headers, **{"X-Profile": "sample"})
+    switch_interval = sys.getswitchinterval()
+
+    async with request_profiler._profiling:
+        response = await client.get("/admin/program-types/list-classes", headers=headers)
+        assert response.status_code == 409
+        assert "x-profile-id" not in response.headers
+
+    for mode in ("sample", "cprofile"):
+        response = await client.get("/admin/program-types/list-classes", headers=dict(headers, **{"X-Profile": mode}))
+        assert response.status_code == 200, response.text
+        assert response.headers["x-profile-id"]
+    assert sys.getswitchinterval() == switch_interval
@@ -0,0 +1,45 @@
+"""
+Query-count budgets: every endpoint of benchmarks/microbench.py stays
+within the statements its case allows.
+
+The microbench seeds a college of its own (100 classes x 100 students)
+and deletes, renames and creates rows as it goes, so it runs in a
+process of its own rather than against the session's database; each of
+its cases is a test here.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.microbench import CASES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Enough for every case's first-request lookups and the steady state after them
+ITERATIONS = 3
+
+
+@pytest.fixture(scope="module")
+def measured(tmp_path_factory):
+    report = tmp_path_factory.mktemp("microbench") / "report.json"
+    # The production layout: no replica, as the budgets were set for
+    env = {name: value for name, value in os.environ.items()
+           if name not in ("REPLICA_DATABASE_URL", "READ_YOUR_WRITES_SECONDS")}
+    run = subprocess.run(
+        [sys.executable, "-m", "benchmarks.microbench", "--iterations", str(ITERATIONS), "--report", str(report)],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=600,
+    )
+    if not report.exists():
+        pytest.fail(f"microbench did not finish:\n{run.stdout[-2000:]}\n{run.stderr[-2000:]}")
+    return json.loads(report.read_text())
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.name)
+def test_within_query_budget(measured, case):
+    result = measured[case.name]
+    assert result["error"] is None, f"{case.name} answered {result['error']}"
+    assert result["queries"] <= case.budget, (
+        f"{case.name} ran {result['queries']} statements, budget {case.budget}"
+    )
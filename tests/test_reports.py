@@ -0,0 +1,82 @@
+"""
+The present-students report and the class summary: a request that arrives
+after a mark is not answered with a computation started before it.
+"""
+import asyncio
+import itertools
+import threading
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_report_after_a_mark_is_rendered_again(client, college, admin_headers, monkeypatch):
+    import app.routes.admin_report
+
+    renders = itertools.count(1)
+    rendering, release = threading.Event(), threading.Event()
+
+    def render(classes, roster):
+        n = next(renders)
+        if n == 1:
+            rendering.set()
+            release.wait(5)
+        return b"render %d" % n
+
+    monkeypatch.setattr(app.routes.admin_report, "present_students_pdf", render)
+    student_id = college.student_ids[1]
+
+    async def mark(present: bool):
+        response = await client.patch(f"/admin/student/update/by-id/{student_id}", headers=admin_headers,
+                                      json={"present": present})
+        assert response.status_code == 200, response.text
+
+    await mark(True)
+    first = asyncio.create_task(client.get("/admin/reports/present-students/pdf", headers=admin_headers))
+    while not rendering.is_set():
+        await asyncio.sleep(0.01)
+
+    await mark(False)
+    second = asyncio.create_task(client.get("/admin/reports/present-students/pdf", headers=admin_headers))
+    await asyncio.sleep(0.05)
+    release.set()
+
+    first, second = await first, await second
+    assert (first.status_code, second.status_code) == (200, 200)
+    assert (first.content, second.content) == (b"render 1", b"render 2")
+
+
+async def test_summary_after_a_mark_is_computed_again(client, college, admin_headers, monkeypatch):
+    import app.routes.admin_attendance_certificate_incharge_class_summary as summary
+
+    views = itertools.count(1)
+    computing, release = asyncio.Event(), asyncio.Event()
+    real_view = summary.attendance_view
+
+    async def view(db):
+        if next(views) == 1:
+            computing.set()
+            await release.wait()
+        return await real_view(db)
+
+    monkeypatch.setattr(summary, "attendance_view", view)
+    student_id = college.student_ids[3]
+
+    async def mark(present: bool):
+        response = await client.patch(f"/admin/student/update/by-id/{student_id}", headers=admin_headers,
+                                      json={"present": present})
+        assert response.status_code == 200, response.text
+
+    await mark(True)
+    first = asyncio.create_task(client.get("/class/summary", headers=admin_headers))
+    await computing.wait()
+
+    await mark(False)
+    second = asyncio.create_task(client.get("/class/summary", headers=admin_headers))
+    await asyncio.sleep(0.05)
+    release.set()
+
+    first, second = await first, await second
+    assert (first.status_code, second.status_code) == (200, 200)
+    assert next(views) == 3  # the second request computed its own summary